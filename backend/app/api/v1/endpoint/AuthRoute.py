@@ -5,7 +5,7 @@ from datetime import datetime, timezone, timedelta
 
 from app.controllers.AuthController import AuthController
 from app.core.config import settings
-from app.core.security.app_token import create_access_token, create_refresh_token, decode_token
+from app.core.security.app_token import access_token_claims, create_access_token, create_refresh_token, decode_token
 from app.schema.UserSchema import UserRegister, UserResponse
 
 
@@ -22,7 +22,7 @@ async def register(
     :param auth_controller: AuthController dependency
     :return: UserResponse object with the registered user's details
     """
-    return auth_controller.register_user(user_data)
+    return await auth_controller.register_user(user_data)
 
 
 @router.post("/login")
@@ -40,7 +40,7 @@ async def login(
     :param auth_controller: AuthController dependency
     :return: Dictionary containing access token
     """
-    user = auth_controller.login_user(form_data.username, form_data.password)
+    user = await auth_controller.login_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,7 +48,7 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = create_access_token(data={"sub": user.email, "is_admin": user.is_admin})
+    access_token = create_access_token(data=access_token_claims(user))
     refresh_token = create_refresh_token(data={"sub": user.email})
 
     # Set refresh token in HTTP-only cookie
@@ -90,9 +90,9 @@ async def refresh_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = auth_controller.get_user_by_refresh_token(refresh_tk)
+    user = await auth_controller.get_user_by_refresh_token(refresh_tk)
     # Generate new tokens
-    access_token = create_access_token(data={"sub": user.email, "is_admin": user.is_admin})
+    access_token = create_access_token(data=access_token_claims(user))
 
     return {
         "access_token": access_token,
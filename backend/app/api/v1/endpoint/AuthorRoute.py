@@ -17,7 +17,7 @@ async def create_author(
     :param author_controller: AuthorController dependency
     :return: AuthorResponse object with the created author details
     """
-    return author_controller.create_author(author_data)
+    return await author_controller.create_author(author_data)
 
 
 @router.get("/", response_model=List[AuthorResponse])
@@ -29,7 +29,7 @@ async def get_authors(
     :param author_controller: AuthorController dependency
     :return: List of AuthorResponse objects
     """
-    return author_controller.get_author()
+    return await author_controller.get_author()
 
 
 @router.put("/{author_id}", response_model=AuthorResponse)
@@ -45,7 +45,7 @@ async def update_author(
     :param author_controller: AuthorController dependency
     :return: AuthorResponse object with the updated author details
     """
-    return author_controller.update_author(author_id, author_data)
+    return await author_controller.update_author(author_id, author_data)
 
 
 @router.delete("/{author_id}", response_model=AuthorResponse)
@@ -59,4 +59,4 @@ async def delete_author(
     :param author_controller: AuthorController dependency
     :return: AuthorResponse object with the deleted author details
     """
-    return author_controller.delete_author(author_id)
\ No newline at end of file
+    return await author_controller.delete_author(author_id)
\ No newline at end of file
@@ -2,46 +2,63 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional, Dict
 
 from app.controllers.BookController import BookController
-from app.schema.BookSchema import BookResponse
+from app.schema.BookSchema import BookResponse, BookSuggestion, BookBatchResponse
 
 
 router = APIRouter(prefix="/books", tags=["Books"])
 
+# Maximum number of IDs accepted by /books/batch
+MAX_BATCH_BOOK_IDS = 300
+
 @router.get("/", response_model=Dict)
 async def get_books(
-    offset: int = Query(0, description="Offset for pagination"),
-    limit: int = Query(10, description="Limit for pagination"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    limit: int = Query(10, ge=1, le=100, description="Limit for pagination"),
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     author_id: Optional[int] = Query(None, description="Filter by author ID"),
     desc_price: bool = Query(None, description="Sort by price descending"),
     min_stars: Optional[int] = Query(None, description="Filter by minimum star rating (1-5)"),
+    min_price: Optional[float] = Query(None, ge=0, description="Filter by minimum current price"),
+    max_price: Optional[float] = Query(None, ge=0, description="Filter by maximum current price"),
+    use_cursor: bool = Query(False, description="Use cursor pagination instead of offset pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (cursor pagination)"),
+    include_total: bool = Query(False, description="Count total matching books (cursor pagination)"),
     book_controller: BookController = Depends(BookController),
 ):
     """
-    Get all books with optional filters for category, author, and minimum star rating.
+    Get all books with optional filters for category, author, minimum star rating and price range.
     :param offset: Offset for pagination
     :param limit: Page size
     :param category_id: Filter by category ID
     :param author_id: Filter by category ID
     :param desc_price: Sort by price descending
     :param min_stars: Filter by minimum star rating (1-5)
+    :param min_price: Filter by minimum current price
+    :param max_price: Filter by maximum current price
+    :param use_cursor: Use cursor pagination instead of offset pagination
+    :param cursor: next_cursor of the previous page
+    :param include_total: Count total matching books in cursor pagination
     :param book_controller: BookController dependency
-    :return: Dictionary containing page number, total books, and list of BookResponse objects
+    :return: Dictionary containing page number (or next cursor), total books, and list of BookResponse objects
     """
-    response = book_controller.get_all_books(
-        offset=offset, limit=limit, category_id=category_id, author_id=author_id, 
-        desc_price=desc_price, min_stars=min_stars
+    response = await book_controller.get_all_books(
+        offset=offset, limit=limit, category_id=category_id, author_id=author_id,
+        desc_price=desc_price, min_stars=min_stars, min_price=min_price, max_price=max_price,
+        use_cursor=use_cursor or cursor is not None, cursor=cursor, include_total=include_total
     )
     return response
 
 
 @router.get("/discounts", response_model=Dict)
 async def get_discount_books(
-    offset: int = Query(0, description="Offset for pagination"),
-    limit: int = Query(10, description="Limit for pagination"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    limit: int = Query(10, ge=1, le=100, description="Limit for pagination"),
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     author_id: Optional[int] = Query(None, description="Filter by author ID"),
     min_stars: Optional[int] = Query(None, description="Filter by minimum star rating (1-5)"),
+    use_cursor: bool = Query(False, description="Use cursor pagination instead of offset pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (cursor pagination)"),
+    include_total: bool = Query(False, description="Count total matching books (cursor pagination)"),
     book_controller: BookController = Depends(BookController),
 ):
     """
@@ -51,15 +68,21 @@ async def get_discount_books(
     :param category_id: Filter by category ID
     :param author_id: Filter by author ID
     :param min_stars: Filter by minimum star rating (1-5)
+    :param use_cursor: Use cursor pagination instead of offset pagination
+    :param cursor: next_cursor of the previous page
+    :param include_total: Count total matching books in cursor pagination
     :param book_controller: BookController dependency
-    :return: Dictionary containing page number, total books, and list of BookResponse objects
+    :return: Dictionary containing page number (or next cursor), total books, and list of BookResponse objects
     """
-    books = book_controller.get_discount_books(
+    books = await book_controller.get_discount_books(
         offset=offset,
         limit=limit,
         category_id=category_id,
         author_id=author_id,
         min_stars=min_stars,
+        use_cursor=use_cursor or cursor is not None,
+        cursor=cursor,
+        include_total=include_total,
     )
     return books
 
@@ -75,7 +98,7 @@ async def get_top_discounted_books(
     :param book_controller: BookController dependency
     :return: List of BookResponse objects with the highest discount amount
     """
-    books = book_controller.get_top_discounted_books(limit=limit)
+    books = await book_controller.get_top_discounted_books(limit=limit)
     return books
 
 
@@ -90,7 +113,7 @@ async def get_recommended_books(
     :param book_controller: BookController dependency
     :return: List of BookResponse objects
     """
-    books = book_controller.get_recommended_books(limit=limit)
+    books = await book_controller.get_recommended_books(limit=limit)
     return books
 
 
@@ -105,29 +128,79 @@ async def get_popular_books(
     :param book_controller: BookController dependency
     :return: List of BookResponse objects
     """
-    books = book_controller.get_popular_books(limit=limit)
+    books = await book_controller.get_popular_books(limit=limit)
     return books
 
 
-@router.get("/search", response_model=List[BookResponse])
+@router.get("/search", response_model=Dict)
 async def search_books(
     query: str,
-    offset: int = Query(0, description="Offset for pagination"),
-    limit: int = Query(10, description="Limit for pagination"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    limit: int = Query(10, ge=1, le=100, description="Limit for pagination"),
+    use_cursor: bool = Query(False, description="Use cursor pagination instead of offset pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (cursor pagination)"),
+    include_total: bool = Query(False, description="Count total matching books (cursor pagination)"),
     book_controller: BookController = Depends(BookController),
 ):
     """
-    Search for books by title or summary.
+    Search for books by title, author, category or summary, best matches first.
     :param query: Search query
     :param offset: Offset for pagination
     :param limit: Page size
+    :param use_cursor: Use cursor pagination instead of offset pagination
+    :param cursor: next_cursor of the previous page
+    :param include_total: Count total matching books in cursor pagination
     :param book_controller: BookController dependency
-    :return: List of BookResponse objects
+    :return: Dictionary containing page number (or next cursor), total books, and list of BookResponse objects
     """
-    books = book_controller.search_books(query_term=query, offset=offset, limit=limit)
+    books = await book_controller.search_books(
+        query_term=query,
+        offset=offset,
+        limit=limit,
+        use_cursor=use_cursor or cursor is not None,
+        cursor=cursor,
+        include_total=include_total,
+    )
     return books
 
 
+@router.get("/suggest", response_model=List[BookSuggestion])
+async def suggest_books(
+    query: str = Query(..., min_length=1, description="Text typed so far"),
+    limit: int = Query(10, ge=1, le=50, description="Number of suggestions to return"),
+    book_controller: BookController = Depends(BookController),
+):
+    """
+    Get search-as-you-type completions of book titles and author names.
+    :param query: Text typed so far
+    :param limit: Number of suggestions to return
+    :param book_controller: BookController dependency
+    :return: List of BookSuggestion objects
+    """
+    return book_controller.suggest(query_term=query, limit=limit)
+
+
+@router.get("/batch", response_model=BookBatchResponse)
+async def get_books_by_ids(
+    ids: str = Query(..., min_length=1, description=f"Comma-separated book IDs, up to {MAX_BATCH_BOOK_IDS}"),
+    book_controller: BookController = Depends(BookController),
+):
+    """
+    Get many books by their IDs in one request.
+    :param ids: Comma-separated book IDs
+    :param book_controller: BookController dependency
+    :return: BookBatchResponse object with the books in request order and the IDs not found
+    :raises HTTPException: If the IDs are malformed or too many
+    """
+    try:
+        book_ids = [int(book_id) for book_id in ids.split(",") if book_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not book_ids or len(book_ids) > MAX_BATCH_BOOK_IDS:
+        raise HTTPException(status_code=400, detail=f"Between 1 and {MAX_BATCH_BOOK_IDS} ids are accepted")
+    return await book_controller.get_books_by_ids(book_ids)
+
+
 @router.get("/{book_id}", response_model=BookResponse)
 async def get_book_by_id(
     book_id: int,
@@ -140,5 +213,5 @@ async def get_book_by_id(
     :return: BookResponse object
     :raises HTTPException: If the book with the given ID is not found
     """
-    book = book_controller.get_book_by_id(book_id)
+    book = await book_controller.get_book_by_id(book_id)
     return book
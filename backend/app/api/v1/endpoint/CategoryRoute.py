@@ -18,7 +18,7 @@ async def create_category(
     :param category_controller: CategoryController dependency
     :return: CategoryResponse object with the created category details
     """
-    return category_controller.create_category(category_data)
+    return await category_controller.create_category(category_data)
 
 
 @router.get("/", response_model=List[CategoryResponse])
@@ -30,7 +30,7 @@ async def get_categories(
     :param category_controller: CategoryController dependency
     :return: List of CategoryResponse objects
     """
-    return category_controller.get_category()
+    return await category_controller.get_category()
 
 
 @router.put("/{category_id}", response_model=CategoryResponse)
@@ -46,7 +46,7 @@ async def update_category(
     :param category_controller: CategoryController dependency
     :return: CategoryResponse object with the updated category details
     """
-    return category_controller.update_category(category_id, category_data)
+    return await category_controller.update_category(category_id, category_data)
 
 
 @router.delete("/{category_id}", response_model=CategoryResponse)
@@ -60,4 +60,4 @@ async def delete_category(
     :param category_controller: CategoryController dependency
     :return: CategoryResponse object with the deleted category details
     """
-    return category_controller.delete_category(category_id)
\ No newline at end of file
+    return await category_controller.delete_category(category_id)
\ No newline at end of file
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Body, Request
 from typing import List
 
 from app.controllers.OrderController import OrderController
-from app.schema.OrderSchema import OrderResponse, OrderCreate
+from app.schema.OrderSchema import OrderResponse, OrderCreate, OrderItemCreate, CartQuote
+from app.utils.middlewares.JWTMiddleware import admin_access
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
@@ -17,11 +18,42 @@ async def create_order(
     :param order_controller: OrderController dependency
     :return: OrderResponse object with the created order details
     """
-    print(order_data)
-    return order_controller.create_order(order_data)
+    return await order_controller.create_order(order_data)
 
 
-@router.get("/{order_id}", response_model=List[OrderResponse])
+@router.post("/batch", response_model=List[OrderResponse])
+@admin_access(admin_required=True)
+async def create_orders(
+    request: Request,
+    orders_data: List[OrderCreate] = Body(..., min_length=1, max_length=500),
+    order_controller: OrderController = Depends(OrderController),
+):
+    """
+    Create many orders at once, in a single transaction. (Administrator only)
+    The orders may belong to any user, so the endpoint is restricted to administrators.
+    :param request: Request with authenticated user
+    :param orders_data: List of OrderCreate objects (up to 500)
+    :param order_controller: OrderController dependency
+    :return: List of OrderResponse objects, in the order of the input
+    """
+    return await order_controller.create_orders(orders_data)
+
+
+@router.post("/quote", response_model=CartQuote)
+async def quote_cart(
+    items: List[OrderItemCreate] = Body(..., min_length=1, max_length=500),
+    order_controller: OrderController = Depends(OrderController),
+):
+    """
+    Price a cart at the current book prices, in one round trip.
+    :param items: Cart lines with book ID and quantity
+    :param order_controller: OrderController dependency
+    :return: CartQuote object with the unit and line prices and the order amount
+    """
+    return await order_controller.quote_cart(items)
+
+
+@router.get("/{order_id}", response_model=OrderResponse)
 async def get_orders(
     order_id: int,
     order_controller: OrderController = Depends(OrderController),
@@ -30,6 +62,6 @@ async def get_orders(
     Get order by id.
     :param order_id: ID of the order to retrieve
     :param order_controller: OrderController dependency
-    :return: List of OrderResponse objects
+    :return: OrderResponse object
     """
-    return order_controller.get_order_by_id(order_id=order_id)
\ No newline at end of file
+    return await order_controller.get_order_by_id(order_id=order_id)
\ No newline at end of file
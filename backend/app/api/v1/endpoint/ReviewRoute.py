@@ -26,8 +26,8 @@ async def get_book_reviews(
     :return: List of ReviewResponse objects
     """
     review_controller.set_book_id(book_id)
-    reviews = review_controller.get_book_reviews_list(offset=offset, limit=limit, rating_star=rating_star, is_desc=is_desc)
-    general_reviews_info = review_controller.get_book_rating_general()
+    reviews = await review_controller.get_book_reviews_list(offset=offset, limit=limit, rating_star=rating_star, is_desc=is_desc)
+    general_reviews_info = await review_controller.get_book_rating_general()
     response = {
         "book_id": book_id,
         "reviews": reviews,
@@ -50,5 +50,5 @@ async def create_review(
     :return: Created ReviewResponse object
     """
     review_controller.set_book_id(review.book_id)
-    created_review = review_controller.add_review(review)
+    created_review = await review_controller.add_review(review)
     return created_review
@@ -22,7 +22,7 @@ async def create_user(
     :param user_controller: UserController dependency
     :return: UserResponse object with the created user's details
     """
-    return user_controller.create_user(user_data)
+    return await user_controller.create_user(user_data)
 
 
 @router.get("/me", response_model=UserResponse)
@@ -49,7 +49,7 @@ async def get_current_user_by_id(
     :param user_controller: UserController dependency
     :return: UserResponse object with the user's details
     """
-    return user_controller.get_user_by_id(user_id=user_id)
+    return await user_controller.get_user_by_id(user_id=user_id)
 
 
 @router.get("/", response_model=List[UserResponse])
@@ -62,7 +62,7 @@ async def get_all_user(
     Get all users in the database. (Administrator only)
     :return: List of UserResponse objects with all users' details
     """
-    return user_controller.get_all_users()
+    return await user_controller.get_all_users()
 
 
 @router.put("/me", response_model=UserResponse)
@@ -79,7 +79,7 @@ async def update_current_user(
     :return: UserResponse object with the updated user's details
     """
     current_user = request.state.user
-    return user_controller.update_user(
+    return await user_controller.update_user(
         user_id=current_user.id,
         old_password=user_data.old_password,
         data=user_data
@@ -102,7 +102,7 @@ async def update_current_user_password(
     :return: UserResponse object with the updated user's details
     """
     current_user = request.state.user
-    return user_controller.update_password(
+    return await user_controller.update_password(
         user_id=current_user.id,
         old_password=old_password,
         new_password=new_password
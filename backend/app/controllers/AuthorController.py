@@ -1,41 +1,45 @@
 from fastapi import Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 
+from app.controllers.BookController import book_suggest_index
+from app.db.search import get_search_backend
 from app.db.session import get_session
-from app.models import AuthorModel
+from app.models import AuthorModel, BookModel
 from app.schema.AuthorSchema import AuthorResponse, AuthorCreate, AuthorUpdate
 
 
 class AuthorController:
-    def __init__(self, db: Session = Depends(get_session)):
+    def __init__(self, db: AsyncSession = Depends(get_session)):
         self.db = db
 
-    def _check_existing_author(self, author_name: str) -> bool:
+    async def _check_existing_author(self, author_name: str) -> bool:
         """
         Check if an author with the given name already exists in the database.
         :param author_name: Name of the author to check
         :return: True if author exists, False otherwise
         """
-        existing_author = self.db.exec(
+        existing_author = (await self.db.exec(
             select(AuthorModel).where(AuthorModel.author_name == author_name)
-        ).first()
+        )).first()
         return existing_author is not None
 
 
-    def create_author(self, author_data: AuthorCreate) -> AuthorResponse:
+    async def create_author(self, author_data: AuthorCreate) -> AuthorResponse:
         """
         Create a new author in the database.
         :param author_data: AuthorCreate object containing author details
         :return: AuthorResponse object with the created author details
         """
-        if self._check_existing_author(author_data.author_name):
+        if await self._check_existing_author(author_data.author_name):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Author already exists")
 
         new_author = AuthorModel(**author_data.model_dump())
         self.db.add(new_author)
-        self.db.commit()
-        self.db.refresh(new_author)
+        await self.db.commit()
+        await self.db.refresh(new_author)
+        book_suggest_index.upsert("author", new_author.id, new_author.author_name)
         return AuthorResponse(
             id=new_author.id,
             author_name=new_author.author_name,
@@ -43,12 +47,12 @@ class AuthorController:
         )
 
 
-    def get_author(self) -> List[AuthorResponse]:
+    async def get_author(self) -> List[AuthorResponse]:
         """
         Get all authors.
         :return: List of AuthorResponse objects
         """
-        authors = self.db.exec(select(AuthorModel)).all()
+        authors = (await self.db.exec(select(AuthorModel))).all()
         return [
             AuthorResponse(
                 id=author.id,
@@ -59,23 +63,29 @@ class AuthorController:
         ]
 
 
-    def update_author(self, author_id: int, author_data: AuthorUpdate) -> AuthorResponse:
+    async def update_author(self, author_id: int, author_data: AuthorUpdate) -> AuthorResponse:
         """
         Update an existing author in the database.
         :param author_id: Author ID to update
         :param author_data: AuthorUpdate object containing updated author details
         :return: AuthorResponse object with the updated author details
         """
-        author = self.db.get(AuthorModel, author_id)
+        author = await self.db.get(AuthorModel, author_id)
         if not author:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Author not found")
-        if author_data.author_name != author.author_name and self._check_existing_author(author_data.author_name):
+        if author_data.author_name != author.author_name and await self._check_existing_author(author_data.author_name):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Author already exists")
 
         author.author_name = author_data.author_name
         author.author_bio = author_data.author_bio
-        self.db.commit()
-        self.db.refresh(author)
+        await self.db.flush()
+
+        # The author name is part of the search documents of their books
+        search_backend = get_search_backend(self.db.bind.dialect.name)
+        await self.db.run_sync(search_backend.reindex_books, BookModel.author_id == author_id)
+        await self.db.commit()
+        await self.db.refresh(author)
+        book_suggest_index.upsert("author", author.id, author.author_name)
         return AuthorResponse(
             id=author.id,
             author_name=author.author_name,
@@ -83,14 +93,15 @@ class AuthorController:
         )
 
 
-    def delete_author(self, author_id: int) -> None:
+    async def delete_author(self, author_id: int) -> None:
         """
         Delete an author from the database.
         :param author_id: Author ID to delete
         :return:
         """
-        author = self.db.get(AuthorModel, author_id)
+        author = await self.db.get(AuthorModel, author_id)
         if not author:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Author not found")
-        self.db.delete(author)
-        self.db.commit()
\ No newline at end of file
+        await self.db.delete(author)
+        await self.db.commit()
+        book_suggest_index.remove("author", author_id)
\ No newline at end of file
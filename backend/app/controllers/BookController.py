@@ -1,151 +1,183 @@
 from fastapi import Depends, HTTPException
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional, Dict
 from datetime import date
-from sqlalchemy import select, and_, or_, func
-from sqlmodel import Session, SQLModel
+from decimal import Decimal
+from sqlalchemy import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models import BookModel, AuthorModel, DiscountModel, CategoryModel, ReviewModel
-from app.schema.BookSchema import BookResponse
+from app.models import BookModel, AuthorModel, ActiveDiscountModel, CategoryModel, BookRatingStatsModel
+from app.schema.BookSchema import BookResponse, BookSuggestion
+from app.core.config import settings
+from app.db.search import get_search_backend
 from app.db.session import get_session
+from app.db.table_versions import get_table_versions
+from app.utils.cache import TTLCache
+from app.utils.pagination import paginate
+from app.utils.prefix_index import PrefixIndex
+
+
+# Home page carousels give the same answer to every visitor, so they are cached in-process.
+# Entries are dropped when reviews or discounts are written, the TTL bounds staleness otherwise.
+book_carousel_cache = TTLCache(
+    maxsize=settings.BOOK_CAROUSEL_CACHE_SIZE,
+    ttl=settings.BOOK_CAROUSEL_CACHE_TTL_SECONDS,
+)
+
+# Search-as-you-type suggestions over book titles and author names are served from memory.
+book_suggest_index = PrefixIndex()
+# Versions of the book and author tables the suggest index was last loaded at
+book_suggest_versions: Dict[str, int] = {}
 
 
 class BookController:
-    def __init__(self, db: Session = Depends(get_session)):
+    def __init__(self, db: AsyncSession = Depends(get_session)):
         self.db = db
 
-    def _build_book_response(self, book: tuple) -> BookResponse:
-        """Helper function to build a BookResponse object."""
-        book_id, book_title, book_summary, book_price, book_cover_photo, author_name, category_name = book[:7]
-        today = date.today()
-
-        # Query all active discounts for the book
-        discount_query = select(DiscountModel).where(
-            and_(
-                DiscountModel.book_id == book_id,
-                DiscountModel.discount_start_date <= today,
-                DiscountModel.discount_end_date >= today,
-            )
+    @staticmethod
+    def _build_book_response(book) -> BookResponse:
+        """Helper function to build a BookResponse object from a book row."""
+        return BookResponse(
+            id=book.id,
+            book_title=book.book_title,
+            book_summary=book.book_summary,
+            original_price=book.book_price,
+            current_price=book.current_price,
+            book_cover_photo=book.book_cover_photo,
+            author_name=book.author_name,
+            category_name=book.category_name
         )
-        discounts = self.db.exec(discount_query).scalars().all()
 
-        # Find the lowest price among all active discounts
-        current_price = book_price
-        if discounts:
-            discount_prices = [discount.discount_price for discount in discounts]
-            current_price = min(discount_prices)
+    @staticmethod
+    def _get_effective_price_expr():
+        """
+        Helper function to get the effective price of a book as a SQL expression.
+        It is book_price lowered by the lowest active discount, materialized in book.effective_price by the
+        active discounts projection and indexed with the id, so price sorted pages are read in index order.
+        """
+        return BookModel.effective_price
 
-        return BookResponse(
-            id=book_id,
-            book_title=book_title,
-            book_summary=book_summary,
-            original_price=book_price,
-            current_price=current_price,
-            book_cover_photo=book_cover_photo,
-            author_name=author_name,
-            category_name=category_name
+    @classmethod
+    def _get_book_columns(cls) -> tuple:
+        """Helper function to get the columns needed to build a BookResponse."""
+        return (
+            BookModel.id,
+            BookModel.book_title,
+            BookModel.book_summary,
+            BookModel.book_price,
+            BookModel.book_cover_photo,
+            AuthorModel.author_name,
+            CategoryModel.category_name,
+            cls._get_effective_price_expr().label("current_price"),
         )
 
-    @staticmethod
-    def _get_base_book_query():
+    @classmethod
+    def _get_base_book_query(cls):
         """Helper function to get the base book query with author join."""
         return (
-            select(
-                BookModel.id,
-                BookModel.book_title,
-                BookModel.book_summary,
-                BookModel.book_price,
-                BookModel.book_cover_photo,
-                AuthorModel.author_name,
-                CategoryModel.category_name
-            )
+            select(*cls._get_book_columns())
             .join(AuthorModel, BookModel.author_id == AuthorModel.id)
             .join(CategoryModel, BookModel.category_id == CategoryModel.id)
         )
 
-    def get_all_books(
+    @staticmethod
+    def _apply_min_stars(query, min_stars: int):
+        """
+        Helper function to keep only books whose average rating is at least min_stars.
+        The average is compared as star_sum >= min_stars * review_count on book_rating_stats.
+        """
+        return query.join(
+            BookRatingStatsModel, BookModel.id == BookRatingStatsModel.book_id
+        ).where(
+            BookRatingStatsModel.review_count > 0,
+            BookRatingStatsModel.star_sum >= min_stars * BookRatingStatsModel.review_count,
+        )
+
+    async def _paginate(self, query, **options) -> Dict:
+        """
+        Helper function to fetch one page of books with its total, see paginate.
+        :param query: Book query with all filters applied
+        :param options: offset, limit, sort and cursor options of paginate
+        :return: Dictionary containing the page of BookResponse objects and pagination info
+        """
+        return await paginate(self.db, query, BookModel.id, self._build_book_response, **options)
+
+    async def _get_carousel(self, key: tuple, build_query: Callable) -> List[BookResponse]:
+        """
+        Helper function to serve a home page carousel through book_carousel_cache.
+        :param key: cache key of the carousel
+        :param build_query: function building the carousel query, only called on a cache miss
+        :return: List of BookResponse objects
+        """
+        # The current price depends on the day, so the date is part of the key
+        cache_key = (*key, date.today())
+        books = book_carousel_cache.get(cache_key)
+        if books is None:
+            rows = (await self.db.exec(build_query())).all()
+            books = [self._build_book_response(row) for row in rows]
+            book_carousel_cache.set(cache_key, books)
+        return list(books)
+
+    async def get_all_books(
             self,
             offset: int = 0,
             limit: int = 100,
             category_id: Optional[int] = None,
             author_id: Optional[int] = None,
             desc_price: Optional[bool] = None,
-            min_stars: Optional[int] = None
+            min_stars: Optional[int] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            use_cursor: bool = False,
+            cursor: Optional[str] = None,
+            include_total: bool = True
     ) -> Dict:
         """
-        Get all books with optional filters for category, author, and minimum star rating.
+        Get all books with optional filters for category, author, minimum star rating and price range.
         :param offset: Book offset for pagination
         :param limit: page size
         :param category_id: filter by category id
         :param author_id: filter by author id
-        :param desc_price: sort by price descending
+        :param desc_price: sort by effective price, descending if True and ascending if False
         :param min_stars: filter by minimum star rating
-        :return: Dictionary containing page number, total books, and list of BookResponse objects
+        :param min_price: filter by minimum effective price
+        :param max_price: filter by maximum effective price
+        :param use_cursor: use keyset pagination and return next_cursor
+        :param cursor: cursor of the page to fetch in cursor mode
+        :param include_total: count the total number of matching books in cursor mode
+        :return: Dictionary containing page number (or next cursor), total books, and list of BookResponse objects
         """
         base_query = self._get_base_book_query()
-        count_query = select(func.count()).select_from(BookModel)
-        
+        effective_price = self._get_effective_price_expr()
+
         # Apply basic filters
         if category_id:
             base_query = base_query.where(BookModel.category_id == category_id)
-            count_query = count_query.where(BookModel.category_id == category_id)
         if author_id:
             base_query = base_query.where(BookModel.author_id == author_id)
-            count_query = count_query.where(BookModel.author_id == author_id)
+        if min_price is not None:
+            base_query = base_query.where(effective_price >= min_price)
+        if max_price is not None:
+            base_query = base_query.where(effective_price <= max_price)
             
-        # If star rating filter is applied, we need a different approach
+        # Filter by average rating using the precomputed rating stats
         if min_stars is not None:
-            # Get books with specified minimum average rating
-            rated_books_subquery = (
-                select(
-                    ReviewModel.book_id,
-                    func.avg(ReviewModel.rating_star).label("avg_rating")
-                )
-                .group_by(ReviewModel.book_id)
-                .having(func.avg(ReviewModel.rating_star) >= min_stars)
-                .subquery()
-            )
-            
-            # Add the star rating filter to the main query
-            base_query = base_query.join(
-                rated_books_subquery,
-                BookModel.id == rated_books_subquery.c.book_id
-            )
-            
-            # Also update the count query to reflect the star rating filter
-            count_query = (
-                select(func.count(BookModel.id.distinct()))
-                .select_from(BookModel)
-                .join(
-                    rated_books_subquery,
-                    BookModel.id == rated_books_subquery.c.book_id
-                )
-            )
-            
-            # Reapply the other filters to the count query
-            if category_id:
-                count_query = count_query.where(BookModel.category_id == category_id)
-            if author_id:
-                count_query = count_query.where(BookModel.author_id == author_id)
-
-        # Execute the count query to get total books matching filters
-        total = self.db.exec(count_query).scalar_one()
-        
-        # Execute the main query to fetch books
-        books = self.db.exec(base_query.order_by(BookModel.id).offset(offset).limit(limit)).all()
-        
-        page_num = offset // limit + 1
-        data = [self._build_book_response(book) for book in books]
-
-        if desc_price is not None:
-            data.sort(key=lambda x: x.current_price, reverse=desc_price)
+            base_query = self._apply_min_stars(base_query, min_stars)
 
-        return {
-            "page_num": page_num,
-            "total": total,
-            "data": data,
-        }
+        # Sort by effective price in the database so ordering holds across pages
+        sort_by_price = desc_price is not None
+        return await self._paginate(
+            base_query,
+            offset=offset,
+            limit=limit,
+            sort_expr=effective_price if sort_by_price else None,
+            sort_attr="current_price" if sort_by_price else None,
+            descending=bool(desc_price),
+            use_cursor=use_cursor,
+            cursor=cursor,
+            include_total=include_total,
+        )
 
-    def get_book_by_id(self, book_id: int) -> Optional[BookResponse]:
+    async def get_book_by_id(self, book_id: int) -> Optional[BookResponse]:
         """
         Get a book by its ID.
         :param book_id: The ID of the book to retrieve.
@@ -153,20 +185,37 @@ class BookController:
         :raises HTTPException: If the book with the given ID is not found.
         """
         query = self._get_base_book_query().where(BookModel.id == book_id)
-        book = self.db.exec(query).first()
+        book = (await self.db.exec(query)).first()
 
         if not book:
             raise HTTPException(status_code=404, detail="Book not found")
 
         return self._build_book_response(book)
 
-    def get_discount_books(
+    async def get_books_by_ids(self, book_ids: List[int]) -> Dict:
+        """
+        Get many books by their IDs with one query.
+        :param book_ids: IDs of the books, a repeated ID is returned once
+        :return: Dictionary with the books found, in request order, and the IDs not found
+        """
+        book_ids = list(dict.fromkeys(book_ids))
+        query = self._get_base_book_query().where(BookModel.id.in_(book_ids))
+        books = {book.id: self._build_book_response(book) for book in (await self.db.exec(query)).all()}
+        return {
+            "data": [books[book_id] for book_id in book_ids if book_id in books],
+            "missing": [book_id for book_id in book_ids if book_id not in books],
+        }
+
+    async def get_discount_books(
             self,
             offset: int = 0,
             limit: int = 100,
             category_id: Optional[int] = None,
             author_id: Optional[int] = None,
-            min_stars: Optional[int] = None
+            min_stars: Optional[int] = None,
+            use_cursor: bool = False,
+            cursor: Optional[str] = None,
+            include_total: bool = True
     ) -> Dict:
         """
         Get all books that are currently on discount.
@@ -175,222 +224,198 @@ class BookController:
         :param category_id: filter by category id
         :param author_id: filter by author id
         :param min_stars: filter by minimum star rating
-        :return: Dictionary containing page number, total books, and list of BookResponse objects
+        :param use_cursor: use keyset pagination and return next_cursor
+        :param cursor: cursor of the page to fetch in cursor mode
+        :param include_total: count the total number of matching books in cursor mode
+        :return: Dictionary containing page number (or next cursor), total books, and list of BookResponse objects
         """
-        today = date.today()
-
-        discount_query = (
-            select(DiscountModel.book_id)
-            .where(
-                and_(
-                    DiscountModel.discount_start_date <= today,
-                    DiscountModel.discount_end_date >= today,
-                )
-            )
-            .distinct()
-        )
-        discounted_book_ids = [row[0] for row in self.db.exec(discount_query).all()]
-        if not discounted_book_ids:
-            return {
-                "total": 0,
-                "page_num": offset // limit + 1,
-                "data": [],
-            }
-
-        # Build the book query with the discounted book IDs
-        query = self._get_base_book_query().where(BookModel.id.in_(discounted_book_ids))
-        count_query = select(func.count(BookModel.id.distinct())).where(BookModel.id.in_(discounted_book_ids))
+        # Books on discount are the rows of the active_discount projection, joined in the page statement
+        query = self._get_base_book_query().join(ActiveDiscountModel, BookModel.id == ActiveDiscountModel.book_id)
 
         # Apply category and author filters
         if category_id:
             query = query.where(BookModel.category_id == category_id)
-            count_query = count_query.where(BookModel.category_id == category_id)
         if author_id:
             query = query.where(BookModel.author_id == author_id)
-            count_query = count_query.where(BookModel.author_id == author_id)
             
         # Apply star rating filter if provided
         if min_stars is not None:
-            rated_books_subquery = (
-                select(
-                    ReviewModel.book_id,
-                    func.avg(ReviewModel.rating_star).label("avg_rating")
-                )
-                .group_by(ReviewModel.book_id)
-                .having(func.avg(ReviewModel.rating_star) >= min_stars)
-                .subquery()
-            )
-            
-            query = query.join(
-                rated_books_subquery,
-                BookModel.id == rated_books_subquery.c.book_id
-            )
-            
-            count_query = (
-                count_query.join(
-                    rated_books_subquery,
-                    BookModel.id == rated_books_subquery.c.book_id
-                )
-            )
+            query = self._apply_min_stars(query, min_stars)
 
-        # Execute queries
-        total = self.db.exec(count_query).scalar_one()
-        books = self.db.exec(query.order_by(BookModel.id).offset(offset).limit(limit)).all()
-        data = [self._build_book_response(book) for book in books]
-
-        page_num = offset // limit + 1
-        return {
-            "page_num": page_num,
-            "total": total,
-            "data": data,
-        }
+        return await self._paginate(
+            query,
+            offset=offset,
+            limit=limit,
+            use_cursor=use_cursor,
+            cursor=cursor,
+            include_total=include_total,
+        )
 
-    def search_books(self, query_term: str, offset: int = 0, limit: int = 100) -> Dict:
+    async def search_books(
+            self,
+            query_term: str,
+            offset: int = 0,
+            limit: int = 100,
+            use_cursor: bool = False,
+            cursor: Optional[str] = None,
+            include_total: bool = True
+    ) -> Dict:
         """
-        Search for books by title or author name.
-        :param query_term: Book title or author name to search for
+        Search for books by title, author, category or summary, best matches first.
+        :param query_term: Search term, every word is matched as a prefix
         :param offset: Book offset for pagination
         :param limit: page size
-        :return: Dictionary containing page number, total books, and list of BookResponse objects
+        :param use_cursor: use keyset pagination and return next_cursor
+        :param cursor: cursor of the page to fetch in cursor mode
+        :param include_total: count the total number of matching books in cursor mode
+        :return: Dictionary containing page number (or next cursor), total books, and list of BookResponse objects
         """
-        pattern = f"%{query_term}%"
-        query = self._get_base_book_query().where(
-            or_(
-                BookModel.book_title.ilike(pattern),
-                AuthorModel.author_name.ilike(pattern),
+        search_backend = get_search_backend(self.db.bind.dialect.name)
+
+        async def search_page(apply) -> Dict:
+            query, rank = apply(self._get_base_book_query(), query_term)
+            return await self._paginate(
+                query.add_columns(rank.label("search_rank")),
+                offset=offset,
+                limit=limit,
+                sort_expr=rank,
+                sort_attr="search_rank",
+                sort_type=float,
+                descending=True,
+                use_cursor=use_cursor,
+                cursor=cursor,
+                include_total=include_total,
+                window_count=search_backend.window_count,
             )
-        ).offset(offset).limit(limit)
 
-        books = self.db.exec(query).all()
-        data = [self._build_book_response(book) for book in books]
+        # Ranked full-text match first, fuzzy matching only when it finds nothing (e.g. typos)
+        if offset == 0 and not cursor:
+            page = await search_page(search_backend.apply_search)
+            if page["data"]:
+                return page
+            return await search_page(search_backend.apply_fallback)
 
-        # Get total count for pagination
-        count_query = select(func.count()).select_from(BookModel).join(
-            AuthorModel, BookModel.author_id == AuthorModel.id
-        ).where(
-            or_(
-                BookModel.book_title.ilike(pattern),
-                AuthorModel.author_name.ilike(pattern),
-            )
+        # Later pages must be read in the mode of the first one, which used the fallback only without any full-text match
+        match_query, _ = search_backend.apply_search(
+            select(BookModel.id).join(AuthorModel, BookModel.author_id == AuthorModel.id), query_term
         )
-        total = self.db.exec(count_query).scalar_one()
+        if (await self.db.exec(match_query.limit(1))).first() is not None:
+            return await search_page(search_backend.apply_search)
+        return await search_page(search_backend.apply_fallback)
 
-        page_num = offset // limit + 1
-        return {
-            "page_num": page_num,
-            "total": total,
-            "data": data,
-        }
+    async def get_book_prices(self, book_ids: List[int]) -> Dict[int, Decimal]:
+        """
+        Get the current price of many books in one query.
+        :param book_ids: IDs of the books
+        :return: Dictionary of book ID to current price, books not found are left out
+        """
+        if not book_ids:
+            return {}
+        query = select(
+            BookModel.id,
+            self._get_effective_price_expr().label("current_price"),
+        ).where(BookModel.id.in_(set(book_ids)))
+        rows = (await self.db.exec(query)).all()
+        return {row.id: row.current_price for row in rows}
 
-    def get_book_price(self, book_id: int, quantity: int) -> Dict:
+    async def get_book_price(self, book_id: int, quantity: int) -> Dict:
         """
         Get the price of a book by its ID and quantity.
         :param book_id: The ID of the book
         :param quantity: The quantity of the book
         :return: The total price of the book
         """
-        query = self._get_base_book_query().where(BookModel.id == book_id)
-        book = self.db.exec(query).first()
-        if not book:
+        prices = await self.get_book_prices([book_id])
+        if book_id not in prices:
             raise HTTPException(status_code=404, detail="Book not found")
 
-        book = self._build_book_response(book)
-        total_price = book.current_price * quantity
+        total_price = prices[book_id] * quantity
         return {
             "book_id": book_id,
             "quantity": quantity,
             "total_price": total_price,
         }
 
-    def get_recommended_books(self, limit: int = 8) -> List[BookResponse]:
+    async def get_recommended_books(self, limit: int = 8) -> List[BookResponse]:
         """
         Get recommended books based on highest average rating and lowest price.
         :param limit: Number of books to return (default 8)
         :return: List of BookResponse objects
         """
-        query = (
-            select(
-                BookModel.id,
-                BookModel.book_title,
-                BookModel.book_summary,
-                BookModel.book_price,
-                BookModel.book_cover_photo,
-                AuthorModel.author_name,
-                CategoryModel.category_name,
-                func.avg(ReviewModel.rating_star).label("avg_rating"),
+        def build_query():
+            return (
+                self._get_base_book_query()
+                .join(BookRatingStatsModel, BookModel.id == BookRatingStatsModel.book_id)
+                .where(BookRatingStatsModel.review_count > 0)
+                .order_by(
+                    (BookRatingStatsModel.star_sum / BookRatingStatsModel.review_count).desc(),
+                    BookModel.book_price.asc()
+                )
+                .limit(limit)
             )
-            .join(ReviewModel, BookModel.id == ReviewModel.book_id)
-            .join(AuthorModel, BookModel.author_id == AuthorModel.id)
-            .join(CategoryModel, BookModel.category_id == CategoryModel.id)
-            .group_by(BookModel.id, AuthorModel.author_name, CategoryModel.category_name)
-            .order_by(func.avg(ReviewModel.rating_star).desc(), BookModel.book_price.asc())
-            .limit(limit)
-        )
 
-        books = self.db.exec(query).all()
-        return [self._build_book_response(book) for book in books]
+        return await self._get_carousel(("recommended", limit), build_query)
 
-    def get_popular_books(self, limit: int = 8) -> List[BookResponse]:
+    async def get_popular_books(self, limit: int = 8) -> List[BookResponse]:
         """
         Get popular books based on most reviews and lowest price.
         :param limit: Number of books to return (default 8)
         :return: List of BookResponse objects
         """
-        query = (
-            select(
-                BookModel.id,
-                BookModel.book_title,
-                BookModel.book_summary,
-                BookModel.book_price,
-                BookModel.book_cover_photo,
-                AuthorModel.author_name,
-                CategoryModel.category_name,
-                func.count(ReviewModel.id).label("review_count"),
+        def build_query():
+            return (
+                self._get_base_book_query()
+                .join(BookRatingStatsModel, BookModel.id == BookRatingStatsModel.book_id)
+                .where(BookRatingStatsModel.review_count > 0)
+                .order_by(BookRatingStatsModel.review_count.desc(), BookModel.book_price.asc())
+                .limit(limit)
             )
-            .join(ReviewModel, BookModel.id == ReviewModel.book_id)
-            .join(AuthorModel, BookModel.author_id == AuthorModel.id)
-            .join(CategoryModel, BookModel.category_id == CategoryModel.id)
-            .group_by(BookModel.id, AuthorModel.author_name, CategoryModel.category_name)
-            .order_by(func.count(ReviewModel.id).desc(), BookModel.book_price.asc())
-            .limit(limit)
-        )
 
-        books = self.db.exec(query).all()
-        return [self._build_book_response(book) for book in books]
+        return await self._get_carousel(("popular", limit), build_query)
         
-    def get_top_discounted_books(self, limit: int = 10) -> List[BookResponse]:
+    async def get_top_discounted_books(self, limit: int = 10) -> List[BookResponse]:
         """
         Get books with the highest discount amount (book_price - discount_price).
         :param limit: Number of books to return (default 10)
         :return: List of BookResponse objects
         """
-        today = date.today()
-        
-        # Query to find books with active discounts and calculate the discount amount
-        query = (
-            select(
-                BookModel.id,
-                BookModel.book_title,
-                BookModel.book_summary,
-                BookModel.book_price,
-                BookModel.book_cover_photo,
-                AuthorModel.author_name,
-                CategoryModel.category_name,
-                (BookModel.book_price - func.min(DiscountModel.discount_price)).label("discount_amount")
-            )
-            .join(DiscountModel, BookModel.id == DiscountModel.book_id)
-            .join(AuthorModel, BookModel.author_id == AuthorModel.id)
-            .join(CategoryModel, BookModel.category_id == CategoryModel.id)
-            .where(
-                and_(
-                    DiscountModel.discount_start_date <= today,
-                    DiscountModel.discount_end_date >= today,
-                )
+        def build_query():
+            discount_amount = BookModel.book_price - ActiveDiscountModel.discount_price
+            return (
+                self._get_base_book_query()
+                .add_columns(discount_amount.label("discount_amount"))
+                .join(ActiveDiscountModel, BookModel.id == ActiveDiscountModel.book_id)
+                .order_by(discount_amount.desc(), BookModel.id)
+                .limit(limit)
             )
-            .group_by(BookModel.id, AuthorModel.author_name, CategoryModel.category_name)
-            .order_by((BookModel.book_price - func.min(DiscountModel.discount_price)).desc())
-            .limit(limit)
-        )
-        
-        books = self.db.exec(query).all()
-        return [self._build_book_response(book) for book in books]
\ No newline at end of file
+
+        return await self._get_carousel(("top_discounted", limit), build_query)
+
+    def suggest(self, query_term: str, limit: int = 10) -> List[BookSuggestion]:
+        """
+        Get search-as-you-type completions of book titles and author names.
+        Served from book_suggest_index without touching the database.
+        :param query_term: Text typed so far
+        :param limit: Number of suggestions to return (default 10)
+        :return: List of BookSuggestion objects
+        """
+        return [BookSuggestion(**suggestion) for suggestion in book_suggest_index.search(query_term, limit)]
+
+    async def refresh_suggest_index(self, full: bool = False) -> None:
+        """
+        Load book titles and author names into book_suggest_index.
+        The index is rebuilt when the book or author table changed since the last refresh, so books and
+        authors added, renamed or deleted by other processes show up within one refresh interval.
+        :param full: Rebuild the index even if the tables did not change
+        """
+        versions = await get_table_versions(self.db, ("book", "author"))
+        if not full and versions == book_suggest_versions:
+            return
+
+        books = (await self.db.exec(select(BookModel.id, BookModel.book_title))).all()
+        authors = (await self.db.exec(select(AuthorModel.id, AuthorModel.author_name))).all()
+        items = [("book", book.id, book.book_title) for book in books if book.book_title]
+        items += [("author", author.id, author.author_name) for author in authors if author.author_name]
+        book_suggest_index.rebuild(items)
+        book_suggest_versions.clear()
+        book_suggest_versions.update(versions)
@@ -1,9 +1,16 @@
-from fastapi import  Depends, HTTPException
-from sqlmodel import Session
+from fastapi import  Depends, HTTPException, status
+from sqlalchemy import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List
 
+from app.controllers.BookController import BookController
 from app.models.OrderModel import OrderModel, OrderItemModel
-from app.schema.OrderSchema import OrderItemSchema, OrderResponse, OrderCreate
+from app.schema.OrderSchema import (
+    OrderItemSchema, OrderItemCreate, OrderResponse, OrderCreate, CartQuoteItem, CartQuote
+)
 from app.db.session import get_session
 
 
@@ -12,64 +19,147 @@ class OrderController:
     Order Controller
     """
 
-    def __init__(self, db: Session = Depends(get_session)):
+    def __init__(self, db: AsyncSession = Depends(get_session)):
         self.db = db
 
-    def create_order(self, order: OrderCreate) -> OrderResponse:
-        # Create the order first
-        new_order = OrderModel(
-            user_id=order.user_id,
-            order_date=datetime.now(timezone.utc),
-            order_amount=order.order_amount
+    @staticmethod
+    def _price_cart(items: List[OrderItemCreate], prices: Dict[int, Decimal]) -> CartQuote:
+        """
+        Helper function to price cart lines with the current book prices.
+        :param items: Cart lines
+        :param prices: Dictionary of book ID to current price, as returned by BookController.get_book_prices
+        :return: CartQuote object
+        :raises HTTPException: If a book does not exist
+        """
+        missing_ids = sorted({item.book_id for item in items} - prices.keys())
+        if missing_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Books not found: {missing_ids}"
+            )
+
+        lines = []
+        order_amount = Decimal("0")
+        for item in items:
+            total_price = prices[item.book_id] * item.quantity
+            order_amount += total_price
+            lines.append(
+                CartQuoteItem(
+                    book_id=item.book_id,
+                    quantity=item.quantity,
+                    unit_price=prices[item.book_id],
+                    total_price=total_price
+                )
+            )
+        return CartQuote(order_items=lines, order_amount=order_amount)
+
+    async def quote_cart(self, items: List[OrderItemCreate]) -> CartQuote:
+        """
+        Price a cart with one price lookup for all of its books.
+        :param items: Cart lines
+        :return: CartQuote object with the unit and line prices and the order amount
+        """
+        prices = await BookController(self.db).get_book_prices([item.book_id for item in items])
+        return self._price_cart(items, prices)
+
+    async def _insert_orders(self, orders: List[OrderCreate]) -> List[OrderResponse]:
+        """
+        Write orders and their items in one transaction.
+        The orders are written with one multi-row INSERT ... RETURNING, then the items of every order with another.
+        Returned order IDs follow the input order (sort_by_parameter_order), which SQLite only honours row by row.
+        Items are priced by the server, with one price lookup for the books of every order.
+        The order amount sent by the client is advisory, the orders are written with the server total.
+        :param orders: List of OrderCreate objects
+        :return: List of OrderResponse objects, in the order of the input
+        :raises HTTPException: If a book does not exist
+        """
+        prices = await BookController(self.db).get_book_prices(
+            [item.book_id for order in orders for item in order.order_items]
         )
+        quotes = [self._price_cart(order.order_items, prices) for order in orders]
 
-        # Add and commit to get the ID
-        self.db.add(new_order)
-        self.db.commit()
-        self.db.refresh(new_order)
-
-        new_order_items = []
-        for item in order.order_items:
-            new_order_item = OrderItemModel(
-                order_id=new_order.id,
-                book_id=item.book_id,
-                quantity=item.quantity,
-                price=item.price
+        order_date = datetime.now(timezone.utc)
+        order_rows = (await self.db.exec(
+            insert(OrderModel).returning(
+                OrderModel.id,
+                OrderModel.user_id,
+                OrderModel.order_date,
+                OrderModel.order_amount,
+                sort_by_parameter_order=True
+            ),
+            params=[
+                {"user_id": order.user_id, "order_date": order_date, "order_amount": quote.order_amount}
+                for order, quote in zip(orders, quotes)
+            ]
+        )).all()
+
+        item_params = [
+            {"order_id": order_row.id, "book_id": item.book_id, "quantity": item.quantity, "price": item.unit_price}
+            for quote, order_row in zip(quotes, order_rows)
+            for item in quote.order_items
+        ]
+        items_by_order = {order_row.id: [] for order_row in order_rows}
+        if item_params:
+            # Item rows carry their order_id, so they need no parameter ordering and batch on every backend
+            item_rows = (await self.db.exec(
+                insert(OrderItemModel).returning(
+                    OrderItemModel.order_id,
+                    OrderItemModel.book_id,
+                    OrderItemModel.quantity,
+                    OrderItemModel.price
+                ),
+                params=item_params
+            )).all()
+            for item_row in item_rows:
+                items_by_order[item_row.order_id].append(
+                    OrderItemSchema(
+                        book_id=item_row.book_id,
+                        quantity=item_row.quantity,
+                        price=item_row.price
+                    )
+                )
+
+        await self.db.commit()
+
+        return [
+            OrderResponse(
+                id=order_row.id,
+                user_id=order_row.user_id,
+                order_date=order_row.order_date,
+                order_amount=order_row.order_amount,
+                order_items=items_by_order[order_row.id]
             )
-            new_order_items.append(new_order_item)
-            self.db.add(new_order_item)
-
-        self.db.commit()
-
-        # Explicitly create OrderItemSchema objects with required fields
-        order_items_schema = [
-            OrderItemSchema(
-                book_id=item.book_id,
-                quantity=item.quantity,
-                price=item.price
-            ) for item in new_order_items
+            for order_row in order_rows
         ]
 
-        return OrderResponse(
-            id=new_order.id,
-            user_id=new_order.user_id,
-            order_date=new_order.order_date,
-            order_amount=new_order.order_amount,
-            order_items=order_items_schema
-        )
+    async def create_order(self, order: OrderCreate) -> OrderResponse:
+        """
+        Create an order with its items in one transaction.
+        :param order: OrderCreate object containing order details
+        :return: OrderResponse object
+        """
+        return (await self._insert_orders([order]))[0]
+
+    async def create_orders(self, orders: List[OrderCreate]) -> List[OrderResponse]:
+        """
+        Create many orders with their items in one transaction, either all of them are written or none.
+        :param orders: List of OrderCreate objects
+        :return: List of OrderResponse objects, in the order of the input
+        """
+        return await self._insert_orders(orders)
 
 
-    def get_order_by_id(self, order_id: int) -> OrderResponse:
+    async def get_order_by_id(self, order_id: int) -> OrderResponse:
         """
         Get an order by ID.
         :param order_id: ID of the order to retrieve
         :return: OrderResponse object
         """
-        order = self.db.query(OrderModel).where(OrderModel.id == order_id).first()
+        order = (await self.db.exec(select(OrderModel).where(OrderModel.id == order_id))).first()
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
 
-        order_items = self.db.query(OrderItemModel).where(OrderItemModel.order_id == order_id).all()
+        order_items = (await self.db.exec(select(OrderItemModel).where(OrderItemModel.order_id == order_id))).all()
         return OrderResponse(
             id=order.id,
             user_id=order.user_id,
@@ -1,19 +1,22 @@
 from typing import Optional, Dict, List
 from datetime import datetime, timezone
-from fastapi import Depends, HTTPException, status
-from sqlmodel import Session
+from fastapi import Depends, HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.schema.ReviewSchema import ReviewCreate, ReviewResponse
-from app.models import ReviewModel
+from app.models import ReviewModel, BookRatingStatsModel
 from app.db.session import get_session
+from app.controllers.BookController import book_carousel_cache
 
 
 class ReviewController:
     """
     ReviewController is a class that handles the review-related endpoints.
     """
-    def __init__(self, db: Session = Depends(get_session)):
+    def __init__(self, db: AsyncSession = Depends(get_session)):
         """
         Initialize the ReviewController.
         """
@@ -49,7 +52,7 @@ class ReviewController:
         return reviews_query
 
 
-    def get_book_reviews_list(self, offset: int = 0, limit: int = 100, rating_star: int = None, is_desc: bool = True) -> List:
+    async def get_book_reviews_list(self, offset: int = 0, limit: int = 100, rating_star: int = None, is_desc: bool = True) -> List:
         """
         Get reviews for a specific product.
 
@@ -65,7 +68,7 @@ class ReviewController:
         query = query.where(ReviewModel.rating_star == rating_star) if rating_star else query
         query = query.order_by(ReviewModel.review_date.desc() if is_desc else ReviewModel.review_date.asc())
 
-        reviews = self.db.exec(query.offset(offset).limit(limit)).all()
+        reviews = (await self.db.exec(query.offset(offset).limit(limit))).all()
 
         # Create ReviewResponse objects from ReviewModel objects
         return [
@@ -81,37 +84,60 @@ class ReviewController:
         ]
 
 
-    def get_book_rating_general(self) -> Dict:
+    async def get_book_rating_general(self) -> Dict:
         """
         Get the general rating for a specific product including average star, number of each rating star and number of reviews.
+        The numbers are read from the precomputed book_rating_stats row instead of aggregating the review table.
         :return: A dictionary containing the average star, number of each rating star and number of reviews.
         """
         if self.book_id == 0:
-            raise status.HTTPException(status_code=404, detail="Book ID is not set.")
-        query = select(
-            ReviewModel.rating_star,
-            func.count(ReviewModel.rating_star).label("number_of_rating_star")
-        ).where(
-            ReviewModel.book_id == self.book_id
-        ).group_by(
-            ReviewModel.rating_star
-        )
+            raise HTTPException(status_code=404, detail="Book ID is not set.")
+        stats = await self.db.get(BookRatingStatsModel, self.book_id)
+
+        if stats is None or stats.review_count == 0:
+            return {
+                "average_rating": 0,
+                "stars_count": {},
+                "total_reviews": 0
+            }
+
+        stars_count = {
+            star: getattr(stats, f"star_{star}")
+            for star in range(1, 6)
+            if getattr(stats, f"star_{star}") > 0
+        }
+        return {
+            "average_rating": round(stats.star_sum / stats.review_count, 2),
+            "stars_count": stars_count,
+            "total_reviews": stats.review_count
+        }
 
-        reviews = self.db.exec(query).all()
+    async def _increment_book_rating_stats(self, rating_star: int) -> None:
+        """
+        Add one review with the given rating to the book_rating_stats row of the book.
+        The row is upserted inside the caller's transaction so it stays consistent with the review table.
 
-        total_reviews = sum(r.number_of_rating_star for r in reviews)
-        average_rating = (
-            sum(r.rating_star * r.number_of_rating_star for r in reviews) / total_reviews
-            if total_reviews > 0 else 0
+        :param rating_star: The rating star of the new review.
+        """
+        star_column = f"star_{rating_star}"
+        insert = postgresql_insert if self.db.bind.dialect.name == "postgresql" else sqlite_insert
+        upsert = insert(BookRatingStatsModel).values(
+            book_id=self.book_id,
+            review_count=1,
+            star_sum=rating_star,
+            **{star_column: 1}
         )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[BookRatingStatsModel.book_id],
+            set_={
+                "review_count": BookRatingStatsModel.review_count + 1,
+                "star_sum": BookRatingStatsModel.star_sum + rating_star,
+                star_column: getattr(BookRatingStatsModel, star_column) + 1,
+            }
+        )
+        await self.db.exec(upsert)
 
-        return {
-            "average_rating": round(average_rating, 2),
-            "stars_count": {r.rating_star: r.number_of_rating_star for r in reviews},
-            "total_reviews": total_reviews
-        }
-
-    def add_review(self, review_data: ReviewCreate) -> Optional[ReviewResponse]:
+    async def add_review(self, review_data: ReviewCreate) -> Optional[ReviewResponse]:
         """
         Add a review for a specific product.
 
@@ -119,7 +145,6 @@ class ReviewController:
         :param review_data: The data of the review to add.
         :return: The added review.
         """
-        now = datetime.now(timezone.utc)
         new_review = ReviewModel(
             book_id=self.book_id,
             review_title=review_data.review_title,
@@ -129,8 +154,12 @@ class ReviewController:
         )
 
         self.db.add(new_review)
-        self.db.commit()
-        self.db.refresh(new_review)
+        await self._increment_book_rating_stats(new_review.rating_star)
+        await self.db.commit()
+        await self.db.refresh(new_review)
+
+        # Ratings feed the recommended and popular carousels
+        book_carousel_cache.invalidate()
         return ReviewResponse(
             id=new_review.id,
             book_id=new_review.book_id,
@@ -1,18 +1,35 @@
 from typing import Optional, Dict, List
 from fastapi import Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.schema.UserSchema import *
 from app.models import UserModel
-from app.core.security import hash_password, verify_password
+from app.core.security import hash_password_async, verify_password_async, invalidate_cached_user, record_user_change
 from app.db.session import get_session
 
 
 class UserController:
-    def __init__(self, db: Session = Depends(get_session)):
+    def __init__(self, db: AsyncSession = Depends(get_session)):
         self.db = db
 
 
+    @staticmethod
+    def _build_user_response(user: UserModel) -> UserResponse:
+        """
+        Helper function to build the user response.
+        :param user: UserModel object
+        :return: UserResponse object
+        """
+        return UserResponse(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            is_admin=user.admin
+        )
+
+
     @staticmethod
     def _get_user_query(email: str = None, user_id: int = None):
         """
@@ -28,35 +45,34 @@ class UserController:
         return select(UserModel)
 
 
-    def create_user(self, user: UserCreate) -> Optional[UserResponse]:
+    async def create_user(self, user: UserCreate) -> Optional[UserResponse]:
         """
         Create a new user in the database.
         :param user: UserCreate object containing user details
         :return: UserResponse object with created user details
         :raises HTTPException if user already exists
         """
-        hashed_password = hash_password(user.password)
-        new_user = UserModel(
-            email=user.email,
-            password=hashed_password,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            is_admin=user.is_admin
-        )
         query = self._get_user_query(email=user.email)
-        existing_user = self.db.exec(query).first()
+        existing_user = (await self.db.exec(query)).first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User already exists"
             )
+        new_user = UserModel(
+            email=user.email,
+            password=await hash_password_async(user.password),
+            first_name=user.first_name,
+            last_name=user.last_name,
+            admin=user.is_admin
+        )
         self.db.add(new_user)
-        self.db.commit()
-        self.db.refresh(new_user)
-        return UserResponse.model_validate(new_user)
+        await self.db.commit()
+        await self.db.refresh(new_user)
+        return self._build_user_response(new_user)
 
 
-    def update_user(self, user_id: int, old_password: str, data: UserUpdate) -> Optional[UserResponse]:
+    async def update_user(self, user_id: int, old_password: str, data: UserUpdate) -> Optional[UserResponse]:
         """
         Update user information in the database.
         :param user_id: ID of the user to be updated
@@ -66,7 +82,7 @@ class UserController:
         :raises HTTPException if user not found or password is incorrect
         """
         query = self._get_user_query(user_id=user_id)
-        user = self.db.exec(query).first()
+        user = (await self.db.exec(query)).first()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -74,27 +90,30 @@ class UserController:
             )
         if data.email != user.email:
             email_query = self._get_user_query(email=data.email)
-            existing_user = self.db.exec(email_query).first()
+            existing_user = (await self.db.exec(email_query)).first()
             if existing_user:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Email already exists"
                 )
-        if not verify_password(old_password, user.password):
+        if not await verify_password_async(old_password, user.password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect password"
             )
+        old_email = user.email
         user.email = data.email
         user.first_name = data.first_name
         user.last_name = data.last_name
-        user.password = hash_password(data.password)
-        self.db.commit()
-        self.db.refresh(user)
-        return UserResponse.model_validate(user)
+        user.password = await hash_password_async(data.password)
+        changed_at = await record_user_change(old_email, self.db)
+        await self.db.commit()
+        await self.db.refresh(user)
+        invalidate_cached_user(old_email, changed_at)
+        return self._build_user_response(user)
 
 
-    def update_password(self, user_id: int, old_password: str, new_password: str) -> Optional[UserResponse]:
+    async def update_password(self, user_id: int, old_password: str, new_password: str) -> Optional[UserResponse]:
         """
         Update the password of a user.
         :param user_id: ID of the user
@@ -104,24 +123,24 @@ class UserController:
         :raises HTTPException if user not found or password is incorrect
         """
         query = self._get_user_query(user_id=user_id)
-        user = self.db.exec(query).first()
+        user = (await self.db.exec(query)).first()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        if not verify_password(old_password, user.password):
+        if not await verify_password_async(old_password, user.password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect password"
             )
-        user.password = hash_password(new_password)
-        self.db.commit()
-        self.db.refresh(user)
-        return UserResponse.model_validate(user)
+        user.password = await hash_password_async(new_password)
+        await self.db.commit()
+        await self.db.refresh(user)
+        return self._build_user_response(user)
 
 
-    def delete_user(self, user_id: int) -> Optional[Dict]:
+    async def delete_user(self, user_id: int) -> Optional[Dict]:
         """
         Delete a user from the database.
         :param user_id: ID of the user to be deleted
@@ -129,10 +148,12 @@ class UserController:
         :raises HTTPException if user not found
         """
         query = self._get_user_query(user_id=user_id)
-        user = self.db.exec(query).first()
+        user = (await self.db.exec(query)).first()
         if user:
-            self.db.delete(user)
-            self.db.commit()
+            await self.db.delete(user)
+            changed_at = await record_user_change(user.email, self.db)
+            await self.db.commit()
+            invalidate_cached_user(user.email, changed_at)
             return {"message": "User deleted successfully"}
         else:
             raise HTTPException(
@@ -140,17 +161,17 @@ class UserController:
                 detail="User not found"
             )
 
-    def get_user_by_id(self, user_id: int) -> Optional[UserResponse]:
-        user = self._get_user_query(user_id=user_id)
+    async def get_user_by_id(self, user_id: int) -> Optional[UserResponse]:
+        user = (await self.db.exec(self._get_user_query(user_id=user_id))).first()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        return UserResponse.model_validate(user)
+        return self._build_user_response(user)
 
 
-    def get_all_users(self, offset: int = 0, limit: int = 100) -> List[UserResponse]:
+    async def get_all_users(self, offset: int = 0, limit: int = 100) -> List[UserResponse]:
         """
         Get all users in the database.
         :param offset: Offset for pagination
@@ -158,5 +179,5 @@ class UserController:
         :return: List of UserResponse objects
         """
         query = self._get_user_query().offset(offset).limit(limit)
-        users = self.db.exec(query).all()
-        return [UserResponse.model_validate(user) for user in users]
\ No newline at end of file
+        users = (await self.db.exec(query)).all()
+        return [self._build_user_response(user) for user in users]
\ No newline at end of file
@@ -1,4 +1,5 @@
 from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
 import os
 
 load_dotenv()
@@ -15,12 +16,47 @@ class Settings:
         self.DB_HOST = self._get("DB_HOST")
         self.DB_PORT = self._get("DB_PORT")
         self.DB_DATABASE = self._get("DB_DATABASE")
+        # Full URL taking precedence over the DB_* parts, e.g. "sqlite:///bookworm.db"
+        self.DATABASE_URL = self._get("DATABASE_URL", default="")
+
+        # db engine settings
+        self.DB_POOL_SIZE = int(self._get("DB_POOL_SIZE", default="5"))
+        self.DB_MAX_OVERFLOW = int(self._get("DB_MAX_OVERFLOW", default="10"))
+        self.DB_POOL_TIMEOUT_SECONDS = float(self._get("DB_POOL_TIMEOUT_SECONDS", default="30"))
+        self.DB_POOL_RECYCLE_SECONDS = int(self._get("DB_POOL_RECYCLE_SECONDS", default="1800"))
+        self.DB_POOL_PRE_PING = self._get("DB_POOL_PRE_PING", default="true").lower() == "true"
+        # 0 disables the timeout
+        self.DB_STATEMENT_TIMEOUT_MS = int(self._get("DB_STATEMENT_TIMEOUT_MS", default="0"))
+        # "false", "true" (statements) or "debug" (statements and rows)
+        self.DB_ECHO = self._get("DB_ECHO", default="false").lower()
 
         # jwt settings
         self.SECRET_KEY = self._get("SECRET_KEY")
         self.ALGORITHM = self._get("ALGORITHM", default="HS256")
         self.ACCESS_TOKEN_EXPIRE_MINUTES = int(self._get("ACCESS_TOKEN_EXPIRE_MINUTES", default="15"))
         self.REFRESH_TOKEN_EXPIRE_DAYS = int(self._get("REFRESH_TOKEN_EXPIRE_DAYS", default="7"))
+
+        # cache settings
+        self.BOOK_CAROUSEL_CACHE_SIZE = int(self._get("BOOK_CAROUSEL_CACHE_SIZE", default="64"))
+        self.BOOK_CAROUSEL_CACHE_TTL_SECONDS = float(self._get("BOOK_CAROUSEL_CACHE_TTL_SECONDS", default="60"))
+        self.SUGGEST_INDEX_REFRESH_SECONDS = float(self._get("SUGGEST_INDEX_REFRESH_SECONDS", default="60"))
+        # how often the active discounts projection checks whether the day changed
+        self.ACTIVE_DISCOUNT_REFRESH_SECONDS = float(self._get("ACTIVE_DISCOUNT_REFRESH_SECONDS", default="60"))
+        self.USER_CACHE_SIZE = int(self._get("USER_CACHE_SIZE", default="1024"))
+        self.USER_CACHE_TTL_SECONDS = float(self._get("USER_CACHE_TTL_SECONDS", default="60"))
+        # how often the user changes of the other workers are loaded, their stale access tokens are accepted until then
+        self.USER_CHANGE_REFRESH_SECONDS = float(self._get("USER_CHANGE_REFRESH_SECONDS", default="5"))
+        # how long the table versions behind the ETags are reused, a write shows up in revalidations after at most this
+        self.TABLE_VERSION_CACHE_TTL_SECONDS = float(self._get("TABLE_VERSION_CACHE_TTL_SECONDS", default="1"))
+
+        # password hashing settings
+        self.PASSWORD_HASH_WORKERS = int(self._get("PASSWORD_HASH_WORKERS", default=str(min(4, os.cpu_count() or 1))))
+        self.PASSWORD_HASH_MAX_PENDING = int(self._get("PASSWORD_HASH_MAX_PENDING", default="32"))
+
+        # query instrumentation settings, a request is logged as a possible N+1 pattern past either threshold
+        self.QUERY_REPEAT_THRESHOLD = int(self._get("QUERY_REPEAT_THRESHOLD", default="5"))
+        self.QUERY_COUNT_THRESHOLD = int(self._get("QUERY_COUNT_THRESHOLD", default="20"))
+
         # cookie settings
         # self.COOKIE_SECURE = os.getenv("COOKIE_SECURE", "False").lower() == "true"
 
@@ -38,6 +74,35 @@ class Settings:
         return value
 
     def db_url(self):
-        return f"{self.DB_TYPE}://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_DATABASE}"
+        """
+        Get the database URL with the blocking driver of the database.
+        :return: Database URL for the sync engine
+        """
+        if self.DATABASE_URL:
+            url = make_url(self.DATABASE_URL)
+        else:
+            url = make_url(f"{self.DB_TYPE}://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_DATABASE}")
+        # Pin the drivers listed in requirements.txt instead of the SQLAlchemy defaults
+        driver = {"postgresql": "postgresql+psycopg2", "sqlite": "sqlite"}.get(url.get_backend_name())
+        if driver is not None:
+            url = url.set(drivername=driver)
+        return url.render_as_string(hide_password=False)
+
+    def async_db_url(self):
+        """
+        Get the database URL with the asyncio driver of the database.
+        :return: Database URL for the async engine
+        """
+        url = make_url(self.db_url())
+        backend = url.get_backend_name()
+        driver = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}.get(backend, "asyncpg")
+        return url.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+    def db_echo(self):
+        """
+        Get the echo flag of the engines from DB_ECHO.
+        :return: False, True or "debug"
+        """
+        return {"true": True, "debug": "debug"}.get(self.DB_ECHO, False)
 
 settings = Settings()
\ No newline at end of file
@@ -3,8 +3,11 @@ from app.core.security.dependencies import (get_user,
                                             get_current_user,
                                             authenticate_user,
                                             get_current_user_from_token,
-                                            get_user_from_refresh_token)
-from app.core.security.password import hash_password, verify_password
+                                            get_user_from_refresh_token,
+                                            invalidate_cached_user,
+                                            record_user_change,
+                                            load_user_changes)
+from app.core.security.password import hash_password, verify_password, hash_password_async, verify_password_async
 from app.core.security.app_token import create_access_token, create_refresh_token, decode_token
 
 __all__ = [
@@ -14,9 +17,14 @@ __all__ = [
     "get_current_user",
     "hash_password",
     "verify_password",
+    "hash_password_async",
+    "verify_password_async",
     "authenticate_user",
     "create_access_token",
     "create_refresh_token",
     "get_current_user_from_token",
-    "get_user_from_refresh_token"
+    "get_user_from_refresh_token",
+    "invalidate_cached_user",
+    "record_user_change",
+    "load_user_changes"
 ]
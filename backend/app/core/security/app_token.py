@@ -3,6 +3,23 @@ import jwt
 from typing import Optional
 
 from app.core.config import settings
+from app.schema.UserSchema import UserResponse
+
+def access_token_claims(user: UserResponse) -> dict:
+    """
+    Get the claims an access token carries about its user.
+    They are enough to rebuild the UserResponse, so authenticated requests need no user lookup.
+    :param user: Authenticated user.
+    :return: Claims to pass to create_access_token.
+    """
+    return {
+        "sub": user.email,
+        "uid": user.id,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "is_admin": user.is_admin,
+    }
+
 
 def create_access_token(
     data: dict,
@@ -1,15 +1,32 @@
+import time
 from typing import Optional
 from jwt import decode, InvalidTokenError, ExpiredSignatureError
 from fastapi import Request, HTTPException, status, Depends
 from pydantic import BaseModel
-from sqlmodel import Session, select
+from sqlalchemy import delete
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
-from app.core.security.password import verify_password
+from app.core.security.password import verify_password_async
 # from app.core.security.app_token import create_access_token, create_refresh_token
 from app.db.session import get_session
-from app.models import UserModel
+from app.models import UserModel, UserChangeModel
 from app.schema.UserSchema import UserResponse
+from app.utils.cache import TTLCache
+from app.utils.metrics import registry
+
+# Users of access tokens without user claims (issued before they were added), by token subject
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+# Time a user last changed, by token subject; access tokens issued before are rejected.
+# Filled by this process and from the user_change table written by every process, see load_user_changes
+_user_changed_at = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+JWT_VERIFICATIONS = registry.counter(
+    "jwt_verifications_total",
+    "Access tokens verified, by outcome: where the user came from (cache, claims, database) or why the token was rejected",
+    ["result"],
+)
 
 
 class AccessTokenData(BaseModel):
@@ -58,20 +75,101 @@ def get_token(request: Request, is_refresh_token: bool = False) -> str:
     )
 
 
-def get_user(user_email: str, db: Session) -> Optional[UserModel]:
+def invalidate_cached_user(user_email: str, changed_at: Optional[float] = None) -> None:
+    """
+    Stop trusting the access tokens of a user issued before it changed or was deleted, in this process.
+    Other processes pick the change up from the user_change row written by record_user_change.
+
+    :param user_email: Email of the user, i.e. the token subject.
+    :param changed_at: Time of the change, defaults to now.
+    """
+    _user_changed_at.set(user_email, changed_at or time.time())
+    user_cache.invalidate(user_email)
+
+
+async def record_user_change(user_email: str, db: AsyncSession) -> float:
+    """
+    Record a change of a user in the user_change table, to commit with the change itself.
+    Changes older than the lifetime of an access token are pruned, no token they could reject is left.
+
+    :param user_email: Email of the user, i.e. the token subject.
+    :param db: Database session, the caller is responsible for committing.
+    :return: Time of the change, to pass to invalidate_cached_user after the commit.
+    """
+    changed_at = time.time()
+    await db.exec(delete(UserChangeModel).where(
+        UserChangeModel.changed_at < changed_at - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    ))
+    await db.merge(UserChangeModel(email=user_email, changed_at=changed_at))
+    return changed_at
+
+
+async def load_user_changes(db: AsyncSession) -> int:
+    """
+    Apply the user changes recorded by every process to this one.
+    The table only holds the changes within the lifetime of an access token, so it is read whole,
+    which also picks up changes committed out of order.
+
+    :param db: Database session.
+    :return: Number of changes not seen before.
+    """
+    changes = (await db.exec(select(UserChangeModel.email, UserChangeModel.changed_at))).all()
+    applied = 0
+    for email, changed_at in changes:
+        known = _user_changed_at.get(email)
+        if known is None or known < changed_at:
+            invalidate_cached_user(email, changed_at)
+            applied += 1
+    return applied
+
+
+def _has_user_claims(payload: dict) -> bool:
+    """
+    Check whether an access token carries the user claims, tokens issued before they were added do not.
+    """
+    return {"uid", "first_name", "last_name"} <= payload.keys()
+
+
+def _is_issued_before_change(payload: dict) -> bool:
+    """
+    Check whether an access token was issued before the last change of its user.
+    iat has a one second resolution, so a token issued in the second of the change is still accepted
+    rather than rejecting the one issued right after it.
+    """
+    changed_at = _user_changed_at.get(payload["sub"])
+    return changed_at is not None and payload.get("iat", 0) < int(changed_at)
+
+
+def _user_from_claims(payload: dict) -> UserResponse:
+    """
+    Build the user from the claims of an access token.
+
+    :param payload: Decoded access token, with the user claims.
+    :return: The user.
+    """
+    return UserResponse(
+        id=payload["uid"],
+        email=payload["sub"],
+        first_name=payload["first_name"],
+        last_name=payload["last_name"],
+        is_admin=payload.get("is_admin", False)
+    )
+
+
+async def get_user(user_email: str, db: AsyncSession) -> Optional[UserModel]:
     """
     Get the user from the database by email.
     """
-    user = db.query(UserModel).filter(UserModel.email == user_email).first()
+    user = (await db.exec(select(UserModel).where(UserModel.email == user_email))).first()
     return user if user else None
 
 
-def authenticate_user(email: str, password: str, db: Session) -> Optional[UserResponse]:
+async def authenticate_user(email: str, password: str, db: AsyncSession) -> Optional[UserResponse]:
     """
     Authenticate the user using email and password.
     """
-    user = db.query(UserModel).filter(UserModel.email == email).first()
-    if not user or not verify_password(password, user.password):
+    user = await get_user(email, db)
+    if not user or not await verify_password_async(password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -86,9 +184,11 @@ def authenticate_user(email: str, password: str, db: Session) -> Optional[UserRe
     )
 
 
-def get_current_user_from_token(token: str, db: Session) -> UserResponse:
+async def get_current_user_from_token(token: str, db: AsyncSession) -> UserResponse:
     """
     Get current user from access token.
+    The user is read from the token claims. Tokens without them, issued before they were added, are served
+    from the user cache and then from the database. Tokens issued before their user last changed are rejected.
 
     :param token: JWT access token
     :param db: Database session
@@ -107,31 +207,55 @@ def get_current_user_from_token(token: str, db: Session) -> UserResponse:
         token_type = payload.get("token_type")
 
         if email is None:
+            JWT_VERIFICATIONS.inc(result="invalid")
             raise credentials_exception
 
         if token_type != "access":
+            JWT_VERIFICATIONS.inc(result="wrong_type")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token type",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        user = get_user(email, db)
+        if _is_issued_before_change(payload):
+            JWT_VERIFICATIONS.inc(result="stale")
+            raise credentials_exception
+
+        # The claims were verified with the signature, they describe the user when the token was issued
+        if _has_user_claims(payload):
+            JWT_VERIFICATIONS.inc(result="claims")
+            return _user_from_claims(payload)
+
+        cached_user = user_cache.get(email)
+        if cached_user is not None:
+            JWT_VERIFICATIONS.inc(result="cache")
+            return cached_user
+
+        user = await get_user(email, db)
         if user is None:
+            JWT_VERIFICATIONS.inc(result="unknown_user")
             raise credentials_exception
+        JWT_VERIFICATIONS.inc(result="database")
 
-        return UserResponse(
+        current_user = UserResponse(
             id=user.id,
             email=user.email,
             first_name=user.first_name,
             last_name=user.last_name,
             is_admin=user.admin
         )
-    except (InvalidTokenError, ExpiredSignatureError):
+        user_cache.set(email, current_user)
+        return current_user
+    except ExpiredSignatureError:
+        JWT_VERIFICATIONS.inc(result="expired")
+        raise credentials_exception
+    except InvalidTokenError:
+        JWT_VERIFICATIONS.inc(result="invalid")
         raise credentials_exception
 
 
-def get_user_from_refresh_token(refresh_token: str, db: Session) -> UserResponse:
+async def get_user_from_refresh_token(refresh_token: str, db: AsyncSession) -> UserResponse:
     """
     Validate refresh token and return user.
 
@@ -153,7 +277,7 @@ def get_user_from_refresh_token(refresh_token: str, db: Session) -> UserResponse
         if email is None:
             raise credentials_exception
 
-        user = get_user(email, db)
+        user = await get_user(email, db)
         if user is None:
             raise credentials_exception
 
@@ -168,7 +292,7 @@ def get_user_from_refresh_token(refresh_token: str, db: Session) -> UserResponse
         raise credentials_exception
 
 
-async def get_current_user(request: Request, db: Session = Depends(get_session)) -> Optional[UserModel]:
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_session)) -> Optional[UserModel]:
     """
     Get the current user from the access token.
 
@@ -195,7 +319,7 @@ async def get_current_user(request: Request, db: Session = Depends(get_session))
         if token_type != "access":
             raise credentials_exception
 
-        user = get_user(email, db)
+        user = await get_user(email, db)
         if user is None:
             raise credentials_exception
 
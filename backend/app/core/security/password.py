@@ -1,11 +1,127 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
+from app.core.config import settings
+
 # Create a password context with the default hashing algorithm
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+
+class PasswordWorkerPool:
+    """
+    Bounded thread pool running bcrypt off the event loop.
+    bcrypt releases the GIL, so hashing on these threads leaves the loop free to serve other requests.
+    When max_pending calls are already queued or running, new calls are rejected with 503 instead of
+    piling up behind a login burst. A call holds its slot until its thread is done, even if the request
+    awaiting it was cancelled.
+    """
+    def __init__(self, max_workers: int, max_pending: int):
+        """
+        Initialize the pool.
+        :param max_workers: Number of threads hashing concurrently
+        :param max_pending: Maximum number of calls queued or running
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password")
+        self._lock = threading.Lock()
+
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        Run a function on the pool.
+        :param func: Blocking function, e.g. pwd_context.hash
+        :param args: Arguments of the function
+        :return: Result of the function
+        :raises HTTPException: If the pool is saturated
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent authentication requests, please retry",
+                    headers={"Retry-After": "1"}
+                )
+            self.pending += 1
+
+        submitted_at = time.perf_counter()
+
+        def task():
+            waited = time.perf_counter() - submitted_at
+            with self._lock:
+                self.running += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        def release(future: Future) -> None:
+            with self._lock:
+                self.pending -= 1
+                # A call cancelled before it started neither completed nor failed
+                if future.cancelled():
+                    return
+                if future.exception() is None:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+        future = self._executor.submit(task)
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the pool counters.
+        :return: Dictionary with the pool size, queue depth and wait times
+        """
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "running": self.running,
+                "queued": self.pending - self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker threads once the queued calls are done.
+        """
+        self._executor.shutdown(wait=True)
+
+
+password_pool = PasswordWorkerPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
 def hash_password(password: str) -> str:
     """
     Hash a password using bcrypt.
+    Blocks the calling thread, async code should use hash_password_async.
     :param password: The password to hash.
     :return: The hashed password.
     """
@@ -14,8 +130,28 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against a hashed password.
+    Blocks the calling thread, async code should use verify_password_async.
+    :param plain_password: The plain password to verify.
+    :param hashed_password: The hashed password to verify against.
+    :return: True if the password matches, False otherwise.
+    """
+    return pwd_context.verify(plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password using bcrypt on the password worker pool.
+    :param password: The password to hash.
+    :return: The hashed password.
+    :raises HTTPException: If the pool is saturated.
+    """
+    return await password_pool.run(pwd_context.hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a hashed password on the password worker pool.
     :param plain_password: The plain password to verify.
     :param hashed_password: The hashed password to verify against.
     :return: True if the password matches, False otherwise.
+    :raises HTTPException: If the pool is saturated.
     """
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return await password_pool.run(pwd_context.verify, plain_password, hashed_password)
@@ -0,0 +1,514 @@
+import argparse
+import csv
+import io
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import accumulate, islice
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session
+
+from app.core.security.password import hash_password
+from app.models import (
+    AuthorModel,
+    BookModel,
+    CategoryModel,
+    DiscountModel,
+    UserModel,
+    ReviewModel,
+    OrderModel,
+    OrderItemModel
+)
+from app.db.engine import create_db_engine
+from app.db.projections import rebuild_book_rating_stats, rebuild_active_discounts
+from app.db.search import get_search_backend
+
+# Row counts at scale 1, the same as the ORM seeder
+BASE_COUNTS = {
+    "users": 500,
+    "authors": 400,
+    "books": 3000,
+    "reviews": 5000,
+    "discounts": 500,
+    "orders": 1000,
+}
+MAX_ORDER_ITEMS = 8
+
+CATEGORY_NAMES = [
+    "Fiction", "Non-Fiction", "Science Fiction", "Fantasy",
+    "Mystery", "Biography", "History", "Self-Help",
+    "Business", "Technology", "Romance", "Horror",
+    "Children's", "Young Adult", "Poetry", "Travel",
+    "Cookbooks", "Art & Photography", "Comics & Graphic Novels",
+    "Religion & Spirituality", "Science", "Mathematics",
+    "Psychology", "Philosophy", "Politics", "Memoirs",
+    "True Crime", "Humor", "Adventure", "Dystopian"
+]
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+    "Daniel", "Lisa", "Matthew", "Nancy", "Anthony", "Betty", "Mark", "Sandra", "Paul", "Ashley",
+    "Haruki", "Yuval", "Agatha", "Toni", "Gabriel", "Virginia", "Leo", "Simone", "Albert", "Emily",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+    "Austen", "Orwell", "Christie", "Murakami", "Marquez", "Woolf", "Tolstoy", "Atwood", "Camus", "Dickinson",
+]
+TITLE_WORDS = [
+    "Secret", "Hidden", "Lost", "Ancient", "Eternal", "Final", "First", "Broken", "New", "Last",
+    "Kingdom", "Garden", "Mystery", "Promise", "Adventure", "Path", "Truth", "Destiny", "Legacy", "Journey",
+    "River", "Shadow", "Light", "Storm", "Winter", "Summer", "Empire", "House", "City", "Ocean",
+    "Night", "Fire", "Silence", "Memory", "Crown", "Stone", "Glass", "Iron", "Silver", "Golden",
+]
+TEXT_WORDS = [
+    "story", "world", "reader", "journey", "character", "history", "power", "family", "love", "war",
+    "time", "life", "truth", "secret", "future", "past", "mind", "heart", "city", "friend",
+    "compelling", "unforgettable", "remarkable", "brilliant", "moving", "thoughtful", "gripping", "vivid",
+    "explores", "reveals", "follows", "captures", "challenges", "celebrates", "examines", "imagines",
+    "the", "a", "of", "and", "in", "through", "with", "beyond", "about", "between",
+]
+
+
+@dataclass(frozen=True)
+class SeedConfig:
+    """
+    Options of a bulk seeding run.
+    """
+    # Multiplier of BASE_COUNTS, categories are not scaled
+    scale: float = 1.0
+    # Seed of the random generators, the same seed and scale produce the same rows (password salts aside)
+    seed: int = 42
+    # Number of tables loaded at the same time, 1 loads them one after the other
+    workers: int = 1
+    # Rows per COPY or executemany batch
+    chunk_size: int = 10_000
+    # Date the generated dates are relative to
+    today: Optional[date] = None
+    # Zipf exponent of the reviews and order items per book, 0 spreads them uniformly
+    review_skew: float = 1.1
+    # Zipf exponent of the books per author, 0 spreads them uniformly
+    author_skew: float = 0.8
+    # Share of the discounts overlapping an earlier discount of the same book
+    discount_overlap: float = 0.2
+    # Whether the ratings of a book gather around an average of its own, instead of uniform 1 to 5 stars
+    rating_skew: bool = True
+
+    def count(self, name: str) -> int:
+        """
+        Get the number of rows to generate for a table.
+        :param name: Key of BASE_COUNTS
+        :return: Scaled row count, at least 1
+        """
+        return max(1, round(BASE_COUNTS[name] * self.scale))
+
+    def rng(self, name: str) -> random.Random:
+        """
+        Get the random generator of a table.
+        Each table has its own generator, so its rows do not depend on which tables run in parallel.
+        :param name: Table name
+        :return: Seeded random generator
+        """
+        return random.Random(f"{self.seed}:{name}")
+
+    @property
+    def reference_date(self) -> date:
+        return self.today or date.today()
+
+
+def _sentence(rng: random.Random, min_words: int, max_words: int) -> str:
+    words = rng.choices(TEXT_WORDS, k=rng.randint(min_words, max_words))
+    return " ".join(words).capitalize() + "."
+
+
+def _text_pool(rng: random.Random, size: int, min_sentences: int, max_sentences: int) -> List[str]:
+    """
+    Pre-generate texts picked at random for each row, generating one per row dominates the load time.
+    """
+    return [
+        " ".join(_sentence(rng, 6, 14) for _ in range(rng.randint(min_sentences, max_sentences)))
+        for _ in range(size)
+    ]
+
+
+def zipf_cum_weights(size: int, exponent: float) -> List[float]:
+    """
+    Get the cumulative weights of ranks 1 to size under a Zipf law, for random.choices.
+    :param size: Number of ranks
+    :param exponent: Zipf exponent, 0 gives every rank the same weight
+    :return: Cumulative weights, rank 1 first
+    """
+    return list(accumulate(1 / rank ** exponent for rank in range(1, size + 1)))
+
+
+def popularity_ranking(config: SeedConfig) -> List[int]:
+    """
+    Get the book IDs from the most to the least popular.
+    Reviews and orders share the ranking, so the most reviewed books are also the most ordered.
+    """
+    book_ids = list(range(1, config.count("books") + 1))
+    config.rng("popularity").shuffle(book_ids)
+    return book_ids
+
+
+def _skewed_choices(rng: random.Random, population: Sequence[int], cum_weights: List[float], count: int, chunk_size: int):
+    """
+    Yield count values of the population drawn with the cumulative weights, drawn a chunk at a time.
+    """
+    while count > 0:
+        yield from rng.choices(population, cum_weights=cum_weights, k=min(count, chunk_size))
+        count -= chunk_size
+
+
+def _load_rows(connection: Connection, table: Table, columns: Sequence[str], rows: Iterable[tuple], chunk_size: int) -> int:
+    """
+    Load rows into a table, with COPY on Postgres and executemany INSERTs elsewhere.
+    :param connection: Database connection, the caller is responsible for committing
+    :param table: Table to load
+    :param columns: Column names, in the order of the row tuples
+    :param rows: Iterable of row tuples, consumed in chunks
+    :param chunk_size: Number of rows sent at once
+    :return: Number of rows loaded
+    """
+    rows = iter(rows)
+    loaded = 0
+    if connection.dialect.name == "postgresql":
+        preparer = connection.dialect.identifier_preparer
+        copy_sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+            preparer.format_table(table), ", ".join(preparer.quote(column) for column in columns)
+        )
+        cursor = connection.connection.dbapi_connection.cursor()
+        try:
+            while chunk := list(islice(rows, chunk_size)):
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(chunk)
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+                loaded += len(chunk)
+        finally:
+            cursor.close()
+    else:
+        insert = table.insert()
+        while chunk := list(islice(rows, chunk_size)):
+            connection.execute(insert, [dict(zip(columns, row)) for row in chunk])
+            loaded += len(chunk)
+    return loaded
+
+
+def _seed_categories(connection: Connection, config: SeedConfig) -> int:
+    rng = config.rng("category")
+    descriptions = _text_pool(rng, 50, 1, 2)
+    rows = (
+        (category_id, name, rng.choice(descriptions)[:255])
+        for category_id, name in enumerate(CATEGORY_NAMES, start=1)
+    )
+    return _load_rows(connection, CategoryModel.__table__, ["id", "category_name", "category_desc"], rows, config.chunk_size)
+
+
+def _seed_authors(connection: Connection, config: SeedConfig) -> int:
+    rng = config.rng("author")
+    bios = _text_pool(rng, 500, 2, 3)
+    seen = set()
+
+    def rows():
+        for author_id in range(1, config.count("authors") + 1):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            if name in seen:
+                name = f"{name} {author_id}"
+            seen.add(name)
+            yield author_id, name, rng.choice(bios)
+
+    return _load_rows(connection, AuthorModel.__table__, ["id", "author_name", "author_bio"], rows(), config.chunk_size)
+
+
+def _seed_users(connection: Connection, config: SeedConfig) -> int:
+    rng = config.rng("user")
+    # Every seeded user has the same password, so it is hashed once
+    password = hash_password("password123")
+
+    def rows():
+        yield 1, "Admin", "User", "admin@bookstore.com", password, True
+        for user_id in range(2, config.count("users") + 1):
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            email = f"{first_name}.{last_name}.{user_id}@example.com".lower()
+            yield user_id, first_name, last_name, email, password, False
+
+    return _load_rows(
+        connection, UserModel.__table__,
+        ["id", "first_name", "last_name", "email", "password", "admin"], rows(), config.chunk_size
+    )
+
+
+def _seed_books(connection: Connection, config: SeedConfig) -> int:
+    rng = config.rng("book")
+    summaries = _text_pool(rng, 1000, 2, 5)
+    # A few hot authors write most of the books
+    author_ids = list(range(1, config.count("authors") + 1))
+    rng.shuffle(author_ids)
+    author_weights = zipf_cum_weights(len(author_ids), config.author_skew)
+    seen = set()
+
+    def rows():
+        num_books = config.count("books")
+        authors = _skewed_choices(rng, author_ids, author_weights, num_books, config.chunk_size)
+        for book_id, author_id in zip(range(1, num_books + 1), authors):
+            title = " ".join(rng.sample(TITLE_WORDS, rng.randint(2, 4)))
+            if title in seen:
+                title = f"{title} {book_id}"
+            seen.add(title)
+            price = Decimal(rng.randint(999, 4999)) / 100
+            yield (
+                book_id,
+                rng.randint(1, len(CATEGORY_NAMES)),
+                author_id,
+                title,
+                rng.choice(summaries),
+                price,
+                f"https://picsum.photos/seed/{rng.randint(1, 100000)}/200/300",
+                # Lowered for the discounted books by rebuild_active_discounts at the end
+                price,
+            )
+
+    return _load_rows(
+        connection, BookModel.__table__,
+        ["id", "category_id", "author_id", "book_title", "book_summary", "book_price", "book_cover_photo",
+         "effective_price"],
+        rows(), config.chunk_size
+    )
+
+
+def _book_prices(connection: Connection) -> Dict[int, Decimal]:
+    return dict(connection.execute(select(BookModel.id, BookModel.book_price)).all())
+
+
+def _seed_discounts(connection: Connection, config: SeedConfig) -> int:
+    rng = config.rng("discount")
+    prices = _book_prices(connection)
+    today = config.reference_date
+    count = config.count("discounts")
+    fresh_book_ids = rng.sample(sorted(prices), min(count, len(prices)))
+
+    def rows():
+        discounted: List[Tuple[int, date, date]] = []
+        for discount_id in range(1, count + 1):
+            if discounted and (rng.random() < config.discount_overlap or len(discounted) == len(fresh_book_ids)):
+                # Starts while an earlier discount of the same book is still running
+                book_id, start_date, end_date = rng.choice(discounted)
+                start_date += timedelta(days=rng.randint(0, (end_date - start_date).days))
+            else:
+                book_id = fresh_book_ids[len(discounted)]
+                start_date = today - timedelta(days=rng.randint(0, 30))
+            end_date = max(start_date, today) + timedelta(days=rng.randint(1, 60))
+            discounted.append((book_id, start_date, end_date))
+            # Discount is between 10% and 50% off
+            discount_price = round(prices[book_id] * Decimal(str(round(1 - rng.uniform(0.1, 0.5), 4))), 2)
+            yield discount_id, book_id, start_date, end_date, discount_price
+
+    return _load_rows(
+        connection, DiscountModel.__table__,
+        ["id", "book_id", "discount_start_date", "discount_end_date", "discount_price"], rows(), config.chunk_size
+    )
+
+
+def _seed_reviews(connection: Connection, config: SeedConfig) -> int:
+    rng = config.rng("review")
+    titles = [_sentence(rng, 3, 6)[:-1] for _ in range(500)]
+    details = _text_pool(rng, 1000, 1, 5)
+    ranking = popularity_ranking(config)
+    book_weights = zipf_cum_weights(len(ranking), config.review_skew)
+    # Average rating of each book, most books are rated well and a few poorly
+    averages = {book_id: 1 + 4 * rng.betavariate(5, 2) for book_id in sorted(ranking)}
+    now = datetime.combine(config.reference_date, datetime.min.time(), tzinfo=timezone.utc)
+
+    def rating(book_id: int) -> int:
+        if not config.rating_skew:
+            return rng.randint(1, 5)
+        return min(5, max(1, round(rng.gauss(averages[book_id], 0.9))))
+
+    def rows():
+        count = config.count("reviews")
+        book_ids = _skewed_choices(rng, ranking, book_weights, count, config.chunk_size)
+        for review_id, book_id in zip(range(1, count + 1), book_ids):
+            yield (
+                review_id,
+                book_id,
+                rng.choice(titles),
+                rng.choice(details),
+                now - timedelta(days=rng.randint(1, 365), seconds=rng.randint(0, 86399)),
+                rating(book_id),
+            )
+
+    return _load_rows(
+        connection, ReviewModel.__table__,
+        ["id", "book_id", "review_title", "review_details", "review_date", "rating_star"], rows(), config.chunk_size
+    )
+
+
+def _seed_orders(connection: Connection, config: SeedConfig) -> int:
+    """
+    Load orders and their items, items are priced at the lowest discount active on the order date.
+    """
+    rng = config.rng("order")
+    prices = _book_prices(connection)
+    ranking = popularity_ranking(config)
+    book_weights = zipf_cum_weights(len(ranking), config.review_skew)
+    discounts: Dict[int, List[Tuple[date, date, Decimal]]] = {}
+    for book_id, start_date, end_date, discount_price in connection.execute(
+        select(DiscountModel.book_id, DiscountModel.discount_start_date, DiscountModel.discount_end_date, DiscountModel.discount_price)
+    ):
+        discounts.setdefault(book_id, []).append((start_date, end_date, discount_price))
+    num_users = config.count("users")
+    today = config.reference_date
+
+    def price_on(book_id: int, order_date: date) -> Decimal:
+        active = [price for start, end, price in discounts.get(book_id, ()) if start <= order_date <= end]
+        return min(active) if active else prices[book_id]
+
+    item_id = 0
+    loaded = 0
+    for first_id in range(1, config.count("orders") + 1, config.chunk_size):
+        order_rows, item_rows = [], []
+        for order_id in range(first_id, min(first_id + config.chunk_size, config.count("orders") + 1)):
+            order_date = today - timedelta(days=rng.randint(1, 180))
+            total_amount = Decimal("0")
+            # Popular books are drawn more often, a book drawn twice is one item
+            drawn = rng.choices(ranking, cum_weights=book_weights, k=rng.randint(1, MAX_ORDER_ITEMS))
+            for book_id in dict.fromkeys(drawn):
+                quantity = rng.randint(1, 3)
+                price = price_on(book_id, order_date)
+                item_id += 1
+                item_rows.append((item_id, order_id, book_id, quantity, price))
+                total_amount += price * quantity
+            order_rows.append((order_id, rng.randint(1, num_users), order_date, round(total_amount, 2)))
+        loaded += _load_rows(
+            connection, OrderModel.__table__, ["id", "user_id", "order_date", "order_amount"], order_rows, config.chunk_size
+        )
+        _load_rows(
+            connection, OrderItemModel.__table__, ["id", "order_id", "book_id", "quantity", "price"], item_rows, config.chunk_size
+        )
+    return loaded
+
+
+# Tables loaded together, each stage only references tables of the previous ones
+STAGES: List[Dict[str, Callable[[Connection, SeedConfig], int]]] = [
+    {"category": _seed_categories, "author": _seed_authors, "user": _seed_users},
+    {"book": _seed_books},
+    {"discount": _seed_discounts, "review": _seed_reviews},
+    {"order": _seed_orders},
+]
+SEQUENCE_TABLES = [CategoryModel, AuthorModel, UserModel, BookModel, DiscountModel, ReviewModel, OrderModel, OrderItemModel]
+
+
+def _load_table(engine: Engine, name: str, config: SeedConfig) -> Tuple[str, int, float]:
+    """
+    Load one table in its own transaction.
+    """
+    started = time.perf_counter()
+    job = next(stage[name] for stage in STAGES if name in stage)
+    with engine.begin() as connection:
+        rows = job(connection, config)
+    return name, rows, time.perf_counter() - started
+
+
+def _load_table_in_worker(name: str, config: SeedConfig, url: str) -> Tuple[str, int, float]:
+    """
+    Load one table from a worker process, which opens its own engine.
+    """
+    engine = create_db_engine("seed-worker", url=url, echo=False)
+    try:
+        return _load_table(engine, name, config)
+    finally:
+        engine.dispose()
+
+
+def _reset_sequences(engine: Engine) -> None:
+    """
+    Move the id sequences past the loaded ids, the rows were written with explicit ids.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as connection:
+        for model in SEQUENCE_TABLES:
+            table_name = preparer.format_table(model.__table__)
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), coalesce(max(id), 0) + 1, false) "
+                f"FROM {table_name}"
+            ))
+
+
+def bulk_seed(engine: Engine, config: SeedConfig) -> Dict[str, int]:
+    """
+    Fill an empty database with generated rows, loaded with COPY on Postgres and executemany elsewhere.
+    Tables of the same stage are loaded in parallel processes when config.workers > 1 (Postgres only,
+    SQLite serializes writers). The rating aggregate, the active discounts and the search index are rebuilt at the end.
+    :param engine: Engine of the database to fill
+    :param config: SeedConfig object
+    :return: Dictionary of table name to number of rows loaded
+    """
+    url = engine.url.render_as_string(hide_password=False)
+    workers = config.workers if engine.dialect.name == "postgresql" else 1
+    loaded = {}
+    started = time.perf_counter()
+
+    for stage in STAGES:
+        if workers > 1 and len(stage) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(stage))) as executor:
+                results = list(executor.map(_load_table_in_worker, stage, [config] * len(stage), [url] * len(stage)))
+        else:
+            results = [_load_table(engine, name, config) for name in stage]
+        for name, rows, elapsed in results:
+            loaded[name] = rows
+            print(f"Loaded {rows} rows into {name} in {elapsed:.1f}s")
+
+    _reset_sequences(engine)
+
+    search_backend = get_search_backend(engine.dialect.name)
+    with engine.begin() as connection:
+        search_backend.ensure_schema(connection)
+    with Session(engine) as session:
+        rebuild_book_rating_stats(session)
+        rebuild_active_discounts(session)
+        search_backend.reindex_books(session)
+        session.commit()
+
+    print(f"Bulk seeding completed in {time.perf_counter() - started:.1f}s")
+    return loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill an empty database with generated rows at a given scale.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier of the base row counts")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the random generators")
+    parser.add_argument("--workers", type=int, default=1, help="Number of tables loaded at the same time")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Rows per COPY or INSERT batch")
+    parser.add_argument("--review-skew", type=float, default=SeedConfig.review_skew,
+                        help="Zipf exponent of the reviews and order items per book, 0 for uniform")
+    parser.add_argument("--author-skew", type=float, default=SeedConfig.author_skew,
+                        help="Zipf exponent of the books per author, 0 for uniform")
+    parser.add_argument("--discount-overlap", type=float, default=SeedConfig.discount_overlap,
+                        help="Share of the discounts overlapping another discount of the same book")
+    parser.add_argument("--uniform-ratings", action="store_true", help="Draw every rating uniformly from 1 to 5 stars")
+    parser.add_argument("--uniform", action="store_true", help="Turn every skew off, as the ORM seeder does")
+    args = parser.parse_args()
+
+    config = SeedConfig(
+        scale=args.scale,
+        seed=args.seed,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        review_skew=args.review_skew,
+        author_skew=args.author_skew,
+        discount_overlap=args.discount_overlap,
+        rating_skew=not args.uniform_ratings,
+    )
+    if args.uniform:
+        config = replace(config, review_skew=0.0, author_skew=0.0, discount_overlap=0.0, rating_skew=False)
+    bulk_seed(create_db_engine("seed", echo=False), config)
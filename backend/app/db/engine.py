@@ -0,0 +1,214 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import BIGINT, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlmodel import create_engine
+
+from app.core.config import settings
+
+
+class PoolMetrics:
+    """
+    Connection pool counters of one engine: connections opened, checkouts, checkins and checkout wait time.
+    """
+    def __init__(self, name: str):
+        """
+        Initialize the counters.
+        :param name: Name the engine is reported under
+        """
+        self.name = name
+        self.engine: Optional[Engine] = None
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def attach(self, engine: Engine) -> None:
+        """
+        Count the pool events of an engine.
+        :param engine: Sync engine, or the sync_engine of an AsyncEngine
+        """
+        self.engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine.pool, "checkout", self._on_checkout)
+        event.listen(engine.pool, "checkin", self._on_checkin)
+        event.listen(engine.pool, "invalidate", self._on_invalidate)
+        if isinstance(engine.pool, _TimedPoolMixin):
+            engine.pool.metrics = self
+
+    def _on_connect(self, *args) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, *args) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, *args) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, *args) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        """
+        Record the time a caller waited for a connection.
+        :param seconds: Time spent in the pool, including opening a new connection
+        :param timed_out: Whether the caller gave up after DB_POOL_TIMEOUT_SECONDS
+        """
+        with self._lock:
+            self.wait_count += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the counters and the current pool occupancy.
+        :return: Dictionary of pool statistics
+        """
+        pool = self.engine.pool if self.engine is not None else None
+        with self._lock:
+            stats = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "checked_out": self.checkouts - self.checkins,
+                "wait_count": self.wait_count,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_seconds_avg": self.wait_seconds_total / self.wait_count if self.wait_count else 0.0,
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                pool_size=pool.size(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                idle=pool.checkedin(),
+            )
+        return stats
+
+
+class _TimedPoolMixin:
+    """
+    Time how long callers wait for a connection, which the pool events do not expose.
+    """
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.observe_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.observe_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # Engine.dispose() swaps in a new pool, keep reporting to the same counters
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+@compiles(BIGINT, "sqlite")
+def _compile_sqlite_bigint(type_, compiler, **kwargs) -> str:
+    # SQLite only generates IDs for INTEGER PRIMARY KEY columns, and its INTEGER is already 64-bit
+    return "INTEGER"
+
+
+def _engine_options(url: str, is_async: bool) -> Dict[str, Any]:
+    """
+    Get the create_engine keyword arguments from the settings.
+    :param url: Database URL
+    :param is_async: Whether the options are for create_async_engine
+    :return: Keyword arguments
+    """
+    options: Dict[str, Any] = {
+        "echo": settings.db_echo(),
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        # SQLite keeps the pool of its dialect, there is no server to size it for
+        return options
+
+    options.update(
+        poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def create_db_engine(name: str = "sync", url: Optional[str] = None, **overrides) -> Engine:
+    """
+    Create a sync engine configured from the settings, with pool metrics registered under the name.
+    :param name: Name the pool metrics are reported under
+    :param url: Database URL, settings.db_url() by default
+    :param overrides: create_engine keyword arguments taking precedence over the settings
+    :return: Engine
+    """
+    url = url or settings.db_url()
+    engine = create_engine(url, **{**_engine_options(url, is_async=False), **overrides})
+    pool_metrics.setdefault(name, PoolMetrics(name)).attach(engine)
+    return engine
+
+
+def create_async_db_engine(name: str = "async", url: Optional[str] = None, **overrides) -> AsyncEngine:
+    """
+    Create an async engine configured from the settings, with pool metrics registered under the name.
+    :param name: Name the pool metrics are reported under
+    :param url: Database URL, settings.async_db_url() by default
+    :param overrides: create_async_engine keyword arguments taking precedence over the settings
+    :return: AsyncEngine
+    """
+    url = url or settings.async_db_url()
+    engine = create_async_engine(url, **{**_engine_options(url, is_async=True), **overrides})
+    pool_metrics.setdefault(name, PoolMetrics(name)).attach(engine.sync_engine)
+    return engine
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the pool statistics of every engine created by the factories.
+    :return: Dictionary of engine name to pool statistics
+    """
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
@@ -0,0 +1,109 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """
+    SQL statements executed on behalf of one request: how many, how long, and how often each one repeats.
+    """
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        """
+        Record an executed statement.
+        :param statement: SQL text, bound parameters excluded so repeated lookups share a key
+        :param duration: Execution time in seconds
+        """
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def most_repeated(self) -> Tuple[Optional[str], int]:
+        """
+        Get the statement executed the most times, the signature of an N+1 pattern.
+        :return: Tuple of (statement, number of executions), (None, 0) if nothing was executed
+        """
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> Tuple[QueryStats, object]:
+    """
+    Start counting the statements executed in the current context, e.g. a request.
+    :return: Tuple of (QueryStats, token to pass to stop_query_stats)
+    """
+    stats = QueryStats()
+    return stats, _current_stats.set(stats)
+
+
+def stop_query_stats(token) -> None:
+    """
+    Stop counting the statements of the current context.
+    :param token: Token returned by start_query_stats
+    """
+    _current_stats.reset(token)
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    """
+    Get the statements counted in the current context.
+    :return: QueryStats, None outside of start_query_stats
+    """
+    return _current_stats.get()
+
+
+def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+    connection.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+    started_at = connection.info["query_started_at"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started_at)
+
+
+def _handle_error(exception_context) -> None:
+    # A failed statement never reaches after_cursor_execute, drop its start time
+    started = exception_context.connection.info.get("query_started_at") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count the statements of an engine into the QueryStats of the calling context.
+    The async engine runs its statements in greenlets sharing the context of the awaiting task, so
+    the sync_engine of an AsyncEngine is instrumented the same way.
+    :param engine: Sync engine, or the sync_engine of an AsyncEngine
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def summarize(stats: QueryStats) -> Dict[str, object]:
+    """
+    Get the fields of the per-request log line.
+    :param stats: QueryStats of the request
+    :return: Dictionary with the statement count, total DB time and most repeated statement
+    """
+    statement, repeats = stats.most_repeated()
+    return {
+        "queries": stats.count,
+        "db_ms": round(stats.duration * 1000, 2),
+        "max_repeats": repeats,
+        "most_repeated": " ".join(statement.split())[:300] if statement else None,
+    }
@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import Set
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+# backend/alembic.ini, the migrations live in backend/migrations
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Revision of the schema create_all produced before migrations existed
+BASELINE_REVISION = "0001"
+
+
+class SchemaNotMigratedError(RuntimeError):
+    """
+    The database schema is not at the latest migration.
+    """
+
+
+def alembic_config() -> Config:
+    """
+    Get the Alembic configuration of the app.
+    :return: Config reading backend/alembic.ini, leaving the logging configuration of the caller alone
+    """
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def get_head_revisions() -> Set[str]:
+    """
+    Get the latest revisions of the migration scripts.
+    :return: Set of revision IDs, one per branch
+    """
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def get_current_revisions(engine: Engine) -> Set[str]:
+    """
+    Get the revisions the database is at.
+    :param engine: Engine of the database
+    :return: Set of revision IDs, empty if no migration was ever applied
+    """
+    with engine.connect() as connection:
+        return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def upgrade_database(engine: Engine, revision: str = "head") -> None:
+    """
+    Apply the migrations up to a revision, what `alembic upgrade` does from the command line.
+    :param engine: Engine of the database
+    :param revision: Target revision
+    """
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+
+
+def check_schema_revision(engine: Engine) -> None:
+    """
+    Check that every migration was applied to the database.
+    :param engine: Engine of the database
+    :raises SchemaNotMigratedError: If the database is not at the head revision
+    """
+    current = get_current_revisions(engine)
+    head = get_head_revisions()
+    if current == head:
+        return
+
+    if not current and inspect(engine).has_table("book"):
+        # Created by create_all before the migrations existed
+        hint = f"run `alembic stamp {BASELINE_REVISION}` once, then `alembic upgrade head`"
+    else:
+        hint = "run `alembic upgrade head`"
+    raise SchemaNotMigratedError(
+        f"Database schema is at revision {', '.join(sorted(current)) or 'none'}, "
+        f"expected {', '.join(sorted(head))}: {hint} from the backend directory"
+    )
@@ -0,0 +1,135 @@
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import select, insert, update, delete, func, case, literal, text
+from sqlmodel import Session
+
+from app.models import (
+    ReviewModel, BookRatingStatsModel, DiscountModel, ActiveDiscountModel, BookModel, ProjectionRefreshModel
+)
+
+# Name of the active discounts projection in projection_refresh
+ACTIVE_DISCOUNTS = "active_discount"
+
+
+def rebuild_book_rating_stats(session: Session) -> None:
+    """
+    Rebuild the book_rating_stats aggregate from the review table.
+    Used to backfill the aggregate after bulk loads; single reviews keep it up to date incrementally.
+    :param session: Database session, the caller is responsible for committing
+    :return: None
+    """
+    star_counts = [
+        func.sum(case((ReviewModel.rating_star == star, 1), else_=0))
+        for star in range(1, 6)
+    ]
+    aggregate_query = (
+        select(
+            ReviewModel.book_id,
+            func.count(ReviewModel.id),
+            func.sum(ReviewModel.rating_star),
+            *star_counts,
+        )
+        .group_by(ReviewModel.book_id)
+    )
+
+    session.exec(delete(BookRatingStatsModel))
+    session.exec(
+        insert(BookRatingStatsModel).from_select(
+            [
+                "book_id", "review_count", "star_sum",
+                "star_1", "star_2", "star_3", "star_4", "star_5",
+            ],
+            aggregate_query,
+        )
+    )
+
+
+def _lock_active_discounts(session: Session) -> None:
+    """
+    Serialize the rebuilds of the active_discount projection until the end of the transaction.
+    Every worker rebuilds it at startup and when the day changes, and two concurrent delete-then-insert
+    rebuilds would collide on the primary key. Readers are not blocked, they keep seeing the previous rows.
+    SQLite already serializes writers.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        session.exec(text("LOCK TABLE active_discount IN EXCLUSIVE MODE"))
+
+
+def rebuild_active_discounts(session: Session, today: Optional[date] = None) -> None:
+    """
+    Rebuild the active_discount projection from the discount table.
+    Each book with a discount running on the given day gets one row holding its lowest discount price,
+    and book.effective_price is set to that price, or to book_price for the books without one.
+    The projection is only right for that day, so it is rebuilt when the day changes and after discounts are written.
+    The day is recorded in projection_refresh, see refresh_active_discounts.
+    :param session: Database session, the caller is responsible for committing
+    :param today: Day the discounts must be running on, defaults to the current day
+    :return: None
+    """
+    today = today or date.today()
+    active_query = (
+        select(
+            DiscountModel.book_id,
+            func.min(DiscountModel.discount_price),
+            literal(today),
+        )
+        .where(
+            DiscountModel.discount_start_date <= today,
+            DiscountModel.discount_end_date >= today,
+        )
+        .group_by(DiscountModel.book_id)
+    )
+
+    _lock_active_discounts(session)
+    session.exec(delete(ActiveDiscountModel))
+    session.exec(
+        insert(ActiveDiscountModel).from_select(
+            ["book_id", "discount_price", "refreshed_on"],
+            active_query,
+        )
+    )
+
+    # Only the books whose price moved are written, so an unchanged day costs no book update
+    discount_price = (
+        select(ActiveDiscountModel.discount_price)
+        .where(ActiveDiscountModel.book_id == BookModel.id)
+        .scalar_subquery()
+    )
+    effective_price = func.coalesce(discount_price, BookModel.book_price)
+    session.exec(
+        update(BookModel)
+        .where(BookModel.effective_price.is_distinct_from(effective_price))
+        .values(effective_price=effective_price)
+    )
+    session.merge(ProjectionRefreshModel(name=ACTIVE_DISCOUNTS, refreshed_on=today))
+
+
+def _active_discounts_refreshed_on(session: Session) -> Optional[date]:
+    """
+    Get the day the active_discount projection was last rebuilt for, None if it never was.
+    """
+    return session.exec(
+        select(ProjectionRefreshModel.refreshed_on).where(ProjectionRefreshModel.name == ACTIVE_DISCOUNTS)
+    ).scalar_one_or_none()
+
+
+def refresh_active_discounts(session: Session, today: Optional[date] = None) -> bool:
+    """
+    Rebuild the active_discount projection unless it was already rebuilt for the given day.
+    The day is read from projection_refresh rather than from the projection rows, so a day without any
+    running discount counts as rebuilt too.
+    :param session: Database session, the caller is responsible for committing
+    :param today: Day the discounts must be running on, defaults to the current day
+    :return: True if the projection was rebuilt
+    """
+    today = today or date.today()
+    # Checked without the lock first, every worker polls and the day only changes once
+    if _active_discounts_refreshed_on(session) == today:
+        return False
+    # Checked again under the lock, so a worker waiting on another one's rebuild sees it and skips its own
+    _lock_active_discounts(session)
+    if _active_discounts_refreshed_on(session) == today:
+        return False
+    rebuild_active_discounts(session, today)
+    return True
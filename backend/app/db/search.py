@@ -0,0 +1,224 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import table, column, select, insert, delete, func, or_, literal, literal_column, text, Float
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlmodel import Session
+
+from app.models import BookModel, AuthorModel, CategoryModel
+
+
+class BookSearchBackend:
+    """
+    Book search backend matching the search term with ILIKE on book title and author name.
+    It is the fallback for databases without a dedicated full-text backend, and the base class of the others.
+    """
+    search_table = None
+    # Whether a search query can also compute COUNT(*) OVER(), otherwise listings count the matches separately
+    window_count = True
+
+    def ensure_schema(self, connection) -> None:
+        """
+        Create the tables and indexes the backend needs.
+        :param connection: Database connection
+        """
+
+    def is_indexed(self, session: Session) -> bool:
+        """
+        Check whether the search index holds any document.
+        :param session: Database session
+        :return: True if the index is populated or the backend has no index
+        """
+        if self.search_table is None:
+            return True
+        return session.exec(select(literal(1)).select_from(self.search_table).limit(1)).first() is not None
+
+    def reindex_books(self, session: Session, where=None) -> None:
+        """
+        Rebuild the search documents of the books matching the where clause, or of every book.
+        :param session: Database session, the caller is responsible for committing
+        :param where: Optional filter on BookModel, AuthorModel or CategoryModel
+        """
+
+    def apply_search(self, query, query_term: str) -> Tuple:
+        """
+        Restrict a book query to the books matching the search term.
+        :param query: Query selecting from BookModel joined with AuthorModel
+        :param query_term: Search term typed by the user
+        :return: Tuple of (filtered query, rank expression where a higher rank is a better match)
+        """
+        return self.apply_fallback(query, query_term)
+
+    def apply_fallback(self, query, query_term: str) -> Tuple:
+        """
+        Restrict a book query to the books loosely matching the search term.
+        Used when apply_search finds nothing, typically because of a typo.
+        :param query: Query selecting from BookModel joined with AuthorModel
+        :param query_term: Search term typed by the user
+        :return: Tuple of (filtered query, rank expression where a higher rank is a better match)
+        """
+        pattern = f"%{query_term}%"
+        query = query.where(
+            or_(
+                BookModel.book_title.ilike(pattern),
+                AuthorModel.author_name.ilike(pattern),
+            )
+        )
+        return query, literal(0.0, Float)
+
+    @staticmethod
+    def _tokens(query_term: str) -> List[str]:
+        """
+        Split a search term into lower case word tokens, dropping any query syntax.
+        """
+        return re.findall(r"\w+", query_term.lower())
+
+    @staticmethod
+    def _document_source(where=None):
+        """
+        Get the rows the search documents are built from.
+        """
+        query = (
+            select(
+                BookModel.id,
+                func.coalesce(BookModel.book_title, ""),
+                func.coalesce(AuthorModel.author_name, ""),
+                func.coalesce(CategoryModel.category_name, ""),
+                func.coalesce(BookModel.book_summary, ""),
+            )
+            .join(AuthorModel, BookModel.author_id == AuthorModel.id)
+            .join(CategoryModel, BookModel.category_id == CategoryModel.id)
+        )
+        return query.where(where) if where is not None else query
+
+
+class PostgresBookSearchBackend(BookSearchBackend):
+    """
+    Postgres search backend.
+    Each book has a weighted tsvector (title, author, category, summary) in book_search with a GIN index.
+    Terms are matched as prefixes and ranked with ts_rank, typos fall back to pg_trgm similarity.
+    """
+    search_table = table(
+        "book_search",
+        column("book_id"),
+        column("document", TSVECTOR),
+    )
+
+    def ensure_schema(self, connection) -> None:
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS book_search ("
+            "book_id BIGINT PRIMARY KEY REFERENCES book(id) ON DELETE CASCADE, "
+            "document TSVECTOR NOT NULL)"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_book_search_document ON book_search USING gin (document)"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_book_title_trgm ON book USING gin (book_title gin_trgm_ops)"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_author_name_trgm ON author USING gin (author_name gin_trgm_ops)"
+        ))
+
+    def reindex_books(self, session: Session, where=None) -> None:
+        source = self._document_source(where).subquery()
+        book_id, title, author, category, summary = source.c
+        document = (
+            func.setweight(func.to_tsvector("english", title), "A")
+            .op("||")(func.setweight(func.to_tsvector("english", author), "B"))
+            .op("||")(func.setweight(func.to_tsvector("english", category), "C"))
+            .op("||")(func.setweight(func.to_tsvector("english", summary), "D"))
+        )
+        session.exec(delete(self.search_table).where(self.search_table.c.book_id.in_(select(book_id))))
+        session.exec(
+            insert(self.search_table).from_select(["book_id", "document"], select(book_id, document))
+        )
+
+    def apply_search(self, query, query_term: str) -> Tuple:
+        tokens = self._tokens(query_term)
+        if not tokens:
+            return self.apply_fallback(query, query_term)
+
+        ts_query = func.to_tsquery("english", " & ".join(f"{token}:*" for token in tokens))
+        document = self.search_table.c.document
+        query = query.join(self.search_table, self.search_table.c.book_id == BookModel.id).where(
+            document.op("@@")(ts_query)
+        )
+        return query, func.ts_rank(document, ts_query)
+
+    def apply_fallback(self, query, query_term: str) -> Tuple:
+        # "%" is the pg_trgm similarity operator, served by the trigram GIN indexes
+        query = query.where(
+            or_(
+                BookModel.book_title.op("%")(query_term),
+                AuthorModel.author_name.op("%")(query_term),
+            )
+        )
+        rank = func.greatest(
+            func.similarity(BookModel.book_title, query_term),
+            func.similarity(AuthorModel.author_name, query_term),
+        )
+        return query, rank
+
+
+class SqliteBookSearchBackend(BookSearchBackend):
+    """
+    SQLite stand-in for the Postgres backend so search can run offline.
+    Book documents live in an FTS5 table keyed by rowid = book id, ranked with bm25 using the same column weights.
+    """
+    search_table = table(
+        "book_search",
+        column("rowid"),
+        column("title"),
+        column("author"),
+        column("category"),
+        column("summary"),
+    )
+    # FTS5 refuses bm25 in a statement with a window function
+    window_count = False
+
+    def ensure_schema(self, connection) -> None:
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS book_search "
+            "USING fts5(title, author, category, summary, tokenize='porter unicode61')"
+        ))
+
+    def reindex_books(self, session: Session, where=None) -> None:
+        source = self._document_source(where)
+        session.exec(delete(self.search_table).where(
+            self.search_table.c.rowid.in_(select(source.subquery().c[0]))
+        ))
+        session.exec(
+            insert(self.search_table).from_select(
+                ["rowid", "title", "author", "category", "summary"], source
+            )
+        )
+
+    def apply_search(self, query, query_term: str) -> Tuple:
+        tokens = self._tokens(query_term)
+        if not tokens:
+            return self.apply_fallback(query, query_term)
+
+        match = " ".join(f'"{token}"*' for token in tokens)
+        query = query.join(self.search_table, self.search_table.c.rowid == BookModel.id).where(
+            literal_column("book_search").op("MATCH")(match)
+        )
+        # bm25 is lower for better matches
+        rank = -func.bm25(literal_column("book_search"), 10.0, 5.0, 2.0, 1.0)
+        return query, rank
+
+
+_backends: Dict[str, BookSearchBackend] = {
+    "postgresql": PostgresBookSearchBackend(),
+    "sqlite": SqliteBookSearchBackend(),
+}
+
+
+def get_search_backend(dialect_name: Optional[str]) -> BookSearchBackend:
+    """
+    Get the search backend for a database dialect.
+    :param dialect_name: Name of the SQLAlchemy dialect, e.g. "postgresql"
+    :return: BookSearchBackend instance
+    """
+    return _backends.get(dialect_name, BookSearchBackend())
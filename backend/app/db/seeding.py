@@ -1,7 +1,7 @@
 import random
 from datetime import datetime, timedelta
 from faker import Faker
-from sqlmodel import Session, create_engine
+from sqlmodel import Session
 from typing import List
 from decimal import Decimal
 from passlib.context import CryptContext
@@ -17,14 +17,15 @@ from app.models import (
     OrderModel,
     OrderItemModel
 )
-from app.core.config import settings
+from app.db.engine import create_db_engine
+from app.db.projections import rebuild_book_rating_stats, rebuild_active_discounts
+from app.db.search import get_search_backend
 
 # Initialize Faker
 fake = Faker()
 
-# Database connection
-DATABASE_URL = settings.db_url()  # Change to your actual database URL
-engine = create_engine(DATABASE_URL)
+# Database connection, configured by the same settings as the app
+engine = create_db_engine("seed")
 
 # Number of records to generate
 NUM_USERS = 500
@@ -143,6 +144,13 @@ def create_books(session: Session, categories: List[CategoryModel], authors: Lis
             session.commit()
             print(f"Created {len(books)} books so far...")
 
+    # Index the seeded books for full-text search
+    search_backend = get_search_backend(engine.dialect.name)
+    with engine.begin() as connection:
+        search_backend.ensure_schema(connection)
+    search_backend.reindex_books(session)
+    session.commit()
+
     print(f"Created total of {len(books)} books")
     return books
 
@@ -216,6 +224,10 @@ def create_reviews(session: Session, books: List[BookModel], users: List[UserMod
             session.commit()
             print(f"Created {len(reviews)} reviews so far...")
 
+    # Aggregate the seeded reviews into book_rating_stats
+    rebuild_book_rating_stats(session)
+    session.commit()
+
     print(f"Created total of {len(reviews)} reviews")
     return reviews
 
@@ -255,6 +267,10 @@ def create_discounts(session: Session, books: List[BookModel]) -> List[DiscountM
             session.commit()
             print(f"Created {len(discounts)} discounts so far...")
 
+    # Project the discounts running today
+    rebuild_active_discounts(session)
+    session.commit()
+
     print(f"Created total of {len(discounts)} discounts")
     return discounts
 
@@ -1,22 +1,28 @@
-from sqlmodel import Session, create_engine, SQLModel
-from typing import Generator, Any
+from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import AsyncGenerator, Any
 from decimal import Decimal
 
-from app.core.config import settings
+from app.db.engine import create_db_engine, create_async_db_engine
+from app.db.instrumentation import instrument_engine
 
-# Create the database engine
-engine = create_engine(
-    settings.db_url(),
-    echo=True,
-    pool_pre_ping=True,
-)
+# Create the database engine, used for schema setup and scripts
+engine = create_db_engine("sync")
 
-def get_session() -> Generator[Session, Any, Any]:
+# Create the async database engine, used by the request handlers
+async_engine = create_async_db_engine("async")
+
+# Count the statements of each request, see QueryStatsMiddleware
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+async def get_session() -> AsyncGenerator[AsyncSession, Any]:
     """
-    Create a new session.
-    :return: Session
+    Create a new async session.
+    Objects are not expired on commit, so they can be read afterwards without an implicit (blocking) reload.
+    :return: AsyncSession
     """
-    with Session(engine) as session:
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
         yield session
 
 
@@ -180,6 +186,11 @@ def create_fake_data():
         session.add_all(discounts)
         session.commit()
 
+        # Project the discounts running today
+        from app.db.projections import rebuild_active_discounts
+        rebuild_active_discounts(session)
+        session.commit()
+
         print("Creating admin user...")
         # Create admin user
         admin = UserModel(
@@ -208,7 +219,9 @@ def create_fake_data():
 def init_db() -> None:
     """
     Initialize the database.
+    The tables are created by the migrations (`alembic upgrade head`), this only checks they were applied.
     :return: None
+    :raises SchemaNotMigratedError: If the database is not at the latest migration
     """
     from app.models import (
         UserModel,
@@ -218,11 +231,35 @@ def init_db() -> None:
         DiscountModel,
         OrderModel,
         OrderItemModel,
-        ReviewModel
+        ReviewModel,
+        BookRatingStatsModel,
+        ActiveDiscountModel
     )
+    from app.db.migrations import check_schema_revision
+    from app.db.projections import rebuild_book_rating_stats, refresh_active_discounts
+    from app.db.search import get_search_backend
+
 
+    check_schema_revision(engine)
 
-    SQLModel.metadata.create_all(engine)
+    search_backend = get_search_backend(engine.dialect.name)
+    with engine.begin() as connection:
+        search_backend.ensure_schema(connection)
+
+    # Backfill the rating aggregate for reviews written before it existed
+    with Session(engine) as session:
+        if session.exec(select(BookRatingStatsModel.book_id).limit(1)).first() is None:
+            rebuild_book_rating_stats(session)
+            session.commit()
+
+        # Project the discounts running today, unless another process already did
+        if refresh_active_discounts(session):
+            session.commit()
+
+        # Build the search index for books written before it existed
+        if not search_backend.is_indexed(session):
+            search_backend.reindex_books(session)
+            session.commit()
 
     # Create fake data
     # create_fake_data()
@@ -0,0 +1,24 @@
+from typing import Dict, Iterable
+
+from sqlalchemy import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import TableVersionModel
+
+
+async def get_table_versions(session: AsyncSession, table_names: Iterable[str]) -> Dict[str, int]:
+    """
+    Get the change counters of some tables, bumped by triggers on every write (migrations 0004 and 0008).
+    A counter is the sum of the slots of its table, which only grows and only moves when a write commits.
+    :param session: Database session
+    :param table_names: Names of the tables
+    :return: Dictionary of table name to version, 0 for a table without a counter
+    """
+    table_names = list(table_names)
+    rows = (await session.exec(
+        select(TableVersionModel.table_name, func.sum(TableVersionModel.version).label("version"))
+        .where(TableVersionModel.table_name.in_(table_names))
+        .group_by(TableVersionModel.table_name)
+    )).all()
+    versions = {row.table_name: row.version for row in rows}
+    return {name: versions.get(name, 0) for name in table_names}
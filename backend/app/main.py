@@ -1,21 +1,152 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+from sqlmodel.ext.asyncio.session import AsyncSession
+import asyncio
+import logging
+from typing import Any, Dict, List
 import uvicorn
 
-from app.db.session import init_db
+from app.core.config import settings
+from app.controllers.BookController import BookController, book_carousel_cache
+from app.db.engine import get_pool_stats
+from app.db.projections import refresh_active_discounts
+from app.db.session import init_db, async_engine
+from app.core.security.dependencies import user_cache, load_user_changes
+from app.core.security.password import password_pool
+from app.utils.metrics import registry, MetricFamily, CONTENT_TYPE
+from app.utils.middlewares.HttpCacheMiddleware import HttpCacheMiddleware, table_version_cache
+from app.utils.middlewares.MetricsMiddleware import MetricsMiddleware
 from app.utils.middlewares.JWTMiddleware import JWTMiddleware
+from app.utils.middlewares.QueryStatsMiddleware import QueryStatsMiddleware
 from app.api.v1.endpoint import BookRoute, UserRoute, AuthRoute, ReviewRoute, AuthorRoute, CategoryRoute, OrderRoute
 
+logger = logging.getLogger(__name__)
+
+
+async def refresh_suggest_index(full: bool = False) -> None:
+    """
+    Reload book titles and author names into the search-as-you-type index if they changed.
+    :param full: Rebuild the whole index
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        await BookController(session).refresh_suggest_index(full=full)
+
+
+async def refresh_suggest_index_periodically() -> None:
+    """
+    Pick up books and authors written outside this process, e.g. by the seeder or other workers.
+    """
+    while True:
+        await asyncio.sleep(settings.SUGGEST_INDEX_REFRESH_SECONDS)
+        try:
+            await refresh_suggest_index()
+        except Exception:
+            logger.exception("Failed to refresh the suggest index")
+
+
+async def refresh_active_discounts_periodically() -> None:
+    """
+    Rebuild the active discounts projection once the day changes, discounts starting or ending that day move in or out.
+    """
+    while True:
+        await asyncio.sleep(settings.ACTIVE_DISCOUNT_REFRESH_SECONDS)
+        try:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                if await session.run_sync(refresh_active_discounts):
+                    await session.commit()
+                    book_carousel_cache.invalidate()
+        except Exception:
+            logger.exception("Failed to refresh the active discounts")
+
+
+async def refresh_user_changes_periodically() -> None:
+    """
+    Stop trusting the access tokens of users updated or deleted by other workers.
+    """
+    while True:
+        await asyncio.sleep(settings.USER_CHANGE_REFRESH_SECONDS)
+        try:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                await load_user_changes(session)
+        except Exception:
+            logger.exception("Failed to load the user changes")
+
+
+def _family(name: str, kind: str, help: str, label: str, values: Dict[str, Dict[str, Any]], key: str) -> MetricFamily:
+    """
+    Build a metric family from one counter of several components, labelled by component name.
+    """
+    samples = [("", {label: component}, stats[key]) for component, stats in values.items() if key in stats]
+    return MetricFamily(name, kind, help, samples)
+
+
+def collect_runtime_metrics() -> List[MetricFamily]:
+    """
+    Read the counters kept by the connection pools, the caches and the password worker pool.
+    """
+    pools = get_pool_stats()
+    caches = {
+        "book_carousel": book_carousel_cache.stats(),
+        "user": user_cache.stats(),
+        "table_version": table_version_cache.stats(),
+    }
+    password = {"password": password_pool.stats()}
+    return [
+        _family("db_pool_size", "gauge", "Connections kept open by the pool", "engine", pools, "pool_size"),
+        _family("db_pool_checked_out", "gauge", "Connections in use", "engine", pools, "checked_out"),
+        _family("db_pool_idle", "gauge", "Open connections waiting in the pool", "engine", pools, "idle"),
+        _family("db_pool_overflow", "gauge", "Connections open beyond the pool size", "engine", pools, "overflow"),
+        _family("db_pool_connects_total", "counter", "Connections opened", "engine", pools, "connects"),
+        _family("db_pool_checkouts_total", "counter", "Connections taken from the pool", "engine", pools, "checkouts"),
+        _family("db_pool_timeouts_total", "counter", "Checkouts that timed out waiting for a connection", "engine", pools, "timeouts"),
+        _family("db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection", "engine", pools, "wait_seconds_total"),
+        _family("db_pool_wait_seconds_max", "gauge", "Longest wait for a connection", "engine", pools, "wait_seconds_max"),
+        _family("cache_entries", "gauge", "Entries in the cache", "cache", caches, "size"),
+        _family("cache_hits_total", "counter", "Cache lookups finding a fresh entry", "cache", caches, "hits"),
+        _family("cache_misses_total", "counter", "Cache lookups finding no fresh entry", "cache", caches, "misses"),
+        _family("cache_hit_ratio", "gauge", "Share of the cache lookups finding a fresh entry", "cache", caches, "hit_ratio"),
+        _family("executor_workers", "gauge", "Threads of the executor", "executor", password, "workers"),
+        _family("executor_running", "gauge", "Calls running on the executor", "executor", password, "running"),
+        _family("executor_queue_depth", "gauge", "Calls waiting for a thread of the executor", "executor", password, "queued"),
+        _family("executor_completed_total", "counter", "Calls completed by the executor", "executor", password, "completed"),
+        _family("executor_failed_total", "counter", "Calls that raised on the executor", "executor", password, "failed"),
+        _family("executor_rejected_total", "counter", "Calls rejected because the executor was saturated", "executor", password, "rejected"),
+        _family("executor_wait_seconds_total", "counter", "Time calls waited for a thread", "executor", password, "wait_seconds_total"),
+    ]
+
+
+registry.add_collector(collect_runtime_metrics)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: initialize db
+    # Startup: initialize db (projecting today's discounts), build the in-memory suggest index and load the recent user changes
     init_db()
+    await refresh_suggest_index(full=True)
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        await load_user_changes(session)
+    background_tasks = [
+        asyncio.create_task(refresh_suggest_index_periodically()),
+        asyncio.create_task(refresh_active_discounts_periodically()),
+        asyncio.create_task(refresh_user_changes_periodically()),
+    ]
     yield
+    # Shutdown: stop background tasks
+    for task in background_tasks:
+        task.cancel()
+    for task in background_tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    await async_engine.dispose()
+    password_pool.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
 
+# Add HTTP caching middleware, inside CORS so 304 responses get the CORS headers too
+app.add_middleware(HttpCacheMiddleware)
+
 # Add CORS middleware
 origins = [
     "http://localhost:3000",
@@ -32,6 +163,12 @@ app.add_middleware(
 # Add JWT middleware
 app.add_middleware(JWTMiddleware)
 
+# Add query instrumentation middleware, so the token lookup is counted too
+app.add_middleware(QueryStatsMiddleware)
+
+# Add metrics middleware, outermost so the latency covers every other middleware
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(BookRoute.router, prefix="/api/v1", tags=["Books"])
 app.include_router(UserRoute.router, prefix="/api/v1", tags=["Users"])
@@ -45,5 +182,12 @@ app.include_router(OrderRoute.router, prefix="/api/v1", tags=["Orders"])
 def root():
     return {"message": "Authentication API is running 🚀"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Expose the app metrics in the Prometheus text format.
+    """
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
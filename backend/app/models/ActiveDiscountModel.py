@@ -0,0 +1,12 @@
+from datetime import date
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, BIGINT, DATE, Numeric, ForeignKey
+
+# Lowest discount price of each book on discount on the refreshed_on day.
+# Projection of the discount table, rebuilt by rebuild_active_discounts when the day changes and after discounts are written.
+class ActiveDiscountModel(SQLModel, table=True):
+    __tablename__ = "active_discount"
+
+    book_id: int = Field(sa_column=Column(BIGINT, ForeignKey("book.id"), primary_key=True))
+    discount_price: float = Field(sa_column=Column(Numeric(5, 2), nullable=False))
+    refreshed_on: date = Field(sa_column=Column(DATE, nullable=False))
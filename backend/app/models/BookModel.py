@@ -1,9 +1,22 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, Numeric, Text, BIGINT, VARCHAR
+from sqlalchemy import Column, Numeric, Text, BIGINT, VARCHAR, Index
+
+
+def _default_effective_price(context):
+    # A new book starts at its own price, the active discounts projection lowers it while a discount runs
+    return context.get_current_parameters()["book_price"]
+
 
 class BookModel(SQLModel, table=True):
     __tablename__ = "book"
+    __table_args__ = (
+        # Category and author filters of the catalog, paginated by id
+        Index("ix_book_category_id", "category_id", "id"),
+        Index("ix_book_author_id", "author_id", "id"),
+        # Catalog sorted and filtered by effective price, paginated by id
+        Index("ix_book_effective_price", "effective_price", "id"),
+    )
 
     id: Optional[int] = Field(
         sa_column=Column(BIGINT, primary_key=True, autoincrement=True)
@@ -13,4 +26,8 @@ class BookModel(SQLModel, table=True):
     book_title: str = Field(sa_column=Column(VARCHAR(255)))
     book_summary: str = Field(sa_column=Column(Text))
     book_price: float = Field(sa_column=Column(Numeric(5, 2)))
-    book_cover_photo: str = Field(sa_column=Column(VARCHAR(256)))
\ No newline at end of file
+    book_cover_photo: str = Field(sa_column=Column(VARCHAR(256)))
+    # Price after the lowest active discount, maintained by rebuild_active_discounts
+    effective_price: float = Field(
+        default=None, sa_column=Column(Numeric(5, 2), nullable=False, default=_default_effective_price)
+    )
@@ -0,0 +1,18 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, BIGINT, Integer, ForeignKey, Index
+
+class BookRatingStatsModel(SQLModel, table=True):
+    __tablename__ = "book_rating_stats"
+    __table_args__ = (
+        # Most reviewed books of the popular carousel
+        Index("ix_book_rating_stats_review_count", "review_count", "book_id"),
+    )
+
+    book_id: int = Field(sa_column=Column(BIGINT, ForeignKey("book.id"), primary_key=True))
+    review_count: int = Field(default=0, sa_column=Column(Integer, nullable=False, default=0))
+    star_sum: int = Field(default=0, sa_column=Column(Integer, nullable=False, default=0))
+    star_1: int = Field(default=0, sa_column=Column(Integer, nullable=False, default=0))
+    star_2: int = Field(default=0, sa_column=Column(Integer, nullable=False, default=0))
+    star_3: int = Field(default=0, sa_column=Column(Integer, nullable=False, default=0))
+    star_4: int = Field(default=0, sa_column=Column(Integer, nullable=False, default=0))
+    star_5: int = Field(default=0, sa_column=Column(Integer, nullable=False, default=0))
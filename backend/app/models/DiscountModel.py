@@ -1,9 +1,15 @@
 from datetime import date
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, BIGINT, DATE, Numeric
+from sqlalchemy import Column, BIGINT, DATE, Numeric, Index
 
 class DiscountModel(SQLModel, table=True):
     __tablename__ = "discount"
+    __table_args__ = (
+        # Covers the active discount lookup used to compute a book's effective price
+        Index("ix_discount_book_active", "book_id", "discount_start_date", "discount_end_date", "discount_price"),
+        # Covers the scans of the discounts active today, most discounts have already ended
+        Index("ix_discount_active_period", "discount_end_date", "discount_start_date", "book_id", "discount_price"),
+    )
 
     id: int = Field(sa_column=Column(BIGINT, primary_key=True, autoincrement=True))
     book_id: int = Field(foreign_key="book.id")
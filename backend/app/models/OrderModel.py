@@ -1,6 +1,6 @@
 from sqlmodel import SQLModel, Field
 from datetime import datetime
-from sqlalchemy import Column, BIGINT, DATE, Numeric, SMALLINT
+from sqlalchemy import Column, BIGINT, DATE, Numeric, SMALLINT, Index
 
 class OrderModel(SQLModel, table=True):
     __tablename__ = "order"
@@ -13,6 +13,10 @@ class OrderModel(SQLModel, table=True):
 
 class OrderItemModel(SQLModel, table=True):
     __tablename__ = "order_item"
+    __table_args__ = (
+        # Items of an order
+        Index("ix_order_item_order_id", "order_id"),
+    )
 
     id: int = Field(sa_column=Column(BIGINT, primary_key=True, autoincrement=True))
     order_id: int = Field(foreign_key="order.id")
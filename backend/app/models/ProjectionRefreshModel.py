@@ -0,0 +1,11 @@
+from datetime import date
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, VARCHAR, DATE
+
+# Day each daily projection was last rebuilt for, by projection name.
+# Kept apart from the projection rows, so a projection with no row for the day still counts as rebuilt.
+class ProjectionRefreshModel(SQLModel, table=True):
+    __tablename__ = "projection_refresh"
+
+    name: str = Field(sa_column=Column(VARCHAR(64), primary_key=True))
+    refreshed_on: date = Field(sa_column=Column(DATE, nullable=False))
@@ -1,9 +1,14 @@
 from datetime import datetime, timezone
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, BIGINT, Text
+from sqlalchemy import Column, BIGINT, Text, Index
 
 class ReviewModel(SQLModel, table=True):
     __tablename__ = "review"
+    __table_args__ = (
+        # Reviews of a book sorted by date, optionally filtered by star rating
+        Index("ix_review_book_date", "book_id", "review_date"),
+        Index("ix_review_book_star_date", "book_id", "rating_star", "review_date"),
+    )
 
     id: int = Field(sa_column=Column(BIGINT, primary_key=True, autoincrement=True))
     book_id: int = Field(foreign_key="book.id")
@@ -0,0 +1,13 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, BIGINT, VARCHAR, SMALLINT
+
+# Change counter of a catalog table, bumped by database triggers on every insert, update and delete.
+# Each table has one row per slot and its version is their sum: a write bumps the slot of its transaction,
+# so concurrent writers of a table rarely wait on the same row (migration 0008).
+# HttpCacheMiddleware builds the ETags of the catalog reads from these counters.
+class TableVersionModel(SQLModel, table=True):
+    __tablename__ = "table_version"
+
+    table_name: str = Field(sa_column=Column(VARCHAR(64), primary_key=True))
+    slot: int = Field(default=0, sa_column=Column(SMALLINT, primary_key=True, default=0))
+    version: int = Field(default=0, sa_column=Column(BIGINT, nullable=False, default=0))
@@ -0,0 +1,10 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, VARCHAR, Float
+
+# Last change of each user updated or deleted within the lifetime of an access token, by email.
+# Written in the transaction of the change and polled by every worker, so access tokens issued before stop being trusted everywhere.
+class UserChangeModel(SQLModel, table=True):
+    __tablename__ = "user_change"
+
+    email: str = Field(sa_column=Column(VARCHAR(70), primary_key=True))
+    changed_at: float = Field(sa_column=Column(Float, nullable=False))
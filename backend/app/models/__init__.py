@@ -5,6 +5,11 @@ from app.models.DiscountModel import DiscountModel
 from app.models.OrderModel import OrderModel, OrderItemModel
 from app.models.UserModel import UserModel
 from app.models.ReviewModel import ReviewModel
+from app.models.BookRatingStatsModel import BookRatingStatsModel
+from app.models.ActiveDiscountModel import ActiveDiscountModel
+from app.models.TableVersionModel import TableVersionModel
+from app.models.UserChangeModel import UserChangeModel
+from app.models.ProjectionRefreshModel import ProjectionRefreshModel
 
 
 __all__ = [
@@ -15,5 +20,10 @@ __all__ = [
     "OrderModel",
     "OrderItemModel",
     "UserModel",
-    "ReviewModel"
+    "ReviewModel",
+    "BookRatingStatsModel",
+    "ActiveDiscountModel",
+    "TableVersionModel",
+    "UserChangeModel",
+    "ProjectionRefreshModel"
 ]
\ No newline at end of file
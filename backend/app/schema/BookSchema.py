@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 
 class BookSchema(BaseModel):
     """Book Base Schema"""
@@ -28,3 +28,15 @@ class BookCreate(BookSchema):
 class BookUpdate(BookSchema):
     """Book Update Schema"""
     pass
+
+
+class BookBatchResponse(BaseModel):
+    """Book Batch Response Schema"""
+    data: List[BookResponse]
+    missing: List[int] = Field(default_factory=list, description="Requested IDs with no book")
+
+class BookSuggestion(BaseModel):
+    """Search-as-you-type Suggestion Schema"""
+    type: str = Field(..., description="Suggestion kind: book or author")
+    id: int
+    text: str
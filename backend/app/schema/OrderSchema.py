@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime, timezone
+from typing import Optional
 
 from app.models.OrderModel import OrderModel, OrderItemModel
 
@@ -27,8 +28,32 @@ class OrderResponse(OrderSchema):
     order_items: list[OrderItemSchema] = Field(default_factory=list)
     order_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
-class OrderCreate(OrderSchema):
+class OrderItemCreate(BaseModel):
+    """
+    Order Item Create Schema, the price is set by the server
+    """
+    book_id: int = Field(..., gt=0)
+    quantity: int = Field(..., gt=0)
+
+class OrderCreate(BaseModel):
     """
     Order Create Schema
+    The amount is computed by the server, a given order_amount is advisory
+    """
+    user_id: int = Field(..., gt=0)
+    order_amount: Optional[float] = Field(None, gt=0)
+    order_items: list[OrderItemCreate] = Field(..., min_length=1)
+
+class CartQuoteItem(OrderItemCreate):
+    """
+    Cart Quote Item Schema
+    """
+    unit_price: float
+    total_price: float
+
+class CartQuote(BaseModel):
+    """
+    Cart Quote Schema
     """
-    order_items: list[OrderItemSchema] = Field(default_factory=list)
\ No newline at end of file
+    order_items: list[CartQuoteItem]
+    order_amount: float
\ No newline at end of file
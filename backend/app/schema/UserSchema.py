@@ -23,3 +23,4 @@ class UserResponse(UserSchema):
 class UserUpdate(UserSchema):
     """User Update Schema"""
     password: str = Field(..., min_length=8, max_length=16)
+    old_password: str = Field(..., min_length=1)
@@ -0,0 +1,162 @@
+import re
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.db.session import async_engine
+from app.db.table_versions import get_table_versions
+from app.utils.cache import TTLCache
+
+
+class CacheRule(NamedTuple):
+    """
+    HTTP caching of the GET requests to the paths matching pattern.
+    Responses depending on tables get an ETag built from the versions of these tables, the others only get
+    cache_control (e.g. responses served from an in-process cache refreshed on its own schedule).
+    """
+    pattern: str
+    cache_control: str
+    tables: Tuple[str, ...] = ()
+
+
+# Tables a book response is built from: the book row, its author and category names, its current price and its ratings
+BOOK_TABLES = ("book", "author", "category", "active_discount", "book_rating_stats")
+
+DEFAULT_RULES = [
+    CacheRule(r"/api/v1/books/(?:discounts|search|batch|\d+)?", "public, max-age=30, stale-while-revalidate=30", BOOK_TABLES),
+    CacheRule(r"/api/v1/books/(?:top-discounted|recommended|popular)",
+              f"public, max-age={settings.BOOK_CAROUSEL_CACHE_TTL_SECONDS:g}"),
+    CacheRule(r"/api/v1/books/suggest", f"public, max-age={settings.SUGGEST_INDEX_REFRESH_SECONDS:g}"),
+    CacheRule(r"/api/v1/authors/", "public, max-age=300", ("author",)),
+    CacheRule(r"/api/v1/categories/", "public, max-age=300", ("category",)),
+    # Browsers revalidate so a reviewer sees their own review, shared caches may serve it for a while
+    CacheRule(r"/api/v1/reviews/book/\d+", "public, max-age=0, s-maxage=30", ("review", "book_rating_stats")),
+]
+
+# Table versions are shared by every request for a short while, so busy endpoints do not read them each time
+table_version_cache = TTLCache(maxsize=len(DEFAULT_RULES), ttl=settings.TABLE_VERSION_CACHE_TTL_SECONDS)
+
+
+def _find_route(routes: Iterable[BaseRoute], scope: Scope) -> Tuple[Optional[BaseRoute], Scope]:
+    """
+    Find the route fully matching a request.
+    :param routes: The routes to search, in the order of the router
+    :param scope: ASGI connection scope
+    :return: The route and its child scope, None if no route matches
+    """
+    for route in routes:
+        # Recent FastAPI versions keep included routers whole and only pick their route while handling the request
+        included_router = getattr(route, "original_router", None)
+        if included_router is not None:
+            prefix = route.include_context.prefix
+            if scope["path"].startswith(prefix):
+                found, child_scope = _find_route(included_router.routes, {**scope, "path": scope["path"][len(prefix):]})
+                if found is not None:
+                    return found, child_scope
+            continue
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            return route, child_scope
+    return None, {}
+
+
+class HttpCacheMiddleware:
+    """
+    Add ETag and Cache-Control headers to the catalog reads, and answer If-None-Match with 304 Not Modified.
+    The ETag is built from the version counters of the tables the response depends on, which triggers bump on
+    every write, instead of hashing the body, so a matching If-None-Match is answered with one small query and
+    without running the endpoint.
+    The versions are read before the endpoint runs, and may come from table_version_cache: a write landing in
+    between gives a newer body under the older ETag, which a later request replaces, never an older body under
+    a newer ETag. A write is seen by revalidations after at most TABLE_VERSION_CACHE_TTL_SECONDS.
+    Plain ASGI middleware, so it adds no task or body stream per request.
+    """
+    def __init__(self, app: ASGIApp, rules: Optional[List[CacheRule]] = None):
+        """
+        Initialize the middleware.
+        :param app: The ASGI application
+        :param rules: Caching rules, the first rule whose pattern matches the whole path applies
+        """
+        self.app = app
+        self.rules = rules if rules is not None else DEFAULT_RULES
+        # One anchored alternation, the group name is the index of the rule
+        self._path_pattern = re.compile(
+            "|".join(f"(?P<rule{index}>{rule.pattern})" for index, rule in enumerate(self.rules)) or "(?!)"
+        )
+
+    def _match_rule(self, path: str) -> Optional[CacheRule]:
+        """
+        Get the caching rule of a request path.
+        :param path: The request path
+        :return: CacheRule, None if the path is not cached
+        """
+        match = self._path_pattern.fullmatch(path)
+        if match is None:
+            return None
+        return self.rules[int(match.lastgroup[len("rule"):])]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        rule = self._match_rule(scope["path"]) if scope["type"] == "http" and scope["method"] == "GET" else None
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = await self._get_etag(rule) if rule.tables else None
+        if etag is not None and self._is_not_modified(Headers(scope=scope).get("if-none-match"), etag):
+            self._resolve_route(scope)
+            response = Response(status_code=304, headers={"etag": etag, "cache-control": rule.cache_control})
+            await response(scope, receive, send)
+            return
+
+        async def send_with_cache_headers(message: Message) -> None:
+            # Errors are not cached
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                headers["cache-control"] = rule.cache_control
+                if etag is not None:
+                    headers["etag"] = etag
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_headers)
+
+    @staticmethod
+    def _resolve_route(scope: Scope) -> None:
+        """
+        Set the route a request would have matched, as the router does, for a request answered before routing.
+        MetricsMiddleware labels the request with it instead of "unmatched".
+        """
+        router = getattr(scope.get("app"), "router", None)
+        route, child_scope = _find_route(getattr(router, "routes", ()), scope)
+        if route is not None:
+            scope.update(child_scope)
+            scope["route"] = route
+
+    @staticmethod
+    async def _get_etag(rule: CacheRule) -> str:
+        """
+        Build the ETag of a rule from the current versions of its tables.
+        Weak, since it identifies the data a response was built from rather than its bytes.
+        """
+        versions = table_version_cache.get(rule.tables)
+        if versions is None:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                versions = await get_table_versions(session, rule.tables)
+            table_version_cache.set(rule.tables, versions)
+        return 'W/"{}"'.format("-".join(str(versions[name]) for name in rule.tables))
+
+    @staticmethod
+    def _is_not_modified(if_none_match: Optional[str], etag: str) -> bool:
+        """
+        Check whether If-None-Match names the current ETag, with the weak comparison of RFC 9110.
+        """
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        current = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
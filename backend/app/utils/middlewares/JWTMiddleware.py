@@ -1,27 +1,35 @@
+import re
 from functools import wraps
 from typing import Callable, Optional, List
-from fastapi import Request, Response, HTTPException, status
+from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from app.core.security.dependencies import get_current_user_from_token
-from app.db.session import get_session
+from app.core.security.dependencies import get_current_user_from_token, JWT_VERIFICATIONS
+from app.db.session import async_engine
 
 
-class JWTMiddleware(BaseHTTPMiddleware):
+class JWTMiddleware:
+    """
+    Authenticate the requests to protected paths with the access token of their Authorization header.
+    The user is stored in the request state (request.state.user).
+    Plain ASGI middleware, so public requests only cost a path match: no task, no body stream, no token decoding.
+    """
     def __init__(
             self,
-            app,
+            app: ASGIApp,
             excluded_paths: Optional[List[str]] = None,
             protected_paths: Optional[List[str]] = None
     ):
         """
         Initialize JWT middleware with custom configuration.
-        :param app: The FastAPI application
-        :param excluded_paths: List of paths that should be excluded from authentication
-        :param protected_paths: List of paths that should be protected
+        :param app: The ASGI application
+        :param excluded_paths: List of path prefixes that should be excluded from authentication
+        :param protected_paths: List of path prefixes that should be protected
         """
-        super().__init__(app)
+        self.app = app
         self.excluded_paths = excluded_paths or [
             "/api/v1/auth/login",
             "/api/v1/auth/logout",
@@ -31,73 +39,69 @@ class JWTMiddleware(BaseHTTPMiddleware):
             "/api/v1/reviews",
             "/api/v1/authors",
             "/api/v1/categories",
+            "/api/v1/orders/quote",
             "/docs",
             "/redoc",
             "/openapi.json"
         ]
         self.protected_paths = protected_paths or ["/api"]
-
-    async def dispatch(self, request: Request, call_next):
+        # One anchored alternation per list; excluded prefixes are tried first, so they win over protected ones
+        self._path_pattern = re.compile(
+            "(?P<excluded>{})|(?P<protected>{})".format(
+                "|".join(map(re.escape, self.excluded_paths)) or "(?!)",
+                "|".join(map(re.escape, self.protected_paths)) or "(?!)",
+            )
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        Middleware to handle JWT authentication.
-        :param request: The incoming request.
-        :param call_next: The next middleware or route handler.
-        :return: The response from the next middleware or route handler.
+        Authenticate the request if its path is protected, then pass it on.
+        :param scope: ASGI connection scope
+        :param receive: ASGI receive channel
+        :param send: ASGI send channel
         """
-        path = request.url.path
-
-        if request.method == "OPTIONS":
-            return await call_next(request)
-
-        # Only authenticate on protected paths
-        if self._check_protected_path(path):
-            try:
-                # Get database session
-                db = next(get_session())
-
-                # Get access token from Authorization header
-                auth_header = request.headers.get("Authorization")
-                if not auth_header or not auth_header.startswith("Bearer "):
-                    return JSONResponse(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        content={"detail": "Missing or invalid access token"},
-                        headers={"WWW-Authenticate": "Bearer"}
-                    )
-
-                token = auth_header.split(" ")[1]
-                # Validate token and get user
-                user = get_current_user_from_token(token, db)
-                # Store user in request state
-                request.state.user = user
-            except HTTPException as e:
-                return JSONResponse(
-                    status_code=e.status_code,
-                    content={"detail": e.detail},
-                    headers=e.headers
-                )
-
-        # Continue with the request
-        response = await call_next(request)
-        return response
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or not self._check_protected_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        # Get access token from Authorization header
+        auth_header = Headers(scope=scope).get("authorization")
+        if not auth_header or not auth_header.startswith("Bearer "):
+            JWT_VERIFICATIONS.inc(result="missing")
+            response = JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Missing or invalid access token"},
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+            await response(scope, receive, send)
+            return
+
+        token = auth_header.split(" ")[1]
+        try:
+            # Validate token and get user
+            async with AsyncSession(async_engine, expire_on_commit=False) as db:
+                user = await get_current_user_from_token(token, db)
+        except HTTPException as e:
+            response = JSONResponse(
+                status_code=e.status_code,
+                content={"detail": e.detail},
+                headers=e.headers
+            )
+            await response(scope, receive, send)
+            return
+
+        # Store user in request state
+        scope.setdefault("state", {})["user"] = user
+        await self.app(scope, receive, send)
 
     def _check_protected_path(self, request_path: str) -> bool:
         """
         Check if the request path is protected.
         :param request_path: The path of the request.
-        :return: True if the path is protected, False otherwise.
+        :return: True if the path starts with a protected prefix and no excluded prefix, False otherwise.
         """
-        # First check excluded paths
-        for excluded in self.excluded_paths:
-            if request_path.startswith(excluded):
-                return False
-
-        # Then check protected paths
-        for protected in self.protected_paths:
-            if request_path.startswith(protected):
-                return True
-
-        # Default to not protected
-        return False
+        match = self._path_pattern.match(request_path)
+        return match is not None and match.lastgroup == "protected"
 
 
 def admin_access(admin_required: bool = False):
@@ -0,0 +1,80 @@
+import re
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import registry
+
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ["method", "route"],
+)
+REQUESTS = registry.counter(
+    "http_requests_total",
+    "Requests handled, by route and status code",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight",
+    "Requests being handled",
+)
+
+_PATH_PARAM = re.compile(r"{([^}:]+)(?::[^}]+)?}")
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    Get the template of the route a request matched, e.g. "/api/v1/books/{book_id}".
+    Routes of an included router may only know their path below the router prefix, so the prefix is
+    taken back from the request path.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    path_params = scope.get("path_params", {})
+    concrete = _PATH_PARAM.sub(lambda match: str(path_params.get(match.group(1), match.group(0))), template)
+    path = scope["path"]
+    if path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """
+    Record the latency, status and concurrency of each request.
+    Requests are labelled with their route template (e.g. "/api/v1/books/{book_id}"), so IDs do not create
+    new series. Requests answered before routing (unknown paths, requests rejected by JWTMiddleware) are
+    labelled "unmatched", except the 304s of HttpCacheMiddleware, which resolve their route first.
+    Plain ASGI middleware, so it adds no task or body stream per request.
+    """
+    def __init__(self, app: ASGIApp):
+        """
+        Initialize the middleware.
+        :param app: The ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route_path = _route_template(scope)
+            method = scope["method"]
+            REQUEST_DURATION.observe(time.perf_counter() - started_at, method=method, route=route_path)
+            REQUESTS.inc(method=method, route=route_path, status=status_code)
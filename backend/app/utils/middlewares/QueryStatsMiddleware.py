@@ -0,0 +1,75 @@
+import json
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.instrumentation import start_query_stats, stop_query_stats, summarize
+
+logger = logging.getLogger("app.queries")
+
+
+class QueryStatsMiddleware:
+    """
+    Count the SQL statements and the DB time of each request.
+    The numbers are sent in a Server-Timing header and logged as one JSON line per request, at warning level
+    when the request looks like an N+1 pattern: one statement repeated QUERY_REPEAT_THRESHOLD times, or more
+    than QUERY_COUNT_THRESHOLD statements in total.
+    Plain ASGI middleware, so it adds no task or body stream per request.
+    """
+    def __init__(self, app: ASGIApp):
+        """
+        Initialize the middleware.
+        :param app: The ASGI application
+        """
+        self.app = app
+        self.repeat_threshold = settings.QUERY_REPEAT_THRESHOLD
+        self.count_threshold = settings.QUERY_COUNT_THRESHOLD
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_query_stats()
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total_ms = (time.perf_counter() - started_at) * 1000
+                server_timing = (
+                    f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", app;dur={total_ms:.2f}'
+                )
+                message["headers"] = [*message.get("headers", []), (b"server-timing", server_timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_query_stats(token)
+            self._log(scope, status_code, stats, time.perf_counter() - started_at)
+
+    def _log(self, scope: Scope, status_code: int, stats, duration: float) -> None:
+        """
+        Log the statements of a request.
+        """
+        fields = summarize(stats)
+        suspicious = fields["max_repeats"] >= self.repeat_threshold or fields["queries"] > self.count_threshold
+        level = logging.WARNING if suspicious else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        fields = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 2),
+            **fields,
+            "n_plus_one": suspicious,
+        }
+        if not suspicious:
+            fields.pop("most_repeated")
+        logger.log(level, json.dumps(fields))
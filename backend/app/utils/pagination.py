@@ -0,0 +1,151 @@
+import base64
+import json
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, and_, or_, func
+
+
+def encode_cursor(sort_value: Any, last_id: int) -> str:
+    """
+    Encode the keyset position of the last row of a page into an opaque cursor.
+    :param sort_value: Value of the sort key of the last row (None when sorting by id only)
+    :param last_id: ID of the last row
+    :return: URL-safe cursor string
+    """
+    if isinstance(sort_value, Decimal):
+        sort_value = str(sort_value)
+    payload = json.dumps({"v": sort_value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, value_type: Optional[Callable] = None) -> Tuple[Optional[Any], int]:
+    """
+    Decode a cursor created by encode_cursor.
+    :param cursor: Cursor string sent by the client
+    :param value_type: Type the sort value is converted to, e.g. Decimal for prices
+    :return: Tuple of (sort value, last id)
+    :raises HTTPException: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        sort_value, last_id = payload["v"], int(payload["id"])
+        if value_type is not None:
+            sort_value = value_type(sort_value)
+        return sort_value, last_id
+    except (ValueError, KeyError, TypeError, InvalidOperation):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+async def _count_rows(db, query) -> int:
+    """
+    Count the rows of a listing query, used when the page cannot carry the total.
+    """
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    return (await db.exec(count_query)).scalar_one()
+
+
+async def paginate(
+        db,
+        query,
+        id_column,
+        build_item: Callable,
+        offset: int = 0,
+        limit: int = 100,
+        sort_expr=None,
+        sort_attr: Optional[str] = None,
+        sort_type: Callable = Decimal,
+        descending: bool = False,
+        use_cursor: bool = False,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        window_count: bool = True
+) -> Dict:
+    """
+    Fetch one page of a listing ordered by (sort_expr, id), with the total in the same statement.
+    The total is read from COUNT(*) OVER(), which runs after WHERE and before OFFSET and LIMIT, so the
+    filters are only written once, in query. A separate count is only needed past the last page, and on
+    the cursor pages after the first one, where the window would only see the rows after the cursor.
+    In offset mode the page is addressed by offset and the total is always returned.
+    In cursor mode the page starts right after the row encoded in the cursor, so deep pages cost the
+    same as the first one, and the total is only counted on request.
+    :param db: Database session
+    :param query: Listing query with all filters applied
+    :param id_column: Unique column of the listed rows, the sort tie breaker, selected as "id"
+    :param build_item: Function building a response item from a row
+    :param offset: Row offset for pagination (offset mode)
+    :param limit: page size
+    :param sort_expr: optional sort expression, id_column is always the tie breaker
+    :param sort_attr: name of the selected column holding the sort_expr value
+    :param sort_type: type of the sort_expr value, used to decode cursors
+    :param descending: sort sort_expr and the id tie breaker descending
+    :param use_cursor: use keyset pagination instead of offset pagination
+    :param cursor: cursor returned as next_cursor by the previous page
+    :param include_total: count the total number of matching rows in cursor mode
+    :param window_count: read the total from COUNT(*) OVER(), False to always count in a separate statement
+    :return: Dictionary containing the page of items and pagination info
+    """
+    if sort_expr is not None:
+        # The id breaks ties in the same direction, so an index on (sort_expr, id) serves both directions
+        query = query.order_by(*(
+            (sort_expr.desc(), id_column.desc()) if descending else (sort_expr.asc(), id_column.asc())
+        ))
+    else:
+        query = query.order_by(id_column)
+
+    window_total = func.count().over().label("total_count")
+
+    if not use_cursor:
+        if not window_count:
+            rows = (await db.exec(query.offset(offset).limit(limit))).all()
+            total = await _count_rows(db, query)
+        else:
+            rows = (await db.exec(query.add_columns(window_total).offset(offset).limit(limit))).all()
+            if rows:
+                total = rows[0].total_count
+            else:
+                total = await _count_rows(db, query) if offset else 0
+        return {
+            "page_num": offset // limit + 1,
+            "total": total,
+            "data": [build_item(row) for row in rows],
+        }
+
+    count_in_window = include_total and window_count and not cursor
+    page_query = query.add_columns(window_total) if count_in_window else query
+
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, value_type=sort_type if sort_expr is not None else None)
+        if sort_expr is not None:
+            if descending:
+                after_row = or_(sort_expr < last_value, and_(sort_expr == last_value, id_column < last_id))
+            else:
+                after_row = or_(sort_expr > last_value, and_(sort_expr == last_value, id_column > last_id))
+            page_query = page_query.where(after_row)
+        else:
+            page_query = page_query.where(id_column > last_id)
+
+    # Fetch one extra row to know whether there is a next page
+    rows = (await db.exec(page_query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_row = rows[-1]
+        next_cursor = encode_cursor(getattr(last_row, sort_attr) if sort_attr else None, last_row.id)
+
+    if not include_total:
+        total = None
+    elif count_in_window:
+        total = rows[0].total_count if rows else 0
+    else:
+        total = await _count_rows(db, query)
+    return {
+        "total": total,
+        "next_cursor": next_cursor,
+        "data": [build_item(row) for row in rows],
+    }
@@ -0,0 +1,178 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Dict, Iterable, List, Tuple
+
+# Prefixes up to this length match a large part of the index, so their best entries are kept ranked
+SHORT_PREFIX_LENGTH = 2
+# Entries kept per short prefix, the largest limit served from them
+SHORT_PREFIX_TOP = 50
+
+Rank = Tuple[bool, int, str]
+
+
+class PrefixIndex:
+    """
+    In-memory prefix index over short labels (book titles, author names).
+    Every word start of a label is stored as a key in a sorted array, so a prefix query is a binary
+    search followed by a scan of the matching keys, and typing "king" finds "The Lost Kingdom".
+    The best SHORT_PREFIX_TOP entries of every prefix up to SHORT_PREFIX_LENGTH characters are kept
+    ranked, so the first keystrokes do not scan a large part of the index.
+    """
+    def __init__(self):
+        """
+        Initialize an empty index.
+        """
+        self._keys: List[Tuple[str, str, int]] = []
+        # (kind, id) -> (label, length of the normalized label)
+        self._labels: Dict[Tuple[str, int], Tuple[str, int]] = {}
+        # short prefix -> sorted (rank, kind, id) of its best entries
+        self._top: Dict[str, List[Tuple[Rank, str, int]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(re.findall(r"\w+", text.lower()))
+
+    @classmethod
+    def _word_suffixes(cls, label: str) -> List[str]:
+        """
+        Get the label suffixes starting at each word, e.g. "lost kingdom" and "kingdom".
+        """
+        normalized = cls._normalize(label)
+        return [normalized[match.start():] for match in re.finditer(r"\w+", normalized)]
+
+    @staticmethod
+    def _rank(suffix: str, label: str, normalized_length: int) -> Rank:
+        """
+        Rank of an entry found through one of its keys, lower first: labels starting with the prefix,
+        then shorter labels, then alphabetical order.
+        """
+        # The longest suffix is the whole label
+        return len(suffix) != normalized_length, len(label), label.lower()
+
+    @classmethod
+    def _short_prefix_ranks(cls, suffixes: List[str], label: str) -> Dict[str, Rank]:
+        """
+        Get the best rank of an entry for each short prefix of its keys.
+        """
+        ranks = {}
+        for suffix in suffixes:
+            rank = cls._rank(suffix, label, len(suffixes[0]))
+            for length in range(1, min(len(suffix), SHORT_PREFIX_LENGTH) + 1):
+                prefix = suffix[:length]
+                if prefix not in ranks or rank < ranks[prefix]:
+                    ranks[prefix] = rank
+        return ranks
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def rebuild(self, items: Iterable[Tuple[str, int, str]]) -> None:
+        """
+        Replace the whole index.
+        :param items: Iterable of (kind, id, label) tuples
+        """
+        keys = []
+        labels = {}
+        short_prefixes: Dict[str, List[Tuple[Rank, str, int]]] = {}
+        for kind, item_id, label in items:
+            suffixes = self._word_suffixes(label)
+            labels[(kind, item_id)] = (label, len(suffixes[0]) if suffixes else 0)
+            keys.extend((suffix, kind, item_id) for suffix in suffixes)
+            for prefix, rank in self._short_prefix_ranks(suffixes, label).items():
+                short_prefixes.setdefault(prefix, []).append((rank, kind, item_id))
+        keys.sort()
+        top = {prefix: heapq.nsmallest(SHORT_PREFIX_TOP, entries) for prefix, entries in short_prefixes.items()}
+        with self._lock:
+            self._keys = keys
+            self._labels = labels
+            self._top = top
+
+    def upsert(self, kind: str, item_id: int, label: str) -> None:
+        """
+        Add an entry or replace the label of an existing one.
+        :param kind: Entry kind, e.g. "book" or "author"
+        :param item_id: Entry ID
+        :param label: Text the entry is found by
+        """
+        with self._lock:
+            self._remove(kind, item_id)
+            suffixes = self._word_suffixes(label)
+            self._labels[(kind, item_id)] = (label, len(suffixes[0]) if suffixes else 0)
+            for suffix in suffixes:
+                insort(self._keys, (suffix, kind, item_id))
+            for prefix, rank in self._short_prefix_ranks(suffixes, label).items():
+                top = self._top.setdefault(prefix, [])
+                if len(top) < SHORT_PREFIX_TOP or (rank, kind, item_id) < top[-1]:
+                    insort(top, (rank, kind, item_id))
+                    del top[SHORT_PREFIX_TOP:]
+
+    def remove(self, kind: str, item_id: int) -> None:
+        """
+        Remove an entry if present.
+        :param kind: Entry kind
+        :param item_id: Entry ID
+        """
+        with self._lock:
+            self._remove(kind, item_id)
+
+    def _remove(self, kind: str, item_id: int) -> None:
+        entry = self._labels.pop((kind, item_id), None)
+        if entry is None:
+            return
+        suffixes = self._word_suffixes(entry[0])
+        for suffix in suffixes:
+            position = bisect_left(self._keys, (suffix, kind, item_id))
+            if position < len(self._keys) and self._keys[position] == (suffix, kind, item_id):
+                del self._keys[position]
+        for prefix, rank in self._short_prefix_ranks(suffixes, entry[0]).items():
+            top = self._top.get(prefix, [])
+            if (rank, kind, item_id) not in top:
+                continue
+            if len(top) < SHORT_PREFIX_TOP:
+                # Every entry of the prefix is kept, nothing moves up
+                top.remove((rank, kind, item_id))
+            else:
+                self._top[prefix] = self._best_matches(prefix, SHORT_PREFIX_TOP)
+
+    def _best_matches(self, normalized: str, limit: int) -> List[Tuple[Rank, str, int]]:
+        """
+        Rank the entries having a key starting with a normalized prefix, by a scan of the matching keys.
+        The caller holds the lock.
+        """
+        position = bisect_left(self._keys, (normalized,))
+        matches = {}
+        for suffix, kind, item_id in islice(self._keys, position, None):
+            if not suffix.startswith(normalized):
+                break
+            label, normalized_length = self._labels[(kind, item_id)]
+            rank = self._rank(suffix, label, normalized_length)
+            if (kind, item_id) not in matches or rank < matches[(kind, item_id)]:
+                matches[(kind, item_id)] = rank
+        return heapq.nsmallest(limit, ((rank, kind, item_id) for (kind, item_id), rank in matches.items()))
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """
+        Get the entries having a word starting with the prefix.
+        Labels starting with the prefix come first, then shorter labels, then alphabetical order.
+        Short prefixes are served from their ranked entries, longer ones rank every matching key.
+        :param prefix: Text typed so far
+        :param limit: Maximum number of entries returned
+        :return: List of dictionaries with the entry kind, id and label
+        """
+        normalized = self._normalize(prefix)
+        if not normalized:
+            return []
+
+        with self._lock:
+            if len(normalized) <= SHORT_PREFIX_LENGTH and limit <= SHORT_PREFIX_TOP:
+                best = self._top.get(normalized, [])[:limit]
+            else:
+                best = self._best_matches(normalized, limit)
+            return [
+                {"type": kind, "id": item_id, "text": self._labels[(kind, item_id)][0]}
+                for _, kind, item_id in best
+            ]
@@ -0,0 +1,396 @@
+"""
+Benchmark of the book catalog endpoints.
+
+Seeds a SQLite database per scale with the bulk seeder, drives the endpoints through the ASGI app
+in-process and reports latency percentiles, throughput and queries per request:
+
+    python -m benchmarks.catalog --scales 0.1 1 3 --output benchmarks/baseline.json
+    python -m benchmarks.catalog --scales 0.1 1 3 --compare benchmarks/baseline.json
+
+--database-url runs the scenarios against an existing database instead, e.g. a local Postgres filled
+with python -m app.db.bulk_seeding.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCHMARK_DIR.parent
+DEFAULT_DATA_DIR = BENCHMARK_DIR / ".data"
+DEFAULT_SCALES = [0.1, 1.0, 3.0]
+
+# p95 latency allowed above the baseline before --compare reports a regression
+DEFAULT_TOLERANCE = 0.25
+
+SEARCH_TERMS = ["kingdom", "secret garden", "lost", "shadow", "iron crown", "journey", "ocean", "myst"]
+
+
+def _git_revision() -> Optional[str]:
+    """
+    Get the commit the benchmarked code was checked out at, marked dirty when it has local changes.
+    """
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Get a percentile of sorted values, by linear interpolation between the closest ranks.
+    """
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = fraction * (len(sorted_values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _summarize(latencies: List[float], errors: int, elapsed: float, queries: int) -> Dict[str, float]:
+    """
+    Get the statistics of one scenario.
+    :param latencies: Latency of each measured request, in seconds
+    :param errors: Number of responses that were not 2xx
+    :param elapsed: Wall time of the measured requests, in seconds
+    :param queries: Number of SQL statements executed by the measured requests
+    :return: Dictionary of statistics, latencies in milliseconds
+    """
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "queries_per_request": round(queries / len(latencies), 2),
+    }
+
+
+class Scenario:
+    """
+    One endpoint exercised by the benchmark.
+    """
+    def __init__(self, name: str, method: str, build: Callable[[random.Random], Dict[str, Any]]):
+        """
+        Initialize the scenario.
+        :param name: Name the results are reported under
+        :param method: HTTP method
+        :param build: Function drawing the keyword arguments of one request (url, params, json, headers)
+        """
+        self.name = name
+        self.method = method
+        self.build = build
+
+
+def build_scenarios(num_categories: int, popular_books: List[int], cum_weights: List[float],
+                    user_id: int, token: str) -> List[Scenario]:
+    """
+    Get the scenarios of the catalog endpoints.
+    Book pages and reviews are drawn with the popularity skew of the seeded data, so hot books are hit the most.
+    :param num_categories: Number of seeded categories
+    :param popular_books: Book IDs from the most to the least popular
+    :param cum_weights: Cumulative weights of popular_books
+    :param user_id: ID of the user placing orders
+    :param token: Access token of that user
+    :return: List of Scenario objects
+    """
+    def hot_book(rng: random.Random) -> int:
+        return rng.choices(popular_books, cum_weights=cum_weights)[0]
+
+    def books(rng: random.Random) -> Dict[str, Any]:
+        params = {"offset": rng.randint(0, 20) * 20, "limit": 20}
+        if rng.random() < 0.5:
+            params["category_id"] = rng.randint(1, num_categories)
+        if rng.random() < 0.3:
+            params["min_stars"] = rng.randint(3, 5)
+        if rng.random() < 0.3:
+            params["desc_price"] = "true"
+        return {"url": "/api/v1/books/", "params": params}
+
+    def discounts(rng: random.Random) -> Dict[str, Any]:
+        return {"url": "/api/v1/books/discounts", "params": {"offset": rng.randint(0, 5) * 20, "limit": 20}}
+
+    def search(rng: random.Random) -> Dict[str, Any]:
+        return {"url": "/api/v1/books/search", "params": {"query": rng.choice(SEARCH_TERMS), "limit": 20}}
+
+    def book(rng: random.Random) -> Dict[str, Any]:
+        return {"url": f"/api/v1/books/{hot_book(rng)}"}
+
+    def reviews(rng: random.Random) -> Dict[str, Any]:
+        return {"url": f"/api/v1/reviews/book/{hot_book(rng)}", "params": {"limit": 20}}
+
+    def order(rng: random.Random) -> Dict[str, Any]:
+        items = {hot_book(rng): rng.randint(1, 3) for _ in range(rng.randint(1, 5))}
+        return {
+            "url": "/api/v1/orders/",
+            "json": {
+                "user_id": user_id,
+                "order_items": [{"book_id": book_id, "quantity": quantity} for book_id, quantity in items.items()],
+            },
+            "headers": {"Authorization": f"Bearer {token}"},
+        }
+
+    return [
+        Scenario("books", "GET", books),
+        Scenario("books_discounts", "GET", discounts),
+        Scenario("books_search", "GET", search),
+        Scenario("book_detail", "GET", book),
+        Scenario("book_reviews", "GET", reviews),
+        Scenario("orders_create", "POST", order),
+    ]
+
+
+async def _run_scenario(client, scenario: Scenario, counter: Dict[str, int], requests: int, warmup: int,
+                        concurrency: int, seed: int) -> Dict[str, float]:
+    """
+    Send warmup then measured requests of a scenario, concurrency at a time.
+    """
+    rng = random.Random(f"{seed}:{scenario.name}")
+
+    async def send(kwargs: Dict[str, Any]) -> int:
+        response = await client.request(scenario.method, **kwargs)
+        return response.status_code
+
+    for _ in range(warmup):
+        await send(scenario.build(rng))
+
+    planned = [scenario.build(rng) for _ in range(requests)]
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while planned:
+            kwargs = planned.pop()
+            started = time.perf_counter()
+            status = await send(kwargs)
+            latencies.append(time.perf_counter() - started)
+            if status >= 300:
+                errors += 1
+
+    queries_before = counter["queries"]
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return _summarize(latencies, errors, elapsed, counter["queries"] - queries_before)
+
+
+async def _run_worker(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Benchmark the app of this process, whose database comes from the DATABASE_URL environment variable.
+    """
+    import httpx
+    from sqlalchemy import event, func
+    from sqlmodel import select
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.core.security.app_token import access_token_claims, create_access_token
+    from app.db.bulk_seeding import BASE_COUNTS, SeedConfig, popularity_ranking, zipf_cum_weights
+    from app.db.session import async_engine
+    from app.main import app
+    from app.models import BookModel, CategoryModel, OrderModel, ReviewModel, UserModel
+    from app.schema.UserSchema import UserResponse
+
+    counter = {"queries": 0}
+
+    def count_query(*_) -> None:
+        counter["queries"] += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_query)
+
+    async with app.router.lifespan_context(app):
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            rows = {
+                model.__tablename__: (await session.exec(select(func.count()).select_from(model))).one()
+                for model in (BookModel, CategoryModel, ReviewModel, OrderModel)
+            }
+            user = (await session.exec(select(UserModel).where(UserModel.admin.is_(False)).limit(1))).first()
+
+        # The token is minted directly, so bcrypt does not weigh on the measured requests
+        token = create_access_token(access_token_claims(UserResponse(
+            id=user.id, first_name=user.first_name, last_name=user.last_name, email=user.email, is_admin=user.admin
+        )))
+        # Same ranking as the seeder when the database comes from it
+        config = SeedConfig(scale=rows["book"] / BASE_COUNTS["books"], seed=args.seed)
+        ranking = popularity_ranking(config)
+        scenarios = build_scenarios(
+            rows["category"], ranking, zipf_cum_weights(len(ranking), config.review_skew), user.id, token
+        )
+
+        transport = httpx.ASGITransport(app=app)
+        results = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for scenario in scenarios:
+                if args.only and scenario.name not in args.only:
+                    continue
+                results[scenario.name] = await _run_scenario(
+                    client, scenario, counter, args.requests, args.warmup, args.concurrency, args.seed
+                )
+                print(f"  {scenario.name:<16} {_format(results[scenario.name])}", file=sys.stderr)
+
+    return {"rows": rows, "scenarios": results}
+
+
+def _format(stats: Dict[str, float]) -> str:
+    return (
+        f"p50 {stats['p50_ms']:8.2f}ms  p95 {stats['p95_ms']:8.2f}ms  p99 {stats['p99_ms']:8.2f}ms  "
+        f"{stats['throughput_rps']:8.1f} req/s  {stats['queries_per_request']:5.2f} queries/req  "
+        f"{stats['errors']} errors"
+    )
+
+
+def _seeded_database(scale: float, seed: int, data_dir: Path) -> Path:
+    """
+    Get the SQLite database of a scale, seeding it on first use.
+    :return: Path of the database file, which the benchmark must not write to
+    """
+    from app.db.bulk_seeding import SeedConfig, bulk_seed
+    from app.db.engine import create_db_engine
+    from app.db.migrations import upgrade_database
+
+    path = data_dir / f"catalog-scale{scale:g}-seed{seed}.db"
+    if path.exists():
+        # Bring databases seeded by an older checkout to the current schema, new tables are filled at startup
+        engine = create_db_engine("benchmark-seed", url=f"sqlite:///{path}", echo=False)
+        try:
+            upgrade_database(engine)
+        finally:
+            engine.dispose()
+        return path
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+    partial.unlink(missing_ok=True)
+    engine = create_db_engine("benchmark-seed", url=f"sqlite:///{partial}", echo=False)
+    try:
+        upgrade_database(engine)
+        bulk_seed(engine, SeedConfig(scale=scale, seed=seed))
+    finally:
+        engine.dispose()
+    partial.rename(path)
+    return path
+
+
+def _run_in_subprocess(args: argparse.Namespace, database_url: str) -> Dict[str, Any]:
+    """
+    Benchmark one database in a fresh interpreter.
+    The settings and engines are created at import, so each database needs its own process.
+    """
+    command = [
+        sys.executable, "-m", "benchmarks.catalog", "--worker",
+        "--seed", str(args.seed),
+        "--requests", str(args.requests),
+        "--warmup", str(args.warmup),
+        "--concurrency", str(args.concurrency),
+    ]
+    if args.only:
+        command += ["--only", *args.only]
+    environment = {**os.environ, "DATABASE_URL": database_url, "DB_ECHO": "false"}
+    completed = subprocess.run(command, cwd=BACKEND_DIR, env=environment, stdout=subprocess.PIPE, check=True)
+    return json.loads(completed.stdout)
+
+
+def _compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Get the regressions of the current results against a baseline.
+    A scenario regresses when its p95 latency grows by more than the tolerance or it runs more queries.
+    """
+    regressions = []
+    for scale, result in current["results"].items():
+        for name, stats in result["scenarios"].items():
+            reference = baseline.get("results", {}).get(scale, {}).get("scenarios", {}).get(name)
+            if reference is None:
+                continue
+            change = stats["p95_ms"] / reference["p95_ms"] - 1 if reference["p95_ms"] else 0.0
+            print(
+                f"scale {scale:>5} {name:<16} p95 {reference['p95_ms']:8.2f} -> {stats['p95_ms']:8.2f}ms "
+                f"({change:+.0%})  queries/req {reference['queries_per_request']:5.2f} -> {stats['queries_per_request']:5.2f}"
+            )
+            if change > tolerance:
+                regressions.append(f"{name} at scale {scale}: p95 {change:+.0%}")
+            if stats["queries_per_request"] > reference["queries_per_request"]:
+                regressions.append(
+                    f"{name} at scale {scale}: {reference['queries_per_request']} -> {stats['queries_per_request']} queries/req"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the book catalog endpoints.")
+    parser.add_argument("--scales", type=float, nargs="+", default=DEFAULT_SCALES, help="Bulk seeder scales to benchmark")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the data and of the requests")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per scenario, sent first")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--only", nargs="+", help="Scenarios to run, all by default")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="Where the seeded databases are kept")
+    parser.add_argument("--database-url", help="Benchmark this already seeded database instead of seeding SQLite")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON, e.g. a new baseline")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to compare the results with")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed p95 growth over the baseline")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(asyncio.run(_run_worker(args))))
+        return 0
+
+    results = {}
+    if args.database_url:
+        print(f"Benchmarking {args.database_url}", file=sys.stderr)
+        results["external"] = _run_in_subprocess(args, args.database_url)
+    else:
+        with tempfile.TemporaryDirectory() as work_dir:
+            for scale in args.scales:
+                template = _seeded_database(scale, args.seed, args.data_dir)
+                # Orders are written during the run, so every run starts from a copy of the seeded data
+                database = Path(work_dir) / template.name
+                shutil.copyfile(template, database)
+                print(f"Benchmarking scale {scale:g}", file=sys.stderr)
+                results[f"{scale:g}"] = _run_in_subprocess(args, f"sqlite:///{database}")
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": "external" if args.database_url else "sqlite",
+            "seed": args.seed,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        regressions = _compare(json.loads(args.compare.read_text()), report, args.tolerance)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
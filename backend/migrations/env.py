@@ -0,0 +1,72 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlmodel import SQLModel
+
+from app.core.config import settings
+from app.db.engine import create_db_engine
+import app.models  # noqa: F401, registers the tables on SQLModel.metadata
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = SQLModel.metadata
+
+# Tables managed outside of the models, e.g. the search backend tables created by ensure_schema
+EXCLUDED_TABLES = {"book_search"}
+
+
+def include_object(object_, name, type_, reflected, compare_to) -> bool:
+    if type_ == "table":
+        return name not in EXCLUDED_TABLES and not name.startswith("book_search_")
+    return True
+
+
+def _configure(**kwargs) -> None:
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite cannot alter most constraints in place, batch mode recreates the table instead
+        render_as_batch=True,
+        compare_type=True,
+        **kwargs
+    )
+
+
+def run_migrations_offline() -> None:
+    """
+    Emit the migration SQL without connecting to the database.
+    """
+    _configure(url=config.get_main_option("sqlalchemy.url") or settings.db_url(), literal_binds=True,
+               dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """
+    Apply the migrations on a connection, the one given by upgrade_database or a new one from the settings.
+    """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    engine = create_db_engine("migrations", url=config.get_main_option("sqlalchemy.url") or None, echo=False)
+    try:
+        with engine.connect() as connection:
+            _configure(connection=connection)
+            with context.begin_transaction():
+                context.run_migrations()
+    finally:
+        engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
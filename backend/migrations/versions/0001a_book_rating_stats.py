@@ -0,0 +1,59 @@
+"""book rating stats and active discount index
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-18 02:53:37.915270
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001a'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # if_not_exists: databases built with create_all after these were added to the models already have them
+    book_rating_stats = op.create_table('book_rating_stats',
+    sa.Column('book_id', sa.BIGINT(), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('star_sum', sa.Integer(), nullable=False),
+    sa.Column('star_1', sa.Integer(), nullable=False),
+    sa.Column('star_2', sa.Integer(), nullable=False),
+    sa.Column('star_3', sa.Integer(), nullable=False),
+    sa.Column('star_4', sa.Integer(), nullable=False),
+    sa.Column('star_5', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['book.id'], ),
+    sa.PrimaryKeyConstraint('book_id'),
+    if_not_exists=True
+    )
+    op.create_index('ix_discount_book_active', 'discount', ['book_id', 'discount_start_date', 'discount_end_date', 'discount_price'], unique=False, if_not_exists=True)
+
+    # Backfill the aggregate from the existing reviews
+    review = sa.table('review', sa.column('book_id'), sa.column('rating_star'))
+    star_counts = [
+        sa.func.sum(sa.case((review.c.rating_star == star, 1), else_=0))
+        for star in range(1, 6)
+    ]
+    op.execute(sa.delete(book_rating_stats))
+    op.execute(
+        sa.insert(book_rating_stats).from_select(
+            ['book_id', 'review_count', 'star_sum', 'star_1', 'star_2', 'star_3', 'star_4', 'star_5'],
+            sa.select(review.c.book_id, sa.func.count(), sa.func.sum(review.c.rating_star), *star_counts)
+            .group_by(review.c.book_id),
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_discount_book_active', table_name='discount', if_exists=True)
+    op.drop_table('book_rating_stats')
@@ -0,0 +1,43 @@
+"""catalog indexes
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-18 02:53:44.039485
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Indexes matching the query shapes of BookController and ReviewController.
+    # if_not_exists: databases built with create_all from the current models already have them
+    op.create_index('ix_book_author_id', 'book', ['author_id', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_book_category_id', 'book', ['category_id', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_book_rating_stats_review_count', 'book_rating_stats', ['review_count', 'book_id'], unique=False, if_not_exists=True)
+    op.create_index('ix_discount_active_period', 'discount', ['discount_end_date', 'discount_start_date', 'book_id', 'discount_price'], unique=False, if_not_exists=True)
+    op.create_index('ix_order_item_order_id', 'order_item', ['order_id'], unique=False, if_not_exists=True)
+    op.create_index('ix_review_book_date', 'review', ['book_id', 'review_date'], unique=False, if_not_exists=True)
+    op.create_index('ix_review_book_star_date', 'review', ['book_id', 'rating_star', 'review_date'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_review_book_star_date', table_name='review', if_exists=True)
+    op.drop_index('ix_review_book_date', table_name='review', if_exists=True)
+    op.drop_index('ix_order_item_order_id', table_name='order_item', if_exists=True)
+    op.drop_index('ix_discount_active_period', table_name='discount', if_exists=True)
+    op.drop_index('ix_book_rating_stats_review_count', table_name='book_rating_stats', if_exists=True)
+    op.drop_index('ix_book_category_id', table_name='book', if_exists=True)
+    op.drop_index('ix_book_author_id', table_name='book', if_exists=True)
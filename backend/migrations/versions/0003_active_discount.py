@@ -0,0 +1,37 @@
+"""active discount projection
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 03:12:20.418731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled by rebuild_active_discounts when the app starts
+    op.create_table('active_discount',
+    sa.Column('book_id', sa.BIGINT(), nullable=False),
+    sa.Column('discount_price', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.Column('refreshed_on', sa.DATE(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['book.id'], ),
+    sa.PrimaryKeyConstraint('book_id'),
+    if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('active_discount', if_exists=True)
@@ -0,0 +1,72 @@
+"""table version counters
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 04:06:51.772315
+
+"""
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables the cached catalog reads depend on, see HttpCacheMiddleware
+TRACKED_TABLES = ['author', 'category', 'book', 'active_discount', 'review', 'book_rating_stats']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    table_version = op.create_table('table_version',
+    sa.Column('table_name', sa.VARCHAR(length=64), nullable=False),
+    sa.Column('version', sa.BIGINT(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    # Counters start from the current time, so a recreated database does not hand out the ETags of an older one
+    start = int(time.time() * 1000)
+    op.bulk_insert(table_version, [{'table_name': name, 'version': start} for name in TRACKED_TABLES])
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # One bump per statement, so bulk loads and projection rebuilds cost a single update
+        op.execute("""
+            CREATE FUNCTION bump_table_version() RETURNS trigger AS $$
+            BEGIN
+                UPDATE table_version SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        for name in TRACKED_TABLES:
+            op.execute(
+                f'CREATE TRIGGER {name}_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "{name}" '
+                f'FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()'
+            )
+    else:
+        # SQLite only has row triggers
+        for name in TRACKED_TABLES:
+            for event in ('insert', 'update', 'delete'):
+                op.execute(
+                    f'CREATE TRIGGER {name}_version_{event} AFTER {event.upper()} ON "{name}" BEGIN '
+                    f"UPDATE table_version SET version = version + 1 WHERE table_name = '{name}'; END"
+                )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in TRACKED_TABLES:
+            op.execute(f'DROP TRIGGER IF EXISTS {name}_version ON "{name}"')
+        op.execute('DROP FUNCTION IF EXISTS bump_table_version()')
+    else:
+        for name in TRACKED_TABLES:
+            for event in ('insert', 'update', 'delete'):
+                op.execute(f'DROP TRIGGER IF EXISTS {name}_version_{event}')
+    op.drop_table('table_version')
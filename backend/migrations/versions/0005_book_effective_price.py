@@ -0,0 +1,45 @@
+"""book effective price
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 05:02:37.218404
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite can only add a NOT NULL column with a default, it is dropped again where the column can be altered
+    op.add_column('book', sa.Column('effective_price', sa.Numeric(precision=5, scale=2), nullable=False, server_default='0'))
+
+    # Backfill from the current projection, rebuild_active_discounts keeps it up to date from now on
+    book = sa.table('book', sa.column('id'), sa.column('book_price'), sa.column('effective_price'))
+    active_discount = sa.table('active_discount', sa.column('book_id'), sa.column('discount_price'))
+    discount_price = (
+        sa.select(active_discount.c.discount_price)
+        .where(active_discount.c.book_id == book.c.id)
+        .scalar_subquery()
+    )
+    op.execute(sa.update(book).values(effective_price=sa.func.coalesce(discount_price, book.c.book_price)))
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('book', 'effective_price', server_default=None)
+    op.create_index('ix_book_effective_price', 'book', ['effective_price', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_book_effective_price', table_name='book')
+    op.drop_column('book', 'effective_price')
@@ -0,0 +1,34 @@
+"""projection refresh marker
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 06:18:45.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Empty until the first rebuild, so the active discounts are rebuilt when the app starts
+    op.create_table('projection_refresh',
+    sa.Column('name', sa.VARCHAR(length=64), nullable=False),
+    sa.Column('refreshed_on', sa.DATE(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('projection_refresh')
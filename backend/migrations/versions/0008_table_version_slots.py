@@ -0,0 +1,98 @@
+"""table version slots
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 06:57:03.118942
+
+"""
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables the cached catalog reads depend on, see HttpCacheMiddleware
+TRACKED_TABLES = ['author', 'category', 'book', 'active_discount', 'review', 'book_rating_stats']
+# Rows per table; concurrent transactions have consecutive ids, so they bump different rows
+SLOTS = 16
+
+
+def _bump_function(slot_condition: str) -> str:
+    return f"""
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE table_version SET version = version + 1 WHERE table_name = TG_TABLE_NAME{slot_condition};
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """
+
+
+def _create_sqlite_triggers(slot_condition: str) -> None:
+    for name in TRACKED_TABLES:
+        for event in ('insert', 'update', 'delete'):
+            op.execute(
+                f'CREATE TRIGGER {name}_version_{event} AFTER {event.upper()} ON "{name}" BEGIN '
+                f"UPDATE table_version SET version = version + 1 WHERE table_name = '{name}'{slot_condition}; END"
+            )
+
+
+def _drop_sqlite_triggers() -> None:
+    for name in TRACKED_TABLES:
+        for event in ('insert', 'update', 'delete'):
+            op.execute(f'DROP TRIGGER IF EXISTS {name}_version_{event}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    # The counters are recreated rather than altered, SQLite would rebuild the table under the triggers using it
+    if not is_postgresql:
+        _drop_sqlite_triggers()
+    op.drop_table('table_version')
+    table_version = op.create_table('table_version',
+    sa.Column('table_name', sa.VARCHAR(length=64), nullable=False),
+    sa.Column('slot', sa.SMALLINT(), nullable=False),
+    sa.Column('version', sa.BIGINT(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name', 'slot')
+    )
+    # Counters restart from the current time, above the versions handed out so far
+    start = int(time.time() * 1000)
+    op.bulk_insert(table_version, [
+        {'table_name': name, 'slot': slot, 'version': start if slot == 0 else 0}
+        for name in TRACKED_TABLES for slot in range(SLOTS)
+    ])
+
+    if is_postgresql:
+        op.execute(_bump_function(f' AND slot = txid_current() % {SLOTS}'))
+    else:
+        # SQLite serializes writers, one slot is enough
+        _create_sqlite_triggers(' AND slot = 0')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    if not is_postgresql:
+        _drop_sqlite_triggers()
+    op.drop_table('table_version')
+    table_version = op.create_table('table_version',
+    sa.Column('table_name', sa.VARCHAR(length=64), nullable=False),
+    sa.Column('version', sa.BIGINT(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    start = int(time.time() * 1000)
+    op.bulk_insert(table_version, [{'table_name': name, 'version': start} for name in TRACKED_TABLES])
+
+    if is_postgresql:
+        op.execute(_bump_function(''))
+    else:
+        _create_sqlite_triggers('')
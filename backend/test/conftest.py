@@ -0,0 +1,129 @@
+import os
+import tempfile
+import uuid
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+# The engines are created from the settings at import, so the test database is chosen before importing the app
+_database_dir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_database_dir.name, 'test.db')}"
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from app.core.security.app_token import access_token_claims, create_access_token  # noqa: E402
+from app.db.migrations import upgrade_database  # noqa: E402
+from app.db.projections import rebuild_active_discounts  # noqa: E402
+from app.db.search import get_search_backend  # noqa: E402
+from app.db.session import engine, async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import AuthorModel, BookModel, CategoryModel, DiscountModel, UserModel  # noqa: E402
+from app.schema.UserSchema import UserResponse  # noqa: E402
+
+# Books whose titles share "Kingdom", which the full-text search only matches on word prefixes
+KINGDOM_BOOKS = 7
+# Price of the books on discount today, below every book price
+DISCOUNT_PRICE = Decimal("5.00")
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def fast_password_hashing(monkeypatch):
+    # bcrypt is slow by design, tests hash their passwords with a cheaper scheme
+    from passlib.context import CryptContext
+    from app.core.security import password
+
+    monkeypatch.setattr(password, "pwd_context", CryptContext(schemes=["pbkdf2_sha256"]))
+
+
+@pytest.fixture(scope="session")
+def catalog():
+    """
+    Migrate the test database and fill it with a small catalog: books with repeated prices, some on discount.
+    :return: Dictionary with the number of books and the IDs of the discounted ones
+    """
+    upgrade_database(engine)
+    search_backend = get_search_backend(engine.dialect.name)
+    with engine.begin() as connection:
+        search_backend.ensure_schema(connection)
+
+    with Session(engine) as session:
+        categories = [CategoryModel(category_name=name, category_desc="") for name in ("Fantasy", "History", "Science")]
+        authors = [AuthorModel(author_name=name, author_bio="") for name in ("Ada Lovelace", "Mary Shelley", "Isaac Newton")]
+        session.add_all(categories + authors)
+        session.flush()
+
+        titles = [f"The Kingdom of Glass {number}" for number in range(KINGDOM_BOOKS)]
+        titles += [f"Notes on Tides {number}" for number in range(23)]
+        books = [
+            BookModel(
+                category_id=categories[number % len(categories)].id,
+                author_id=authors[number % len(authors)].id,
+                book_title=title,
+                book_summary="A book",
+                book_cover_photo="",
+                # Few distinct prices, so keyset pagination has to break ties on the book id
+                book_price=Decimal(10 + number % 4),
+            )
+            for number, title in enumerate(titles)
+        ]
+        session.add_all(books)
+        session.flush()
+
+        today = date.today()
+        discounted = books[::3]
+        session.add_all([
+            DiscountModel(book_id=book.id, discount_start_date=today, discount_end_date=today,
+                          discount_price=DISCOUNT_PRICE)
+            for book in discounted
+        ])
+        session.flush()
+        rebuild_active_discounts(session)
+        search_backend.reindex_books(session)
+        discounted_ids = [book.id for book in discounted]
+        session.commit()
+
+    return {"books": len(titles), "discounted": discounted_ids}
+
+
+@pytest.fixture
+async def db(catalog):
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+@pytest.fixture
+async def client(catalog):
+    # The lifespan is not run, the database is prepared by the catalog fixture
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+def create_user(password: str = "", admin: bool = False) -> UserResponse:
+    """
+    Insert a user with a unique email.
+    :param password: Password hash
+    :param admin: Whether the user is an administrator
+    :return: UserResponse object
+    """
+    with Session(engine) as session:
+        user = UserModel(email=f"{uuid.uuid4().hex}@example.com", first_name="Ada", last_name="Lovelace",
+                         password=password, admin=admin)
+        session.add(user)
+        session.commit()
+        return UserResponse(id=user.id, email=user.email, first_name=user.first_name, last_name=user.last_name,
+                            is_admin=user.admin)
+
+
+def auth_headers(user: UserResponse) -> dict:
+    """
+    Get the Authorization header of a fresh access token of a user.
+    """
+    return {"Authorization": f"Bearer {create_access_token(access_token_claims(user))}"}
@@ -0,0 +1,95 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, update
+
+from app.controllers.UserController import UserController
+from app.core.config import settings
+from app.core.security import get_current_user_from_token, hash_password, load_user_changes
+from app.core.security.app_token import access_token_claims, create_access_token
+from app.core.security.dependencies import user_cache
+from app.db.session import engine
+from app.models import UserChangeModel, UserModel
+from app.schema.UserSchema import UserUpdate
+from test.conftest import create_user
+
+pytestmark = pytest.mark.anyio
+
+
+def _token(claims: dict, issued_ago: float = 0) -> str:
+    issued_at = datetime.now(timezone.utc) - timedelta(seconds=issued_ago)
+    payload = {**claims, "iat": issued_at, "exp": issued_at + timedelta(minutes=5), "token_type": "access"}
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+async def _rejected(token: str, db) -> bool:
+    try:
+        await get_current_user_from_token(token, db)
+    except HTTPException as error:
+        assert error.status_code == 401
+        return True
+    return False
+
+
+async def test_claims_take_precedence_over_the_cached_user(db):
+    user = create_user()
+    # A token without the user claims fills the user cache from the database
+    legacy = await get_current_user_from_token(_token({"sub": user.email}), db)
+    assert not legacy.is_admin
+    assert user_cache.get(user.email) == legacy
+
+    # The user is promoted and logs in again
+    with Session(engine) as session:
+        session.exec(update(UserModel).where(UserModel.id == user.id).values(admin=True))
+        session.commit()
+    promoted = await get_current_user_from_token(
+        create_access_token(access_token_claims(user.model_copy(update={"is_admin": True}))), db
+    )
+    assert promoted.is_admin
+
+
+async def test_update_user_rejects_older_tokens(db, fast_password_hashing):
+    user = create_user(password=hash_password("password1"))
+    old_token = _token(access_token_claims(user), issued_ago=5)
+    await get_current_user_from_token(_token({"sub": user.email}, issued_ago=5), db)
+    assert user_cache.get(user.email) is not None
+
+    updated = await UserController(db).update_user(
+        user.id, "password1",
+        UserUpdate(email=user.email, first_name="Augusta", last_name="King", password="password2", old_password="password1")
+    )
+
+    assert user_cache.get(user.email) is None
+    assert await _rejected(old_token, db)
+    # Tokens issued after the change are trusted again
+    current = await get_current_user_from_token(create_access_token(access_token_claims(updated)), db)
+    assert current.first_name == "Augusta"
+
+
+async def test_delete_user_rejects_older_tokens(db):
+    user = create_user()
+    token = _token(access_token_claims(user), issued_ago=5)
+    assert not await _rejected(token, db)
+
+    await UserController(db).delete_user(user.id)
+
+    assert await _rejected(token, db)
+    assert await _rejected(_token({"sub": user.email}, issued_ago=5), db)
+
+
+async def test_changes_of_other_processes_reject_older_tokens(db):
+    user = create_user()
+    token = _token(access_token_claims(user), issued_ago=5)
+    assert not await _rejected(token, db)
+
+    # Recorded by another worker, this process only sees the row
+    with Session(engine) as session:
+        session.add(UserChangeModel(email=user.email, changed_at=time.time()))
+        session.commit()
+    assert await load_user_changes(db) >= 1
+    assert await load_user_changes(db) == 0
+
+    assert await _rejected(token, db)
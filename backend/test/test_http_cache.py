@@ -0,0 +1,124 @@
+import re
+
+import pytest
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+
+from app.db.session import engine
+from app.models import AuthorModel, TableVersionModel
+from app.utils.metrics import registry
+from app.utils.middlewares.HttpCacheMiddleware import table_version_cache
+
+pytestmark = pytest.mark.anyio
+
+
+def _touch_authors():
+    with Session(engine) as session:
+        session.exec(update(AuthorModel).values(author_bio=AuthorModel.author_bio))
+        session.commit()
+    table_version_cache.invalidate()
+
+
+def _requests_total(route, status):
+    pattern = re.compile(
+        rf'http_requests_total{{method="GET",route="{re.escape(route)}",status="{status}"}} (\S+)'
+    )
+    match = pattern.search(registry.render())
+    return float(match.group(1)) if match else 0.0
+
+
+@pytest.mark.parametrize("path, cache_control", [
+    ("/api/v1/books/", "public, max-age=30, stale-while-revalidate=30"),
+    ("/api/v1/authors/", "public, max-age=300"),
+    ("/api/v1/categories/", "public, max-age=300"),
+])
+async def test_catalog_reads_get_an_etag(client, catalog, path, cache_control):
+    response = await client.get(path)
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == cache_control
+    assert response.headers["etag"].startswith('W/"')
+
+
+async def test_carousels_only_get_cache_control(client, catalog):
+    response = await client.get("/api/v1/books/popular")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert "etag" not in response.headers
+
+
+async def test_uncached_paths_get_no_headers(client, catalog):
+    response = await client.get("/metrics")
+
+    assert "etag" not in response.headers
+    assert "cache-control" not in response.headers
+
+
+async def test_if_none_match_gets_304(client, catalog):
+    etag = (await client.get("/api/v1/authors/")).headers["etag"]
+
+    response = await client.get("/api/v1/authors/", headers={"if-none-match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "public, max-age=300"
+
+    # Weak comparison, and any tag of the list
+    response = await client.get("/api/v1/authors/", headers={"if-none-match": f'"other", {etag.removeprefix("W/")}'})
+    assert response.status_code == 304
+
+    response = await client.get("/api/v1/authors/", headers={"if-none-match": 'W/"other"'})
+    assert response.status_code == 200
+
+
+async def test_etag_changes_after_a_write(client, catalog):
+    table_version_cache.invalidate()
+    etag = (await client.get("/api/v1/authors/")).headers["etag"]
+    book_etag = (await client.get("/api/v1/books/")).headers["etag"]
+
+    _touch_authors()
+
+    response = await client.get("/api/v1/authors/", headers={"if-none-match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    # Book responses carry the author names
+    assert (await client.get("/api/v1/books/")).headers["etag"] != book_etag
+
+
+async def test_etag_does_not_change_without_a_write(client, catalog):
+    table_version_cache.invalidate()
+    etag = (await client.get("/api/v1/categories/")).headers["etag"]
+
+    _touch_authors()
+
+    response = await client.get("/api/v1/categories/", headers={"if-none-match": etag})
+    assert response.status_code == 304
+
+
+def test_a_table_version_is_the_sum_of_its_slots(catalog):
+    with Session(engine) as session:
+        slots = session.exec(
+            select(func.count()).select_from(TableVersionModel).where(TableVersionModel.table_name == "author")
+        ).one()
+        assert slots > 1
+        version = session.exec(
+            select(func.sum(TableVersionModel.version)).where(TableVersionModel.table_name == "author")
+        ).one()
+
+    _touch_authors()
+
+    with Session(engine) as session:
+        assert session.exec(
+            select(func.sum(TableVersionModel.version)).where(TableVersionModel.table_name == "author")
+        ).one() > version
+
+
+async def test_not_modified_is_labelled_with_its_route(client, catalog):
+    etag = (await client.get("/api/v1/books/7")).headers["etag"]
+    not_modified = _requests_total("/api/v1/books/{book_id}", 304)
+
+    response = await client.get("/api/v1/books/7", headers={"if-none-match": etag})
+
+    assert response.status_code == 304
+    assert _requests_total("/api/v1/books/{book_id}", 304) == not_modified + 1
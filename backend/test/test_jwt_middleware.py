@@ -0,0 +1,93 @@
+import httpx
+import pytest
+from starlette.responses import PlainTextResponse
+
+from app.utils.middlewares.JWTMiddleware import JWTMiddleware
+from test.conftest import auth_headers, create_user
+
+pytestmark = pytest.mark.anyio
+
+
+def _is_protected_by_prefixes(middleware, path):
+    """The per-prefix checks the compiled pattern replaces."""
+    if any(path.startswith(excluded) for excluded in middleware.excluded_paths):
+        return False
+    return any(path.startswith(protected) for protected in middleware.protected_paths)
+
+
+@pytest.mark.parametrize("path, protected", [
+    ("/api/v1/orders/quote", False),
+    ("/api/v1/orders/quote/preview", False),
+    ("/api/v1/orders", True),
+    ("/api/v1/orders/", True),
+    ("/api/v1/orders/batch", True),
+    ("/api/v1/orders/quot", True),
+    ("/api/v1/users/me", True),
+    ("/api/v1/auth/login", False),
+    ("/api/v1/auth/me", True),
+    ("/api/v1/books/7", False),
+    ("/api/v1/bookshelf", False),
+    ("/api", True),
+    ("/apiary", True),
+    ("/docs", False),
+    ("/metrics", False),
+    ("/", False),
+])
+def test_path_pattern_matches_the_prefix_checks(path, protected):
+    middleware = JWTMiddleware(app=None)
+
+    assert middleware._check_protected_path(path) is protected
+    assert _is_protected_by_prefixes(middleware, path) is protected
+
+
+@pytest.mark.parametrize("path", ["/a.b/c", "/axb/c", "/a.b", "/private/x", "/privatex", "/public", "/other"])
+def test_configured_prefixes_are_matched_literally(path):
+    middleware = JWTMiddleware(app=None, excluded_paths=["/a.b", "/private/public"], protected_paths=["/a", "/private"])
+
+    assert middleware._check_protected_path(path) is _is_protected_by_prefixes(middleware, path)
+
+
+async def _call(headers=None, path="/api/v1/orders/"):
+    scopes = []
+
+    async def endpoint(scope, receive, send):
+        scopes.append(scope)
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    transport = httpx.ASGITransport(app=JWTMiddleware(endpoint))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(path, headers=headers)
+    return response, scopes
+
+
+@pytest.mark.parametrize("headers", [None, {"authorization": "Basic abc"}, {"authorization": "Bearer"}])
+async def test_protected_path_without_token_gets_401(headers):
+    response, scopes = await _call(headers)
+
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Missing or invalid access token"}
+    assert response.headers["www-authenticate"] == "Bearer"
+    assert scopes == []
+
+
+async def test_invalid_token_gets_401():
+    response, scopes = await _call({"authorization": "Bearer not-a-token"})
+
+    assert response.status_code == 401
+    assert scopes == []
+
+
+async def test_valid_token_sets_the_user_in_the_state(catalog):
+    user = create_user()
+
+    response, scopes = await _call(auth_headers(user))
+
+    assert response.status_code == 200
+    assert scopes[0]["state"]["user"].email == user.email
+
+
+async def test_public_path_skips_authentication():
+    response, scopes = await _call(path="/api/v1/orders/quote")
+
+    assert response.status_code == 200
+    assert "user" not in scopes[0].get("state", {})
@@ -0,0 +1,79 @@
+import pytest
+from alembic import command
+from sqlalchemy import inspect, text
+
+from app.db.engine import create_db_engine
+from app.db.migrations import (
+    BASELINE_REVISION,
+    SchemaNotMigratedError,
+    alembic_config,
+    check_schema_revision,
+    get_current_revisions,
+    get_head_revisions,
+    upgrade_database,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_db_engine("migrations", url=f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _run(engine, run_command, *args):
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        run_command(config, *args)
+
+
+def test_upgrade_matches_the_models(engine):
+    with pytest.raises(SchemaNotMigratedError):
+        check_schema_revision(engine)
+
+    upgrade_database(engine)
+
+    assert get_current_revisions(engine) == get_head_revisions()
+    check_schema_revision(engine)
+    # Raises if the migrated schema differs from the models
+    _run(engine, command.check)
+
+
+def test_legacy_database_is_stamped_and_upgraded(engine):
+    # A database created by create_all before the migrations: the baseline schema without alembic_version
+    upgrade_database(engine, BASELINE_REVISION)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE alembic_version"))
+        connection.execute(text("INSERT INTO author (id, author_name, author_bio) VALUES (1, 'Author', '')"))
+        connection.execute(text("INSERT INTO category (id, category_name, category_desc) VALUES (1, 'Category', '')"))
+        connection.execute(text(
+            "INSERT INTO book (id, category_id, author_id, book_title, book_summary, book_price, book_cover_photo) "
+            "VALUES (1, 1, 1, 'Book', '', 10, '')"
+        ))
+        for review_id, star in enumerate((5, 4, 4), start=1):
+            connection.execute(text(
+                "INSERT INTO review (id, book_id, review_title, review_details, review_date, rating_star) "
+                "VALUES (:id, 1, 'Review', '', '2024-01-01 00:00:00', :star)"
+            ), {"id": review_id, "star": star})
+
+    with pytest.raises(SchemaNotMigratedError, match=f"alembic stamp {BASELINE_REVISION}"):
+        check_schema_revision(engine)
+
+    _run(engine, command.stamp, BASELINE_REVISION)
+    upgrade_database(engine)
+
+    check_schema_revision(engine)
+    with engine.connect() as connection:
+        stats = connection.execute(text(
+            "SELECT review_count, star_sum, star_4, star_5 FROM book_rating_stats WHERE book_id = 1"
+        )).one()
+    assert tuple(stats) == (3, 13, 2, 1)
+
+
+def test_downgrade_to_base(engine):
+    upgrade_database(engine)
+    _run(engine, command.downgrade, "base")
+
+    assert get_current_revisions(engine) == set()
+    assert not inspect(engine).has_table("book")
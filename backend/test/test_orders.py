@@ -0,0 +1,146 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Insert, func, select
+
+from app.controllers.OrderController import OrderController
+from app.models import BookModel
+from app.models.OrderModel import OrderModel, OrderItemModel
+from app.schema.OrderSchema import OrderCreate
+from test.conftest import DISCOUNT_PRICE, auth_headers, create_user
+
+pytestmark = pytest.mark.anyio
+
+
+async def _count(db, model) -> int:
+    return (await db.exec(select(func.count()).select_from(model))).scalar_one()
+
+
+async def _book_ids(db, count: int):
+    return list((await db.exec(select(BookModel.id).order_by(BookModel.id).limit(count))).scalars())
+
+
+def _order(user_id: int, *book_ids: int) -> dict:
+    return {"user_id": user_id, "order_items": [{"book_id": book_id, "quantity": 1} for book_id in book_ids]}
+
+
+async def test_batch_writes_every_order(db):
+    user = create_user()
+    first, second = await _book_ids(db, 2)
+
+    orders = await OrderController(db).create_orders(
+        [OrderCreate(**_order(user.id, first)), OrderCreate(**_order(user.id, first, second))]
+    )
+
+    assert [len(order.order_items) for order in orders] == [1, 2]
+    assert orders[0].id < orders[1].id
+
+
+async def test_batch_with_an_unknown_book_writes_nothing(db):
+    user = create_user()
+    (book_id,) = await _book_ids(db, 1)
+    orders_before, items_before = await _count(db, OrderModel), await _count(db, OrderItemModel)
+
+    with pytest.raises(HTTPException) as error:
+        await OrderController(db).create_orders(
+            [OrderCreate(**_order(user.id, book_id)), OrderCreate(**_order(user.id, 10 ** 9))]
+        )
+
+    assert error.value.status_code == 404
+    await db.rollback()
+    assert (await _count(db, OrderModel), await _count(db, OrderItemModel)) == (orders_before, items_before)
+
+
+async def test_batch_failing_midway_rolls_back_every_order(db, monkeypatch):
+    user = create_user()
+    (book_id,) = await _book_ids(db, 1)
+    orders_before, items_before = await _count(db, OrderModel), await _count(db, OrderItemModel)
+
+    # The orders are inserted, then the items insert fails
+    execute = db.exec
+
+    async def failing_exec(statement, *args, **kwargs):
+        if isinstance(statement, Insert) and statement.table.name == OrderItemModel.__tablename__:
+            raise RuntimeError("connection lost")
+        return await execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db, "exec", failing_exec)
+    with pytest.raises(RuntimeError):
+        await OrderController(db).create_orders([OrderCreate(**_order(user.id, book_id))] * 3)
+    monkeypatch.undo()
+
+    # As get_session does when the request fails
+    await db.close()
+    assert (await _count(db, OrderModel), await _count(db, OrderItemModel)) == (orders_before, items_before)
+
+
+async def test_batch_is_limited_to_500_orders(client, db):
+    admin = create_user(admin=True)
+    (book_id,) = await _book_ids(db, 1)
+
+    response = await client.post(
+        "/api/v1/orders/batch", json=[_order(admin.id, book_id)] * 501, headers=auth_headers(admin)
+    )
+    assert response.status_code == 422
+
+    response = await client.post(
+        "/api/v1/orders/batch", json=[_order(admin.id, book_id)] * 500, headers=auth_headers(admin)
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 500
+
+
+async def test_batch_requires_an_administrator(client, db):
+    user = create_user()
+    (book_id,) = await _book_ids(db, 1)
+    orders_before = await _count(db, OrderModel)
+
+    response = await client.post("/api/v1/orders/batch", json=[_order(user.id, book_id)], headers=auth_headers(user))
+    assert response.status_code == 403
+
+    response = await client.post("/api/v1/orders/batch", json=[_order(user.id, book_id)])
+    assert response.status_code == 401
+    assert await _count(db, OrderModel) == orders_before
+
+
+async def test_order_is_priced_by_the_server(client, db, catalog):
+    user = create_user()
+    discounted = catalog["discounted"][0]
+    book_id = next(book_id for book_id in await _book_ids(db, 2) if book_id != discounted)
+    items = [{"book_id": book_id, "quantity": 2}, {"book_id": discounted, "quantity": 1}]
+
+    quote = await client.post("/api/v1/orders/quote", json=items)
+    assert quote.status_code == 200
+    assert quote.json()["order_items"][1]["unit_price"] == float(DISCOUNT_PRICE)
+
+    # The amount and item prices sent by the client are ignored
+    cheap_items = [{**item, "price": 0.01} for item in items]
+    response = await client.post(
+        "/api/v1/orders/", json={"user_id": user.id, "order_amount": 0.01, "order_items": cheap_items},
+        headers=auth_headers(user),
+    )
+    assert response.status_code == 200
+    order = response.json()
+    assert order["order_amount"] == quote.json()["order_amount"]
+    assert [item["price"] for item in order["order_items"]] == [
+        item["unit_price"] for item in quote.json()["order_items"]
+    ]
+
+    stored = await OrderController(db).get_order_by_id(order["id"])
+    assert stored.order_amount == quote.json()["order_amount"]
+
+
+async def test_unknown_book_is_rejected(client, db):
+    user = create_user()
+    (book_id,) = await _book_ids(db, 1)
+    orders_before = await _count(db, OrderModel)
+    items = [{"book_id": book_id, "quantity": 1}, {"book_id": 10 ** 9, "quantity": 1}]
+
+    quote = await client.post("/api/v1/orders/quote", json=items)
+    assert quote.status_code == 404
+
+    response = await client.post(
+        "/api/v1/orders/", json={"user_id": user.id, "order_items": items}, headers=auth_headers(user)
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == f"Books not found: {[10 ** 9]}"
+    assert await _count(db, OrderModel) == orders_before
@@ -0,0 +1,120 @@
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, text
+
+from app.controllers.BookController import BookController
+from app.db.session import engine
+from app.models import BookModel
+from app.utils.pagination import decode_cursor, encode_cursor, paginate
+from test.conftest import DISCOUNT_PRICE
+
+pytestmark = pytest.mark.anyio
+
+
+async def _offset_walk(controller, limit, **filters):
+    ids, offset = [], 0
+    while True:
+        page = await controller.get_all_books(offset=offset, limit=limit, **filters)
+        if not page["data"]:
+            return ids, page["total"]
+        ids += [book.id for book in page["data"]]
+        offset += limit
+
+
+async def _cursor_walk(controller, limit, **filters):
+    page = await controller.get_all_books(limit=limit, use_cursor=True, **filters)
+    ids = [book.id for book in page["data"]]
+    while page["next_cursor"]:
+        page = await controller.get_all_books(limit=limit, use_cursor=True, cursor=page["next_cursor"], **filters)
+        ids += [book.id for book in page["data"]]
+    return ids
+
+
+@pytest.mark.parametrize("desc_price", [None, False, True])
+async def test_cursor_and_offset_pages_match(db, catalog, desc_price):
+    controller = BookController(db)
+    offset_ids, total = await _offset_walk(controller, 4, desc_price=desc_price)
+    cursor_ids = await _cursor_walk(controller, 4, desc_price=desc_price)
+
+    assert total == catalog["books"]
+    assert len(set(offset_ids)) == catalog["books"]
+    assert cursor_ids == offset_ids
+
+
+async def test_prices_are_sorted_with_ties(db):
+    page = await BookController(db).get_all_books(limit=100, desc_price=False)
+    keys = [(book.current_price, book.id) for book in page["data"]]
+
+    assert keys == sorted(keys)
+    assert len({book.current_price for book in page["data"]}) < len(keys)
+
+
+async def test_cursor_total_is_optional(db, catalog):
+    controller = BookController(db)
+    first = await controller.get_all_books(limit=5, use_cursor=True, include_total=False)
+    assert first["total"] is None
+
+    second = await controller.get_all_books(limit=5, use_cursor=True, cursor=first["next_cursor"])
+    assert second["total"] == catalog["books"]
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(Decimal("12.50"), 7), value_type=Decimal) == (Decimal("12.50"), 7)
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("not-a-cursor")
+    assert error.value.status_code == 400
+
+
+async def test_offset_past_the_end_keeps_the_total(db, catalog):
+    page = await BookController(db).get_all_books(offset=1000, limit=10)
+
+    assert page == {"page_num": 101, "total": catalog["books"], "data": []}
+
+
+@pytest.mark.parametrize("use_cursor", [False, True])
+async def test_separate_count_matches_window_count(db, catalog, use_cursor):
+    query = select(BookModel.id, BookModel.book_price).where(BookModel.book_price > 10)
+    pages = [
+        await paginate(db, query, BookModel.id, lambda row: row.id, limit=6, sort_expr=BookModel.book_price,
+                       sort_attr="book_price", use_cursor=use_cursor, window_count=window_count)
+        for window_count in (True, False)
+    ]
+
+    assert pages[0] == pages[1]
+    assert pages[0]["total"] < catalog["books"]
+
+
+@pytest.mark.parametrize("desc_price", [False, True])
+async def test_price_order_holds_across_pages(db, catalog, desc_price):
+    controller = BookController(db)
+    books = []
+    for offset in range(0, catalog["books"], 4):
+        books += (await controller.get_all_books(offset=offset, limit=4, desc_price=desc_price))["data"]
+
+    keys = [(book.current_price, book.id) for book in books]
+    assert keys == sorted(keys, reverse=desc_price)
+    assert len(keys) == catalog["books"]
+    for book in books:
+        expected = DISCOUNT_PRICE if book.id in catalog["discounted"] else book.original_price
+        assert book.current_price == expected
+
+
+async def test_price_filters_use_the_discounted_price(db, catalog):
+    page = await BookController(db).get_all_books(max_price=float(DISCOUNT_PRICE), limit=100)
+
+    assert sorted(book.id for book in page["data"]) == sorted(catalog["discounted"])
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_price_sort_reads_the_index(catalog, descending):
+    price = BookController._get_effective_price_expr()
+    order = (price.desc(), BookModel.id.desc()) if descending else (price.asc(), BookModel.id.asc())
+    query = BookController._get_base_book_query().where(price >= 11).order_by(*order).limit(4)
+    sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as connection:
+        plan = " ".join(row[3] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+    assert "book USING INDEX ix_book_effective_price" in plan
+    assert "TEMP B-TREE" not in plan
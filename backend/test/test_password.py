@@ -0,0 +1,74 @@
+import threading
+import uuid
+
+import anyio
+import pytest
+from fastapi import HTTPException
+
+from app.core.security import password
+from app.core.security.password import PasswordWorkerPool
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def blocked_pool():
+    """A pool with one slot, taken by a call waiting for the returned event."""
+    pool = PasswordWorkerPool(max_workers=1, max_pending=1)
+    release = threading.Event()
+    yield pool, release
+    release.set()
+    pool.shutdown()
+
+
+async def _wait_until(condition):
+    with anyio.fail_after(5):
+        while not condition():
+            await anyio.sleep(0.01)
+
+
+async def test_saturated_pool_answers_503_with_retry_after(client, blocked_pool, monkeypatch):
+    pool, release = blocked_pool
+    monkeypatch.setattr(password, "password_pool", pool)
+
+    async with anyio.create_task_group() as tasks:
+        tasks.start_soon(pool.run, release.wait)
+        await _wait_until(lambda: pool.stats()["running"] == 1)
+
+        response = await client.post("/api/v1/auth/register", json={
+            "email": f"{uuid.uuid4().hex}@example.com", "first_name": "Ada", "last_name": "Lovelace",
+            "password": "password1",
+        })
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert pool.stats()["rejected"] == 1
+        release.set()
+
+
+async def test_cancelled_call_keeps_its_slot_until_it_finishes(blocked_pool):
+    pool, release = blocked_pool
+
+    with anyio.move_on_after(0.05):
+        await pool.run(release.wait)
+    # The thread is still running, a new call would queue behind it
+    assert pool.stats()["pending"] == 1
+    with pytest.raises(HTTPException) as error:
+        await pool.run(lambda: None)
+    assert error.value.status_code == 503
+
+    release.set()
+    await _wait_until(lambda: pool.stats()["pending"] == 0)
+    assert await pool.run(lambda: 42) == 42
+
+
+async def test_failures_are_not_counted_as_completed():
+    pool = PasswordWorkerPool(max_workers=1, max_pending=1)
+    try:
+        with pytest.raises(ValueError):
+            await pool.run(int, "not a number")
+        assert await pool.run(int, "7") == 7
+
+        stats = pool.stats()
+        assert (stats["completed"], stats["failed"], stats["pending"]) == (1, 1, 0)
+    finally:
+        pool.shutdown()
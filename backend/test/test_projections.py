@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+
+from app.db import projections
+from app.db.projections import rebuild_active_discounts, refresh_active_discounts
+from app.db.session import engine
+from app.models import ActiveDiscountModel, BookModel, DiscountModel, ProjectionRefreshModel
+from test.conftest import DISCOUNT_PRICE
+
+
+def _effective_prices(session):
+    return dict(session.exec(select(BookModel.id, BookModel.effective_price)).all())
+
+
+def test_rebuild_maintains_the_effective_price(catalog):
+    with Session(engine) as session:
+        prices = dict(session.exec(select(BookModel.id, BookModel.book_price)).all())
+        assert _effective_prices(session) == {
+            book_id: DISCOUNT_PRICE if book_id in catalog["discounted"] else price
+            for book_id, price in prices.items()
+        }
+
+        # The discounts only run today, rolled back at the end of the session
+        rebuild_active_discounts(session, date.today() + timedelta(days=1))
+        assert _effective_prices(session) == prices
+
+        rebuild_active_discounts(session, date.today())
+        assert _effective_prices(session)[catalog["discounted"][0]] == DISCOUNT_PRICE
+
+
+def test_new_books_start_at_their_price(catalog):
+    with Session(engine) as session:
+        book = session.exec(select(BookModel)).first()
+        new_book = BookModel(
+            category_id=book.category_id, author_id=book.author_id, book_title="New", book_summary="",
+            book_price=12.5, book_cover_photo="",
+        )
+        session.add(new_book)
+        session.flush()
+        session.refresh(new_book)
+
+        assert new_book.effective_price == 12.5
+        session.rollback()
+
+
+@pytest.fixture
+def lock_calls(monkeypatch):
+    calls = []
+    lock = projections._lock_active_discounts
+
+    def counting_lock(session):
+        calls.append(session)
+        lock(session)
+
+    monkeypatch.setattr(projections, "_lock_active_discounts", counting_lock)
+    return calls
+
+
+def test_refresh_skips_a_rebuilt_day_without_locking(catalog, lock_calls):
+    with Session(engine) as session:
+        assert not refresh_active_discounts(session, date.today())
+    assert lock_calls == []
+
+
+def test_refresh_rebuilds_once_the_day_changed(catalog, lock_calls):
+    tomorrow = date.today() + timedelta(days=1)
+    with Session(engine) as session:
+        assert refresh_active_discounts(session, tomorrow)
+        assert lock_calls
+        assert session.get(ProjectionRefreshModel, "active_discount").refreshed_on == tomorrow
+        assert not refresh_active_discounts(session, tomorrow)
+        session.rollback()
+
+
+def test_refresh_counts_an_empty_projection_as_rebuilt(catalog, lock_calls):
+    with Session(engine) as session:
+        session.exec(delete(DiscountModel))
+        rebuild_active_discounts(session, date.today())
+        assert session.exec(select(ActiveDiscountModel)).first() is None
+        lock_calls.clear()
+
+        assert not refresh_active_discounts(session, date.today())
+        assert lock_calls == []
+        session.rollback()
+
+
+def test_refresh_skips_a_day_rebuilt_while_waiting_for_the_lock(catalog, monkeypatch):
+    tomorrow = date.today() + timedelta(days=1)
+
+    def lock_after_another_rebuild(session):
+        # Another worker rebuilt the projection and committed while this one waited for the lock
+        session.exec(update(ProjectionRefreshModel).values(refreshed_on=tomorrow))
+
+    monkeypatch.setattr(projections, "_lock_active_discounts", lock_after_another_rebuild)
+    with Session(engine) as session:
+        assert not refresh_active_discounts(session, tomorrow)
+        session.rollback()
@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+
+from app.controllers.BookController import book_carousel_cache
+from app.controllers.ReviewController import ReviewController
+from app.db.session import engine
+from app.models import BookRatingStatsModel, ReviewModel
+from app.schema.ReviewSchema import ReviewCreate
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def book_id(catalog):
+    """A book whose reviews and rating stats are removed after the test."""
+    book_id = catalog["books"]
+    yield book_id
+    with Session(engine) as session:
+        session.exec(delete(ReviewModel).where(ReviewModel.book_id == book_id))
+        session.exec(delete(BookRatingStatsModel).where(BookRatingStatsModel.book_id == book_id))
+        session.commit()
+
+
+def _written(book_id):
+    """Read the reviews and rating stats of a book through another connection."""
+    with Session(engine) as session:
+        reviews = session.exec(select(func.count()).select_from(ReviewModel).where(ReviewModel.book_id == book_id)).one()
+        stats = session.get(BookRatingStatsModel, book_id)
+        return reviews, stats and (stats.review_count, stats.star_sum, stats.star_4, stats.star_5)
+
+
+def _review(book_id, rating_star):
+    return {"book_id": book_id, "review_title": "Review", "review_details": "", "rating_star": rating_star}
+
+
+async def test_review_increments_the_rating_stats(client, book_id):
+    for rating_star in (5, 4, 5):
+        response = await client.post("/api/v1/reviews/", json=_review(book_id, rating_star))
+        assert response.status_code == 200
+
+    assert _written(book_id) == (3, (3, 14, 1, 2))
+    rating = (await client.get(f"/api/v1/reviews/book/{book_id}")).json()
+    assert (rating["avg_rating"], rating["stars_count"], rating["total_reviews"]) == (4.67, {"4": 1, "5": 2}, 3)
+
+
+async def test_stats_are_written_in_the_review_transaction(db, book_id, monkeypatch):
+    controller = ReviewController(db)
+    controller.set_book_id(book_id)
+    commit = db.commit
+    before_commit = []
+
+    async def checked_commit():
+        # The review and the stats are both written but not committed yet
+        before_commit.append(_written(book_id))
+        await commit()
+
+    monkeypatch.setattr(db, "commit", checked_commit)
+    await controller.add_review(ReviewCreate(**_review(book_id, 4)))
+
+    assert before_commit == [(0, None)]
+    assert _written(book_id) == (1, (1, 4, 1, 0))
+
+
+async def test_failed_commit_writes_neither_the_review_nor_the_stats(db, book_id, monkeypatch):
+    controller = ReviewController(db)
+    controller.set_book_id(book_id)
+    book_carousel_cache.set("popular", ["cached"])
+
+    async def failing_commit():
+        raise RuntimeError("commit failed")
+
+    monkeypatch.setattr(db, "commit", failing_commit)
+    with pytest.raises(RuntimeError):
+        await controller.add_review(ReviewCreate(**_review(book_id, 5)))
+    await db.close()
+
+    assert _written(book_id) == (0, None)
+    # Nothing changed, the carousels stay cached
+    assert book_carousel_cache.get("popular") == ["cached"]
+    book_carousel_cache.invalidate()
+
+
+async def test_review_invalidates_the_carousels_after_commit(db, book_id, monkeypatch):
+    controller = ReviewController(db)
+    controller.set_book_id(book_id)
+    book_carousel_cache.set("popular", ["cached"])
+    commit = db.commit
+    cached_at_commit = []
+
+    async def checked_commit():
+        cached_at_commit.append(book_carousel_cache.get("popular"))
+        await commit()
+
+    monkeypatch.setattr(db, "commit", checked_commit)
+    await controller.add_review(ReviewCreate(**_review(book_id, 5)))
+
+    # Invalidated once committed, so a carousel read in between cannot cache the old ratings for long
+    assert cached_at_commit == [["cached"]]
+    assert book_carousel_cache.get("popular") is None
@@ -0,0 +1,49 @@
+import pytest
+
+from app.controllers.BookController import BookController
+from test.conftest import KINGDOM_BOOKS
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_search_ranks_full_text_matches(db):
+    page = await BookController(db).search_books("kingdom glass", limit=3)
+
+    assert page["total"] == KINGDOM_BOOKS
+    assert len(page["data"]) == 3
+    assert all("Kingdom of Glass" in book.book_title for book in page["data"])
+
+
+async def test_search_without_match_is_empty(db):
+    page = await BookController(db).search_books("zzzz", limit=3)
+
+    assert page == {"page_num": 1, "total": 0, "data": []}
+
+
+async def test_search_fallback_offset_pages(db):
+    # "ingdo" is no word prefix, only the fallback matches it inside "Kingdom"
+    controller = BookController(db)
+    titles = []
+    for offset in range(0, KINGDOM_BOOKS, 3):
+        page = await controller.search_books("ingdo", offset=offset, limit=3)
+        assert page["total"] == KINGDOM_BOOKS
+        titles += [book.book_title for book in page["data"]]
+
+    assert len(titles) == KINGDOM_BOOKS
+    assert len(set(titles)) == KINGDOM_BOOKS
+    assert all("Kingdom" in title for title in titles)
+
+
+async def test_search_fallback_cursor_pages(db):
+    controller = BookController(db)
+    page = await controller.search_books("ingdo", limit=3, use_cursor=True)
+    ids = [book.id for book in page["data"]]
+    assert page["total"] == KINGDOM_BOOKS
+
+    while page["next_cursor"]:
+        page = await controller.search_books("ingdo", limit=3, use_cursor=True, cursor=page["next_cursor"])
+        assert page["total"] == KINGDOM_BOOKS
+        ids += [book.id for book in page["data"]]
+
+    assert len(ids) == KINGDOM_BOOKS
+    assert len(set(ids)) == KINGDOM_BOOKS
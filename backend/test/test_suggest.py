@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import update
+from sqlmodel import Session
+
+from app.controllers.BookController import BookController
+from app.db.session import engine
+from app.models import AuthorModel
+from app.utils.prefix_index import PrefixIndex
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_refresh_picks_up_renames_from_other_processes(db):
+    controller = BookController(db)
+    await controller.refresh_suggest_index(full=True)
+    assert [suggestion.text for suggestion in controller.suggest("ada")] == ["Ada Lovelace"]
+
+    # Written through another connection, as another worker would
+    with Session(engine) as session:
+        session.exec(update(AuthorModel).where(AuthorModel.author_name == "Ada Lovelace").values(author_name="Ada King"))
+        session.commit()
+    try:
+        await controller.refresh_suggest_index()
+        assert [suggestion.text for suggestion in controller.suggest("ada")] == ["Ada King"]
+    finally:
+        with Session(engine) as session:
+            session.exec(update(AuthorModel).where(AuthorModel.author_name == "Ada King").values(author_name="Ada Lovelace"))
+            session.commit()
+
+
+def test_search_ranks_every_prefix_match():
+    index = PrefixIndex()
+    # Many longer labels sort before the shortest one alphabetically
+    index.rebuild([("book", number, f"King Arthur {number:04d}") for number in range(1000)] + [("book", 1000, "Kings")])
+
+    assert index.search("king", limit=1) == [{"type": "book", "id": 1000, "text": "Kings"}]
+    assert index.search("arthur", limit=1) == [{"type": "book", "id": 0, "text": "King Arthur 0000"}]
+
+
+def _ranked_by_scan(items, prefix, limit):
+    """Rank every label having a word starting with prefix, as the index documents it."""
+    matches = []
+    for kind, item_id, label in items:
+        words = label.lower().split()
+        if any(word.startswith(prefix) for word in words):
+            matches.append(((not words[0].startswith(prefix), len(label), label.lower()), kind, item_id, label))
+    return [{"type": kind, "id": item_id, "text": label} for _, kind, item_id, label in sorted(matches)[:limit]]
+
+
+def test_short_prefixes_stay_ranked_through_updates():
+    items = [("book", number, f"{'Kite' if number % 2 else 'Old Kite'} {number:03d}") for number in range(200)]
+    index = PrefixIndex()
+    index.rebuild(items)
+    assert index.search("k", limit=50) == _ranked_by_scan(items, "k", 50)
+
+    # The best entry is replaced by the next one outside the kept entries
+    index.remove("book", 1)
+    items = [item for item in items if item[1] != 1]
+    assert index.search("ki", limit=50) == _ranked_by_scan(items, "ki", 50)
+
+    index.upsert("book", 500, "Kit")
+    index.upsert("book", 3, "Old Kite 003")
+    items = [item for item in items if item[1] != 3] + [("book", 500, "Kit"), ("book", 3, "Old Kite 003")]
+    for prefix in ("k", "ki", "o", "kite"):
+        assert index.search(prefix, limit=50) == _ranked_by_scan(items, prefix, 50)
+    assert index.search("k", limit=1) == [{"type": "book", "id": 500, "text": "Kit"}]